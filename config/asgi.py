@@ -0,0 +1,26 @@
+"""
+ASGI config for Warnain Backend project.
+
+Runs the same Django project as ``config.wsgi`` under an ASGI server, so the
+async print, printer status and network views (see
+``warnain.utils.async_api``) can wait on CUPS and subprocess calls without
+holding a worker. Serve it with uvicorn workers under gunicorn::
+
+    gunicorn -k uvicorn.workers.UvicornWorker config.asgi:application
+
+"""
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# warnain directory.
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(ROOT_DIR / "warnain"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# This application object is used by any ASGI server configured to use this
+# file.
+application = get_asgi_application()
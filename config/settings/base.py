@@ -1,6 +1,7 @@
 """
 Base settings to build other settings files upon.
 """
+import os
 from pathlib import Path
 
 import environ
@@ -134,6 +135,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "warnain.middleware.MetricsMiddleware",
+    "warnain.middleware.RequestCaptureMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -167,6 +170,34 @@ STATICFILES_FINDERS = [
 MEDIA_ROOT = str(APPS_DIR / "media")
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "/media/"
+# Transfer file media diserahkan ke front server: "nginx" (X-Accel-Redirect ke
+# location internal MEDIA_ACCEL_PREFIX), "apache" (X-Sendfile) atau kosong
+# (Django mengirim sendiri lewat sendfile)
+MEDIA_ACCEL = env("MEDIA_ACCEL", default="")
+MEDIA_ACCEL_PREFIX = env("MEDIA_ACCEL_PREFIX", default="/protected-media/")
+# Cache-Control media: URL dengan ?v=<hash isi> di-cache lama dan immutable,
+# URL tanpa versi hanya sebentar lalu divalidasi ulang lewat ETag
+MEDIA_CACHE_MAX_AGE = env.int("MEDIA_CACHE_MAX_AGE", default=60 * 60 * 24 * 365)
+MEDIA_CACHE_UNVERSIONED_MAX_AGE = env.int("MEDIA_CACHE_UNVERSIONED_MAX_AGE", default=60)
+# Direktori cache hasil olahan media (resize, sprite), default MEDIA_ROOT/cache
+MEDIA_CACHE_DIR = env("MEDIA_CACHE_DIR", default="")
+# Ukuran yang boleh diminta ke /media/r/<w>x<h>/, permintaan lain dibulatkan
+# ke atas supaya jumlah rendition per gambar terbatas
+IMAGE_RESIZE_SIZES = env.list(
+    "IMAGE_RESIZE_SIZES",
+    cast=int,
+    default=[96, 160, 240, 320, 480, 640, 960, 1280, 1920],
+)
+IMAGE_RESIZE_CACHE_MAX_BYTES = env.int(
+    "IMAGE_RESIZE_CACHE_MAX_BYTES", default=512 * 1024 * 1024
+)
+IMAGE_RESIZE_JPEG_QUALITY = env.int("IMAGE_RESIZE_JPEG_QUALITY", default=85)
+# Sprite thumbnail per halaman CategoryListView (?sprite=1)
+CATEGORY_SPRITE_TILE_SIZE = env.int("CATEGORY_SPRITE_TILE_SIZE", default=240)
+CATEGORY_SPRITE_COLUMNS = env.int("CATEGORY_SPRITE_COLUMNS", default=5)
+CATEGORY_SPRITE_CACHE_MAX_BYTES = env.int(
+    "CATEGORY_SPRITE_CACHE_MAX_BYTES", default=128 * 1024 * 1024
+)
 
 # TEMPLATES
 # ------------------------------------------------------------------------------
@@ -287,13 +318,13 @@ SOCIALACCOUNT_FORMS = {"signup": "warnain.users.forms.UserSocialSignupForm"}
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "warnain.users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'DEFAULT_FILTER_BACKENDS': ['rest_framework.filters.SearchFilter'],
-    'PAGE_SIZE': 20
+    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_FILTER_BACKENDS": ["rest_framework.filters.SearchFilter"],
+    "PAGE_SIZE": 20,
 }
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
@@ -315,3 +346,83 @@ SPECTACULAR_SETTINGS = {
 # ------------------------------------------------------------------------------
 PRINTER_NAME = "Ink-Tank-310-series"
 INTERFACE = "enp37s0"
+# Print job dengan umur lebih dari ini dipindah ke PrintJobArchive
+# oleh `manage.py archive_print_jobs`
+PRINT_JOB_RETENTION_DAYS = env.int("PRINT_JOB_RETENTION_DAYS", default=90)
+# CategoryAccess mentah yang sudah direkap harian dihapus setelah umur ini
+# oleh `manage.py rollup_category_access`
+CATEGORY_ACCESS_RETENTION_DAYS = env.int("CATEGORY_ACCESS_RETENTION_DAYS", default=90)
+# Half-life skor popularitas kategori (sorting `freq`)
+CATEGORY_POPULARITY_HALF_LIFE_DAYS = env.float(
+    "CATEGORY_POPULARITY_HALF_LIFE_DAYS", default=14
+)
+# Jumlah maksimal kategori di riwayat per device (RecentCategory)
+RECENT_CATEGORY_LIMIT = env.int("RECENT_CATEGORY_LIMIT", default=50)
+# Lama cache daftar id kategori (validasi /track/batch/)
+CATEGORY_IDS_CACHE_TIMEOUT = env.int("CATEGORY_IDS_CACHE_TIMEOUT", default=300)
+# Batas jumlah dan umur event dalam satu request /track/batch/
+TRACK_BATCH_MAX_EVENTS = env.int("TRACK_BATCH_MAX_EVENTS", default=500)
+TRACK_BATCH_MAX_AGE_DAYS = env.int("TRACK_BATCH_MAX_AGE_DAYS", default=7)
+# Akses kategori yang sama dari device yang sama dalam window ini hanya
+# dihitung sekali (0 = nonaktif)
+CATEGORY_ACCESS_DEBOUNCE_SECONDS = env.int(
+    "CATEGORY_ACCESS_DEBOUNCE_SECONDS", default=300
+)
+# Cache token -> user untuk CachedTokenAuthentication (cache bersama, dihapus
+# lewat signal saat token atau user berubah)
+TOKEN_CACHE_TIMEOUT = env.int("TOKEN_CACHE_TIMEOUT", default=300)
+# Metrik /metrics: kosongkan untuk metrik per proses saja, isi dengan
+# direktori bersama supaya semua worker gunicorn dijumlahkan
+METRICS_DIR = env("METRICS_DIR", default=None)
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5)
+# Alamat atau network (CIDR) yang boleh membaca /metrics selain user staff.
+# Dicek terhadap REMOTE_ADDR, jadi di belakang proxy isi dengan alamat proxy
+# hanya kalau proxy itu sendiri membatasi /metrics
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+# Backend CUPS: "cups.Connection" (pycups, printer asli) atau
+# "warnain.printable_books.fake_cups.Connection" (simulator untuk load test)
+CUPS_CONNECTION_CLASS = env("CUPS_CONNECTION_CLASS", default="cups.Connection")
+# Simulator CUPS: daftar printer, latency per panggilan (detik), kecepatan
+# cetak (halaman/detik per printer) dan fault awal (printer=stopped|paper-out)
+FAKE_CUPS_PRINTERS = env.list("FAKE_CUPS_PRINTERS", default=["Fake-Printer"])
+FAKE_CUPS_LATENCY = env.float("FAKE_CUPS_LATENCY", default=0.01)
+FAKE_CUPS_DRAIN_RATE = env.float("FAKE_CUPS_DRAIN_RATE", default=1.0)
+FAKE_CUPS_FAULTS = env.dict("FAKE_CUPS_FAULTS", default={})
+# File cetak print-image: gambar diubah ke PDF raster 1-bit ("1") atau
+# grayscale ("L") dengan resolusi PRINT_DPI di kertas PRINT_PAPER_SIZE
+# (A4, A5, Letter, F4), di-cache di MEDIA cache/print
+PRINT_PREPARE = env.bool("PRINT_PREPARE", default=True)
+PRINT_PAPER_SIZE = env("PRINT_PAPER_SIZE", default="A4")
+# Default layout kalau request tidak menyebutkan: orientasi auto|portrait|
+# landscape, fit contain (seluruh gambar) | cover (penuh, dipotong)
+PRINT_ORIENTATION = env("PRINT_ORIENTATION", default="auto")
+PRINT_FIT = env("PRINT_FIT", default="contain")
+PRINT_DPI = env.int("PRINT_DPI", default=300)
+PRINT_COLOR_MODE = env("PRINT_COLOR_MODE", default="1")
+PRINT_MARGIN_MM = env.float("PRINT_MARGIN_MM", default=6)
+PRINT_CACHE_MAX_BYTES = env.int("PRINT_CACHE_MAX_BYTES", default=512 * 1024 * 1024)
+# print-temp: foto upload diputar sesuai EXIF dan diperkecil ke area cetak
+# kertas di PRINT_DPI sebelum dikirim ke CUPS, opsional grayscale
+PRINT_UPLOAD_NORMALIZE = env.bool("PRINT_UPLOAD_NORMALIZE", default=True)
+PRINT_UPLOAD_GRAYSCALE = env.bool("PRINT_UPLOAD_GRAYSCALE", default=False)
+PRINT_UPLOAD_JPEG_QUALITY = env.int("PRINT_UPLOAD_JPEG_QUALITY", default=90)
+# warm_print_cache: kombinasi gambar/layout terbanyak dalam N hari terakhir
+PRINT_WARM_DAYS = env.int("PRINT_WARM_DAYS", default=30)
+PRINT_WARM_LIMIT = env.int("PRINT_WARM_LIMIT", default=200)
+# Upload print-temp yang bisa dilanjutkan: chunk disimpan di luar MEDIA_ROOT
+# dan dibuang `manage.py cleanup_uploads` setelah TTL (detik) tanpa aktivitas
+UPLOAD_STAGING_DIR = env("UPLOAD_STAGING_DIR", default="/tmp/warnain-uploads")
+UPLOAD_SESSION_TTL = env.int("UPLOAD_SESSION_TTL", default=24 * 60 * 60)
+UPLOAD_MAX_BYTES = env.int("UPLOAD_MAX_BYTES", default=50 * 1024 * 1024)
+# Harus di bawah DATA_UPLOAD_MAX_MEMORY_SIZE (body PUT dibaca ke memory)
+UPLOAD_CHUNK_MAX_BYTES = env.int("UPLOAD_CHUNK_MAX_BYTES", default=1024 * 1024)
+# Rekam request API ke file JSONL untuk `manage.py replay_requests`
+# (kosong = nonaktif)
+REQUEST_CAPTURE_FILE = env("REQUEST_CAPTURE_FILE", default=None)
+REQUEST_CAPTURE_PATHS = env("REQUEST_CAPTURE_PATHS", default=r"^/api/")
+# Jumlah thread untuk pekerjaan yang memblokir (CUPS, subprocess, upload)
+# di view async (config/asgi.py)
+BLOCKING_IO_WORKERS = env.int("BLOCKING_IO_WORKERS", default=16)
+# Thread untuk olah gambar (normalisasi upload, render PDF cetak), default
+# jumlah core CPU
+CPU_BOUND_WORKERS = env.int("CPU_BOUND_WORKERS", default=os.cpu_count() or 2)
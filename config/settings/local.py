@@ -82,6 +82,8 @@ INSTALLED_APPS += ["django_extensions"]  # noqa F405
 # MIDDLEWARE for development
 # ------------------------------------------------------------------------------
 MIDDLEWARE = [
+    "warnain.middleware.MetricsMiddleware",
+    "warnain.middleware.RequestCaptureMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -103,7 +105,7 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "warnain.users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [],  # No authentication required for development
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -31,3 +31,6 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore # noqa F405
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Test tidak pernah menyentuh CUPS asli
+CUPS_CONNECTION_CLASS = "warnain.printable_books.fake_cups.Connection"
+FAKE_CUPS_LATENCY = 0
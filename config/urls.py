@@ -1,7 +1,6 @@
 import os
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views import defaults as default_views
@@ -9,7 +8,9 @@ from django.views.generic import TemplateView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from warnain.metrics import metrics_view
 from warnain.printable_books.utils import get_default_interface, get_interface_ip
+from warnain.utils.media import media_urlpatterns
 
 
 def get_machine_ip():
@@ -54,7 +55,7 @@ urlpatterns = [
     path("users/", include("warnain.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
     # Your stuff: custom urls includes go here
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + media_urlpatterns()
 
 # API URLS
 urlpatterns += [
@@ -62,6 +63,8 @@ urlpatterns += [
     path("api/", include("config.api_router")),
     # DRF auth token
     path("auth-token/", obtain_auth_token),
+    # Prometheus metrics
+    path("metrics", metrics_view, name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path(
         "api/docs/",
@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useEffect } from "react";
 import { NavigationContainer } from "@react-navigation/native";
 import { Provider as PaperProvider } from "react-native-paper";
 import { SafeAreaProvider } from "react-native-safe-area-context";
@@ -7,8 +7,14 @@ import { StatusBar } from "expo-status-bar";
 
 import AppNavigator from "./src/navigation/AppNavigator";
 import { theme } from "./src/utils/theme";
+import accessQueue from "./src/services/accessQueue";
 
 export default function App() {
+  useEffect(() => {
+    accessQueue.start();
+    return () => accessQueue.stop();
+  }, []);
+
   return (
     <SafeAreaProvider>
       <PaperProvider theme={theme}>
@@ -27,6 +27,7 @@ import Toast from "react-native-toast-message";
 
 import { Category, RootStackParamList } from "../types";
 import apiService from "../services/api";
+import accessQueue from "../services/accessQueue";
 
 type NavigationProp = NativeStackNavigationProp<RootStackParamList>;
 
@@ -170,10 +171,9 @@ export default function CategoryListScreen() {
   );
 
   const handleCategoryPress = async (category: Category) => {
-    // Track access
+    // Track access (queued, sent in batches)
     try {
-      await apiService.trackCategoryAccess(category.id);
-      console.log(`Tracked access for category: ${category.title}`);
+      await accessQueue.track(category.id);
     } catch (error) {
       console.error("Error tracking access:", error);
     }
@@ -0,0 +1,101 @@
+import AsyncStorage from "@react-native-async-storage/async-storage";
+import { AccessEvent } from "../types";
+import { apiService } from "./api";
+
+const QUEUE_KEY = "access_event_queue";
+const DEVICE_ID_KEY = "device_id";
+const FLUSH_INTERVAL_MS = 2 * 60 * 1000;
+const FLUSH_SIZE = 20;
+// Must stay below TRACK_BATCH_MAX_EVENTS on the backend
+const MAX_BATCH = 200;
+
+let flushing = false;
+let timer: ReturnType<typeof setInterval> | null = null;
+
+const readQueue = async (): Promise<AccessEvent[]> => {
+  try {
+    const raw = await AsyncStorage.getItem(QUEUE_KEY);
+    return raw ? JSON.parse(raw) : [];
+  } catch (error) {
+    console.error("Error reading access queue:", error);
+    return [];
+  }
+};
+
+const writeQueue = async (events: AccessEvent[]) => {
+  await AsyncStorage.setItem(QUEUE_KEY, JSON.stringify(events));
+};
+
+// Random id generated once per install; the backend only uses it to debounce
+// repeat opens, events are attributed through the device token
+const getDeviceId = async (): Promise<string | undefined> => {
+  try {
+    let deviceId = await AsyncStorage.getItem(DEVICE_ID_KEY);
+    if (!deviceId) {
+      deviceId =
+        Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+      await AsyncStorage.setItem(DEVICE_ID_KEY, deviceId);
+    }
+    return deviceId;
+  } catch (error) {
+    console.error("Error reading device id:", error);
+    return undefined;
+  }
+};
+
+export const accessQueue = {
+  // Queue a category open; it is sent later together with other events
+  async track(categoryId: string): Promise<void> {
+    const device = await getDeviceId();
+    const events = await readQueue();
+    events.push({
+      category_id: Number(categoryId),
+      timestamp: new Date().toISOString(),
+      device,
+    });
+    await writeQueue(events);
+
+    if (events.length >= FLUSH_SIZE) {
+      await this.flush();
+    }
+  },
+
+  // Send queued events in batches; events stay queued when offline
+  async flush(): Promise<void> {
+    if (flushing) {
+      return;
+    }
+    flushing = true;
+    try {
+      let events = await readQueue();
+      while (events.length > 0) {
+        const batch = events.slice(0, MAX_BATCH);
+        await apiService.trackCategoryAccessBatch(batch);
+        // Re-read so events queued during the request are kept
+        events = (await readQueue()).slice(batch.length);
+        await writeQueue(events);
+      }
+    } catch (error) {
+      console.log("Access queue flush postponed:", error);
+    } finally {
+      flushing = false;
+    }
+  },
+
+  start(): void {
+    if (timer) {
+      return;
+    }
+    this.flush();
+    timer = setInterval(() => this.flush(), FLUSH_INTERVAL_MS);
+  },
+
+  stop(): void {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
+    }
+  },
+};
+
+export default accessQueue;
@@ -7,6 +7,7 @@ import {
   PrinterSettings,
   NetworkInterface,
   ApiResponse,
+  AccessEvent,
 } from "../types";
 import { buildBaseURL, autoDetectIP, testConnection } from "../utils/network";
 
@@ -100,6 +101,11 @@ export const apiService = {
     return response.data;
   },
 
+  async trackCategoryAccessBatch(events: AccessEvent[]): Promise<any> {
+    const response = await api.post("/categories/track/batch/", events);
+    return response.data;
+  },
+
   async getLastAccess(): Promise<Category[]> {
     const response = await api.get("/categories/last-access/");
     return response.data;
@@ -72,6 +72,12 @@ export interface ApiResponse<T> {
   results: T[];
 }
 
+export interface AccessEvent {
+  category_id: number;
+  timestamp: string;
+  device?: string;
+}
+
 export interface PrintStatus {
   isConnected: boolean;
   printerName: string;
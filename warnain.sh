@@ -2,4 +2,14 @@
 
 cd "$(dirname "$0")"
 
-/home/Develops/venvs/warnain/bin/gunicorn --bind 0.0.0.0:9000 --workers 2 config.wsgi:application
+# Shared directory so /metrics sums up every gunicorn worker
+export METRICS_DIR="${METRICS_DIR:-/tmp/warnain-metrics}"
+rm -rf "$METRICS_DIR" && mkdir -p "$METRICS_DIR"
+
+# WARNAIN_SERVER=asgi: view print/status async di uvicorn worker
+if [ "${WARNAIN_SERVER:-wsgi}" = "asgi" ]; then
+    /home/Develops/venvs/warnain/bin/gunicorn --bind 0.0.0.0:9000 --workers 2 \
+        -k uvicorn.workers.UvicornWorker config.asgi:application
+else
+    /home/Develops/venvs/warnain/bin/gunicorn --bind 0.0.0.0:9000 --workers 2 config.wsgi:application
+fi
@@ -0,0 +1,42 @@
+import pytest
+from rest_framework.test import APIClient
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client(settings):
+    # Debounce akan membuat benchmark detail hanya menulis sekali
+    settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 0
+    return APIClient()
+
+
+@pytest.mark.parametrize("sort_by", ["title", "freq", "access", "personal"])
+def test_category_list(benchmark, catalog, client, sort_by):
+    client.force_authenticate(catalog["user"])
+
+    response = benchmark(client.get, "/api/categories/", {"sort_by": sort_by})
+
+    assert response.status_code == 200
+
+
+def test_category_detail(benchmark, catalog, client):
+    category = catalog["categories"][0]
+
+    response = benchmark(client.get, f"/api/categories/{category.pk}/")
+
+    assert response.status_code == 200
+
+
+def test_books_list(benchmark, catalog, client):
+    params = {"category": catalog["categories"][0].pk}
+
+    response = benchmark(client.get, "/api/categories/books/", params)
+
+    assert response.status_code == 200
+
+
+def test_last_access(benchmark, catalog, client):
+    response = benchmark(client.get, "/api/categories/last-access/")
+
+    assert response.status_code == 200
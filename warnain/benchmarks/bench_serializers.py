@@ -0,0 +1,36 @@
+import pytest
+from django.test import RequestFactory
+
+from warnain.printable_books.analytics import annotate_access_stats
+from warnain.printable_books.models import Category, PrintableImage
+from warnain.printable_books.serializers import (
+    CategorySerializer,
+    PrintableImageSerializer,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def context(rf: RequestFactory):
+    return {"request": rf.get("/")}
+
+
+def test_category_serializer(benchmark, catalog, context):
+    categories = list(annotate_access_stats(Category.objects.all()))
+
+    data = benchmark(
+        lambda: CategorySerializer(categories, many=True, context=context).data
+    )
+
+    assert len(data) == len(categories)
+
+
+def test_printable_image_serializer(benchmark, catalog, context):
+    images = list(PrintableImage.objects.all()[:2000])
+
+    data = benchmark(
+        lambda: PrintableImageSerializer(images, many=True, context=context).data
+    )
+
+    assert len(data) == len(images)
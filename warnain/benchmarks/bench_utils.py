@@ -0,0 +1,22 @@
+from warnain.printable_books.utils import parse_ip_addr_output
+
+INTERFACE_TEMPLATE = """\
+{index}: veth{index}@if{index}: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 state UP
+    link/ether aa:bb:cc:dd:ee:{last:02x} brd ff:ff:ff:ff:ff:ff
+    inet 10.{high}.{low}.1/24 brd 10.{high}.{low}.255 scope global veth{index}
+    inet6 fe80::{index:x}/64 scope link
+"""
+
+# Mesin dengan banyak interface virtual (docker, vpn)
+IP_ADDR_OUTPUT = "".join(
+    INTERFACE_TEMPLATE.format(
+        index=index, last=index % 256, high=index // 256, low=index % 256
+    )
+    for index in range(2, 502)
+)
+
+
+def test_parse_ip_addr_output(benchmark):
+    interfaces = benchmark(parse_ip_addr_output, IP_ADDR_OUTPUT)
+
+    assert len(interfaces) == 500
@@ -0,0 +1,96 @@
+"""
+Benchmark untuk hot path katalog, serializer dan utils.
+
+Jalankan dengan pytest-benchmark:
+
+    pytest warnain/benchmarks --benchmark-only \
+        --benchmark-compare=warnain/benchmarks/baseline.json \
+        --benchmark-compare-fail=mean:20%
+
+Baseline di-commit di baseline.json; perbarui dengan
+`--benchmark-json=warnain/benchmarks/baseline.json` dari mesin acuan.
+
+Ukuran katalog bisa diatur lewat BENCH_CATEGORIES, BENCH_IMAGES_PER_CATEGORY
+dan BENCH_ACCESSES.
+"""
+import os
+import random
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from warnain.printable_books.models import Category, CategoryAccess, PrintableImage
+
+BENCH_CATEGORIES = int(os.environ.get("BENCH_CATEGORIES", 500))
+BENCH_IMAGES_PER_CATEGORY = int(os.environ.get("BENCH_IMAGES_PER_CATEGORY", 10))
+BENCH_ACCESSES = int(os.environ.get("BENCH_ACCESSES", 20000))
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix == ".py" and file_path.name.startswith("bench_"):
+        return pytest.Module.from_parent(parent, path=file_path)
+
+
+def pytest_collection_modifyitems(config, items):
+    # Benchmark hanya jalan kalau diminta, bukan bagian dari test suite biasa
+    if config.getoption("benchmark_only", default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark-only")
+    for item in items:
+        if "benchmarks" in item.nodeid.split("/"):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def catalog(django_db_setup, django_db_blocker):
+    """
+    Katalog besar yang di-seed sekali per sesi benchmark
+    """
+    rng = random.Random(42)
+    with django_db_blocker.unblock():
+        user, _ = get_user_model().objects.get_or_create(username="bench-device")
+        categories = Category.objects.bulk_create(
+            [
+                Category(
+                    title=f"Bench category {index:05d}",
+                    thumbnail=f"categories/bench-{index}.png",
+                    popularity=rng.random() * 100,
+                )
+                for index in range(BENCH_CATEGORIES)
+            ]
+        )
+        PrintableImage.objects.bulk_create(
+            [
+                PrintableImage(
+                    category=category,
+                    image=f"printables/bench-{category.pk}-{index}.png",
+                    source=f"https://example.com/{category.pk}/{index}",
+                )
+                for category in categories
+                for index in range(BENCH_IMAGES_PER_CATEGORY)
+            ],
+            batch_size=5000,
+        )
+        now = timezone.now()
+        # Akses tersebar dalam 60 hari terakhir (dalam menit)
+        window = 60 * 24 * 60
+        # Akses condong ke sebagian kecil kategori, seperti pemakaian nyata
+        weights = [1 / (rank + 1) for rank in range(len(categories))]
+        CategoryAccess.objects.bulk_create(
+            [
+                CategoryAccess(
+                    category=category,
+                    user=user,
+                    created=now - timezone.timedelta(minutes=rng.randint(0, window)),
+                )
+                for category in rng.choices(categories, weights, k=BENCH_ACCESSES)
+            ],
+            batch_size=5000,
+        )
+
+    yield {"user": user, "categories": categories}
+
+    with django_db_blocker.unblock():
+        Category.objects.filter(pk__in=[c.pk for c in categories]).delete()
+        user.delete()
@@ -7,6 +7,7 @@ from warnain.users.tests.factories import UserFactory
 @pytest.fixture(autouse=True)
 def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
+    settings.UPLOAD_STAGING_DIR = tmpdir.join("uploads").strpath
 
 
 @pytest.fixture
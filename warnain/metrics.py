@@ -0,0 +1,250 @@
+"""
+Metrik performa sederhana dengan format teks Prometheus.
+
+Setiap proses menyimpan counter dan histogram di memory. Kalau METRICS_DIR
+diisi, state tiap proses ditulis ke `<METRICS_DIR>/<pid>.json` (berkala dan
+saat proses berhenti) supaya endpoint /metrics bisa menjumlahkan semua worker
+gunicorn.
+"""
+import atexit
+import ipaddress
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Bucket per metrik histogram, selain yang ada di sini memakai LATENCY_BUCKETS
+HISTOGRAM_BUCKETS = {
+    "db_queries_per_request": COUNT_BUCKETS,
+}
+
+HELP = {
+    "http_requests_total": "Total HTTP requests",
+    "http_request_duration_seconds": "HTTP request latency",
+    "db_queries_per_request": "Database queries executed per request",
+    "db_query_duration_seconds_total": "Total time spent in database queries",
+    "cache_requests_total": "Cache lookups by result",
+    "cups_call_duration_seconds": "CUPS call latency",
+    "subprocess_duration_seconds": "Subprocess call latency",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        # (name, labels) -> [bucket counts..., sum, count]
+        self.histograms = {}
+        self._last_flush = 0.0
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        with self._lock:
+            self.counters[(name, _label_key(labels))] += amount
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = HISTOGRAM_BUCKETS.get(name, LATENCY_BUCKETS)
+        key = (name, _label_key(labels))
+        with self._lock:
+            state = self.histograms.get(key)
+            if state is None:
+                state = self.histograms[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    [name, list(labels), list(state)]
+                    for (name, labels), state in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force: bool = False):
+        """
+        Tulis state proses ini ke METRICS_DIR (kalau diset)
+        """
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+
+        os.makedirs(directory, exist_ok=True)
+        # Tulis ke file sementara lalu rename supaya pembaca tidak pernah
+        # melihat file setengah jadi
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(self.snapshot(), temp_file)
+        os.replace(temp_path, os.path.join(directory, f"{os.getpid()}.json"))
+
+
+registry = Registry()
+atexit.register(lambda: registry.flush(force=True))
+
+
+def inc(name: str, amount: float = 1, **labels):
+    registry.inc(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    registry.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """
+    Catat durasi blok kode ke histogram `name`
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, **labels)
+
+
+def percentile(values, percent: float) -> float:
+    """
+    Persentil nearest-rank dari daftar nilai (0 kalau kosong)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = math.ceil(percent / 100 * len(ordered)) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def collect() -> dict:
+    """
+    Gabungkan state semua proses (atau proses ini saja tanpa METRICS_DIR)
+    """
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory:
+        snapshots = [registry.snapshot()]
+    else:
+        registry.flush(force=True)
+        snapshots = []
+        for file_name in os.listdir(directory):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, file_name)) as metrics_file:
+                    snapshots.append(json.load(metrics_file))
+            except (OSError, ValueError):
+                # File proses lain sedang diganti, lewati saja
+                continue
+
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, state in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], state)]
+            else:
+                histograms[key] = list(state)
+    return {"counters": counters, "histograms": histograms}
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (
+        '{}="{}"'.format(
+            key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for key, value in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render() -> str:
+    """
+    Metrik dalam format teks Prometheus
+    """
+    data = collect()
+    lines = []
+    seen = set()
+
+    def header(name, metric_type):
+        if name in seen:
+            return
+        seen.add(name)
+        if name in HELP:
+            lines.append(f"# HELP {name} {HELP[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    for (name, labels), value in sorted(data["counters"].items()):
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), state in sorted(data["histograms"].items()):
+        header(name, "histogram")
+        buckets = HISTOGRAM_BUCKETS.get(name, LATENCY_BUCKETS)
+        for bound, count in zip(buckets, state):
+            lines.append(
+                f"{name}_bucket{_format_labels(labels, ('le', str(bound)))} {count}"
+            )
+        lines.append(
+            f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {state[-1]}"
+        )
+        lines.append(f"{name}_sum{_format_labels(labels)} {state[-2]}")
+        lines.append(f"{name}_count{_format_labels(labels)} {state[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def is_allowed_scraper(request) -> bool:
+    """
+    True kalau REMOTE_ADDR masuk METRICS_ALLOWED_IPS (alamat atau network
+    CIDR) atau request dari user staff yang login
+    """
+    if getattr(request, "user", None) is not None and request.user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics_view(request):
+    """
+    Endpoint /metrics untuk Prometheus, hanya untuk scraper yang diizinkan
+    """
+    if not is_allowed_scraper(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4")
@@ -1,7 +1,15 @@
+import json
 import re
+import threading
+import time
+
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 
+from warnain import metrics
+
 
 class CSRFExemptMiddleware(MiddlewareMixin):
     """
@@ -14,3 +22,145 @@ class CSRFExemptMiddleware(MiddlewareMixin):
                 if re.match(url_pattern, request.path_info):
                     setattr(request, "_dont_enforce_csrf_checks", True)
         return None
+
+
+class QueryRecorder:
+    """
+    Execute wrapper yang menghitung jumlah dan durasi query database
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Catat latency, jumlah request dan query database per endpoint.
+
+    Turunan MiddlewareMixin supaya bisa dipakai di WSGI maupun ASGI. Di ASGI
+    process_request/process_response jalan di thread sync milik request, thread
+    yang sama dengan query dari view async (sync_to_async), jadi query tetap
+    terhitung.
+    """
+
+    def process_request(self, request):
+        recorder = QueryRecorder()
+        wrappers = [
+            connection.execute_wrapper(recorder) for connection in connections.all()
+        ]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        request._metrics = (recorder, wrappers, time.perf_counter())
+
+    def process_response(self, request, response):
+        recorder, wrappers, start = request._metrics
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+        endpoint = self.get_endpoint(request)
+        metrics.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - start,
+            endpoint=endpoint,
+            method=request.method,
+        )
+        metrics.inc(
+            "http_requests_total",
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+        )
+        metrics.observe("db_queries_per_request", recorder.count, endpoint=endpoint)
+        metrics.inc(
+            "db_query_duration_seconds_total", recorder.duration, endpoint=endpoint
+        )
+        metrics.registry.flush()
+        return response
+
+    @staticmethod
+    def get_endpoint(request) -> str:
+        # Pakai nama view (bukan path) supaya label tidak meledak karena id
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.view_name or match.route
+
+
+class RequestCaptureMiddleware(MiddlewareMixin):
+    """
+    Simpan request API ke file JSONL (REQUEST_CAPTURE_FILE) untuk diputar
+    ulang dengan `manage.py replay_requests`.
+
+    Header tidak disimpan dan nilai field sensitif (password, token, ...)
+    diganti, jadi file aman dibagikan. Body upload tidak disimpan.
+    """
+
+    SENSITIVE_KEYS = re.compile(r"pass|token|secret|key|auth", re.IGNORECASE)
+    MAX_BODY_SIZE = 64 * 1024
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_CAPTURE_FILE", None):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.path_pattern = re.compile(settings.REQUEST_CAPTURE_PATHS)
+        self._lock = threading.Lock()
+
+    def process_request(self, request):
+        if self.path_pattern.match(request.path_info):
+            request._capture = (self.get_body(request), time.perf_counter())
+
+    def process_response(self, request, response):
+        if not hasattr(request, "_capture"):
+            return response
+
+        body, start = request._capture
+        duration = time.perf_counter() - start
+        record = {
+            "time": time.time() - duration,
+            "method": request.method,
+            "path": request.path_info,
+            "endpoint": MetricsMiddleware.get_endpoint(request),
+            "query": self.sanitize(
+                {key: request.GET.getlist(key) for key in request.GET}
+            ),
+            "body": body,
+            "authenticated": "HTTP_AUTHORIZATION" in request.META,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock, open(settings.REQUEST_CAPTURE_FILE, "a") as capture_file:
+            capture_file.write(line)
+        return response
+
+    def get_body(self, request):
+        # Hanya body JSON kecil yang bisa diputar ulang
+        if request.content_type != "application/json":
+            return None
+        if int(request.META.get("CONTENT_LENGTH") or 0) > self.MAX_BODY_SIZE:
+            return None
+        try:
+            return self.sanitize(json.loads(request.body or b"null"))
+        except ValueError:
+            return None
+
+    def sanitize(self, value):
+        if isinstance(value, dict):
+            return {
+                key: "[redacted]"
+                if self.SENSITIVE_KEYS.search(str(key))
+                else self.sanitize(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.sanitize(item) for item in value]
+        return value
@@ -2,11 +2,15 @@ from django.contrib import admin
 
 from warnain.printable_books.models import (
     Category,
-    PrintableImage,
     CategoryAccess,
-    PrinterSettings,
+    CategoryAccessDaily,
     NetworkInterface,
+    PrintableImage,
+    PrinterSettings,
     PrintJob,
+    PrintJobArchive,
+    RecentCategory,
+    UploadSession,
 )
 
 
@@ -32,6 +36,21 @@ class CategoryAccessAdmin(admin.ModelAdmin):
     ordering = ("-created",)
 
 
+@admin.register(CategoryAccessDaily)
+class CategoryAccessDailyAdmin(admin.ModelAdmin):
+    list_display = ("category", "user", "day", "count")
+    list_filter = ("day",)
+    search_fields = ("category__title", "user__username")
+    ordering = ("-day",)
+
+
+@admin.register(RecentCategory)
+class RecentCategoryAdmin(admin.ModelAdmin):
+    list_display = ("user", "category", "count", "last_accessed")
+    search_fields = ("category__title", "user__username")
+    ordering = ("-last_accessed",)
+
+
 @admin.register(PrinterSettings)
 class PrinterSettingsAdmin(admin.ModelAdmin):
     list_display = ("name", "is_active", "is_default", "created")
@@ -55,3 +74,20 @@ class PrintJobAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "printer_name", "file_path")
     ordering = ("-created",)
     readonly_fields = ("created", "modified")
+    raw_id_fields = ("image",)
+
+
+@admin.register(PrintJobArchive)
+class PrintJobArchiveAdmin(admin.ModelAdmin):
+    list_display = ("job_id", "user_id", "printer_name", "copies", "status", "created")
+    list_filter = ("status", "printer_name")
+    search_fields = ("printer_name",)
+    ordering = ("-created",)
+    readonly_fields = ("archived",)
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "file_name", "received", "size", "status", "expires")
+    list_filter = ("status",)
+    ordering = ("-created",)
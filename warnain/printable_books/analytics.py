@@ -0,0 +1,565 @@
+import math
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import (
+    Abs,
+    Cast,
+    Coalesce,
+    Exp,
+    Greatest,
+    Least,
+    Ln,
+    TruncDate,
+    TruncHour,
+)
+from django.utils import timezone
+
+from warnain import metrics
+from warnain.printable_books.models import (
+    CATEGORY_IDS_CACHE_KEY,
+    Category,
+    CategoryAccess,
+    CategoryAccessDaily,
+    RecentCategory,
+)
+
+# User bersama untuk akses tanpa token, tidak punya riwayat per device
+ANONYMOUS_USERNAME = "anonymous"
+
+
+def day_start(day: date) -> datetime:
+    """
+    Awal hari (timezone lokal) untuk tanggal tertentu
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_rollup_watermark() -> Optional[date]:
+    """
+    Hari terakhir yang sudah direkap ke CategoryAccessDaily
+    """
+    return CategoryAccessDaily.objects.aggregate(day=models.Max("day"))["day"]
+
+
+def get_raw_access_start() -> Optional[datetime]:
+    """
+    Batas waktu mulai CategoryAccess yang belum masuk rekap harian
+    """
+    watermark = get_rollup_watermark()
+    if watermark is None:
+        return None
+    return day_start(watermark + timedelta(days=1))
+
+
+def rollup_category_access(until: Optional[date] = None, batch_size: int = 1000) -> int:
+    """
+    Rekap CategoryAccess ke CategoryAccessDaily secara incremental.
+
+    Hanya hari yang sudah lewat (sampai `until`, default kemarin) yang direkap,
+    jadi satu hari tidak pernah direkap dua kali.
+    """
+    until = until or timezone.localdate() - timedelta(days=1)
+    queryset = CategoryAccess.objects.filter(
+        created__lt=day_start(until + timedelta(days=1))
+    )
+
+    raw_start = get_raw_access_start()
+    if raw_start is not None:
+        queryset = queryset.filter(created__gte=raw_start)
+
+    rows = (
+        queryset.annotate(day=TruncDate("created"))
+        .values("category_id", "user_id", "day")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    )
+
+    total = 0
+    with transaction.atomic():
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(CategoryAccessDaily(**row))
+            if len(batch) >= batch_size:
+                CategoryAccessDaily.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            CategoryAccessDaily.objects.bulk_create(batch)
+            total += len(batch)
+
+    return total
+
+
+def compact_category_access(retention_days: int, batch_size: int = 10000) -> int:
+    """
+    Hapus CategoryAccess yang lebih tua dari `retention_days` dan sudah direkap
+    """
+    raw_start = get_raw_access_start()
+    if raw_start is None:
+        return 0
+
+    cutoff = min(timezone.now() - timedelta(days=retention_days), raw_start)
+
+    total = 0
+    while True:
+        pks = list(
+            CategoryAccess.objects.filter(created__lt=cutoff).values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+        if not pks:
+            break
+        CategoryAccess.objects.filter(pk__in=pks).delete()
+        total += len(pks)
+
+    return total
+
+
+def annotate_access_stats(queryset: models.QuerySet) -> models.QuerySet:
+    """
+    Tambahkan `access_count` dan `latest_access` ke queryset Category,
+    gabungan dari rekap harian dan CategoryAccess yang belum direkap
+    """
+    raw_start = get_raw_access_start()
+
+    daily = CategoryAccessDaily.objects.filter(
+        category_id=models.OuterRef("id")
+    ).order_by()
+    rolled_count = (
+        daily.values("category_id").annotate(total=models.Sum("count")).values("total")
+    )
+    rolled_latest = (
+        daily.values("category_id").annotate(latest=models.Max("day")).values("latest")
+    )
+
+    raw = CategoryAccess.objects.filter(category_id=models.OuterRef("id"))
+    if raw_start is not None:
+        raw = raw.filter(created__gte=raw_start)
+    raw_count = (
+        raw.order_by()
+        .values("category_id")
+        .annotate(total=models.Count("id"))
+        .values("total")
+    )
+
+    # Pakai subquery (bukan JOIN + GROUP BY) supaya hanya dihitung untuk
+    # baris yang benar-benar dikembalikan setelah LIMIT
+    return queryset.annotate(
+        access_count=Coalesce(
+            models.Subquery(rolled_count, output_field=models.IntegerField()), 0
+        )
+        + Coalesce(models.Subquery(raw_count, output_field=models.IntegerField()), 0),
+        latest_access=Coalesce(
+            models.Subquery(
+                CategoryAccess.objects.filter(category_id=models.OuterRef("id"))
+                .order_by("-created")
+                .values("created")[:1]
+            ),
+            Cast(
+                models.Subquery(rolled_latest, output_field=models.DateField()),
+                models.DateTimeField(),
+            ),
+        ),
+    )
+
+
+def get_access_count(category) -> int:
+    """
+    Jumlah akses satu kategori (rekap harian + yang belum direkap)
+    """
+    raw_start = get_raw_access_start()
+    raw = CategoryAccess.objects.filter(category=category)
+    if raw_start is not None:
+        raw = raw.filter(created__gte=raw_start)
+
+    rolled = CategoryAccessDaily.objects.filter(category=category).aggregate(
+        total=models.Sum("count")
+    )["total"]
+    return (rolled or 0) + raw.count()
+
+
+def get_popularity_rate() -> float:
+    """
+    Laju peluruhan per detik dari CATEGORY_POPULARITY_HALF_LIFE_DAYS
+    """
+    return math.log(2) / (settings.CATEGORY_POPULARITY_HALF_LIFE_DAYS * 86400)
+
+
+def popularity_key(when: datetime, weight: float = 1) -> float:
+    """
+    Nilai log-space untuk `weight` akses pada waktu `when`.
+
+    Skor saat ini = exp(key - rate * now), jadi urutan key sama dengan urutan
+    skor yang sudah meluruh dan tidak perlu dihitung ulang seiring waktu.
+    """
+    return when.timestamp() * get_popularity_rate() + math.log(weight)
+
+
+def logsumexp(keys: list) -> float:
+    """
+    Gabungkan beberapa key log-space menjadi satu
+    """
+    peak = max(keys)
+    return peak + math.log(sum(math.exp(key - peak) for key in keys))
+
+
+def bump_popularity(category_id: int, when: Optional[datetime] = None, weight: int = 1):
+    """
+    Tambah skor popularitas kategori dalam O(1), atomik di database
+    """
+    add_popularity_key(category_id, popularity_key(when or timezone.now(), weight))
+
+
+def add_popularity_key(category_id: int, key: float):
+    """
+    popularity = logaddexp(popularity, key), dihitung sebagai
+    max(a, b) + ln(1 + exp(-|a - b|)) supaya tidak overflow. Selisih dibatasi
+    50 karena exp() di PostgreSQL error saat underflow.
+    """
+    key = models.Value(key)
+    current = models.F("popularity")
+    Category.objects.filter(pk=category_id).update(
+        popularity=Greatest(current, key)
+        + Ln(models.Value(1.0) + Exp(-Least(Abs(current - key), models.Value(50.0))))
+    )
+
+
+def logaddexp(current: Optional[float], key: float) -> float:
+    """
+    Tambahkan satu key log-space ke skor berjalan (None = belum ada akses)
+    """
+    if current is None:
+        return key
+    return max(current, key) + math.log1p(math.exp(-abs(current - key)))
+
+
+def refresh_popularity() -> int:
+    """
+    Hitung ulang skor popularitas semua kategori dari rekap harian dan
+    CategoryAccess mentah. Dipakai untuk renormalisasi berkala, misalnya
+    setelah half-life diubah.
+
+    Akses mentah dijumlahkan per (kategori, jam) di database dan skor dilipat
+    per kategori, jadi memory hanya sebanding jumlah kategori. Baris kategori
+    dikunci selama hitung ulang: bump_popularity dari akses baru menunggu dan
+    ditambahkan di atas skor baru, tidak tertimpa.
+    """
+    scores = {}
+    with transaction.atomic():
+        category_ids = list(
+            Category.objects.select_for_update()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        daily = (
+            CategoryAccessDaily.objects.values("category_id", "day")
+            .annotate(total=models.Sum("count"))
+            .order_by()
+        )
+        for row in daily.iterator():
+            # Akses dalam satu hari dianggap terjadi di tengah hari
+            when = day_start(row["day"]) + timedelta(hours=12)
+            key = popularity_key(when, row["total"])
+            scores[row["category_id"]] = logaddexp(scores.get(row["category_id"]), key)
+
+        raw = CategoryAccess.objects.all()
+        raw_start = get_raw_access_start()
+        if raw_start is not None:
+            raw = raw.filter(created__gte=raw_start)
+        hourly = (
+            raw.annotate(hour=TruncHour("created"))
+            .values("category_id", "hour")
+            .annotate(total=models.Count("id"))
+            .order_by()
+        )
+        for row in hourly.iterator():
+            # Akses dalam satu jam dianggap terjadi di tengah jam
+            when = row["hour"] + timedelta(minutes=30)
+            key = popularity_key(when, row["total"])
+            scores[row["category_id"]] = logaddexp(scores.get(row["category_id"]), key)
+
+        categories = [
+            Category(pk=category_id, popularity=scores.get(category_id, 0))
+            for category_id in category_ids
+        ]
+        Category.objects.bulk_update(categories, ["popularity"], batch_size=1000)
+    return len(categories)
+
+
+def get_anonymous_user():
+    """
+    User bersama untuk tracking akses tanpa token
+    """
+    user, _ = get_user_model().objects.get_or_create(
+        username=ANONYMOUS_USERNAME,
+        defaults={
+            "email": "anonymous@example.com",
+        },
+    )
+    return user
+
+
+def is_device_user(user) -> bool:
+    """
+    True untuk user per device (token), bukan user anonymous bersama
+    """
+    return bool(
+        user and user.is_authenticated and user.get_username() != ANONYMOUS_USERNAME
+    )
+
+
+def remember_category(user, category_id: int, when: datetime, count: int = 1):
+    """
+    Upsert riwayat kategori device dan batasi jumlahnya ke RECENT_CATEGORY_LIMIT
+    """
+    updated = RecentCategory.objects.filter(user=user, category_id=category_id).update(
+        count=models.F("count") + count,
+        last_accessed=Greatest(models.F("last_accessed"), models.Value(when)),
+    )
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            RecentCategory.objects.create(
+                user=user, category_id=category_id, count=count, last_accessed=when
+            )
+    except IntegrityError:
+        # Request lain dari device yang sama sudah membuat barisnya duluan
+        remember_category(user, category_id, when, count)
+        return
+
+    # Baris baru, buang riwayat paling lama yang melewati batas
+    limit = settings.RECENT_CATEGORY_LIMIT
+    stale = RecentCategory.objects.filter(user=user).order_by("-last_accessed")[limit:]
+    stale_ids = list(stale.values_list("pk", flat=True))
+    if stale_ids:
+        RecentCategory.objects.filter(pk__in=stale_ids).delete()
+
+
+def get_recent_categories(user, limit: int = 20) -> list:
+    """
+    Kategori terakhir yang dibuka, tanpa duplikat. Per device kalau user
+    punya token, selain itu riwayat global.
+    """
+    if is_device_user(user):
+        recents = (
+            RecentCategory.objects.filter(user=user)
+            .select_related("category")
+            .order_by("-last_accessed")[:limit]
+        )
+        return [recent.category for recent in recents]
+
+    # Riwayat global: ambil beberapa kali lipat supaya tetap dapat `limit`
+    # kategori unik setelah duplikat dibuang
+    history_limit = limit * 5
+    histories = CategoryAccess.objects.select_related("category").order_by("-created")
+    categories = {}
+    for history in histories[:history_limit]:
+        categories.setdefault(history.category_id, history.category)
+        if len(categories) >= limit:
+            break
+    return list(categories.values())
+
+
+class PersonalCategoryOrder:
+    """
+    Queryset Category untuk sort_by=personal: kategori dari riwayat device
+    (paling sering, lalu paling baru dibuka) di depan, sisanya urut
+    popularitas. Riwayat diambil lewat recentcategory_user_last_idx (maksimal
+    RECENT_CATEGORY_LIMIT baris), sisanya memakai category_popularity_idx,
+    jadi tidak ada subquery per kategori. Bisa dipotong (slice) oleh
+    paginator.
+    """
+
+    def __init__(self, queryset: models.QuerySet, user):
+        limit = settings.RECENT_CATEGORY_LIMIT
+        recents = sorted(
+            RecentCategory.objects.filter(user=user)
+            .order_by("-last_accessed")
+            .values_list("category_id", "count", "last_accessed")[:limit],
+            key=lambda recent: (-recent[1], -recent[2].timestamp()),
+        )
+        self.personal_ids = [category_id for category_id, _, _ in recents]
+        self.queryset = queryset
+        self.rest = queryset.exclude(pk__in=self.personal_ids).order_by(
+            "-popularity", "title"
+        )
+        self._personal: Optional[list] = None
+
+    @property
+    def personal(self) -> list:
+        if self._personal is None:
+            found = self.queryset.order_by().in_bulk(self.personal_ids)
+            self._personal = [
+                found[category_id]
+                for category_id in self.personal_ids
+                if category_id in found
+            ]
+        return self._personal
+
+    def count(self) -> int:
+        return self.queryset.count()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, key: slice) -> list:
+        start, stop = key.start or 0, key.stop
+        if stop is None:
+            stop = self.count()
+        head = self.personal[start:stop]
+        # Posisi di bagian popularitas setelah kategori riwayat
+        rest_start = max(start - len(self.personal), 0)
+        rest_stop = stop - len(self.personal)
+        if rest_stop <= rest_start:
+            return head
+        return head + list(self.rest[rest_start:rest_stop])
+
+
+def get_debounce_identity(user, device: Optional[str] = None) -> Optional[str]:
+    """
+    Identitas pengakses untuk debounce: user device kalau ada, selain itu
+    device/IP. None kalau pengakses tidak bisa dibedakan.
+    """
+    if is_device_user(user):
+        return f"user:{user.pk}"
+    if device:
+        return f"device:{device}"
+    return None
+
+
+def claim_access(identity: Optional[str], category_id: int, when: datetime) -> bool:
+    """
+    True kalau akses perlu disimpan, False kalau sudah ada akses yang sama
+    dalam window CATEGORY_ACCESS_DEBOUNCE_SECONDS (cek lewat cache, tanpa DB)
+    """
+    window = settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS
+    if window <= 0 or identity is None:
+        return True
+
+    bucket = int(when.timestamp() // window)
+    key = f"printable_books:access:{identity}:{category_id}:{bucket}"
+    claimed = cache.add(key, 1, window)
+    # "hit" berarti akses duplikat yang tidak perlu ditulis ke database
+    metrics.inc(
+        "cache_requests_total",
+        cache="access_debounce",
+        result="miss" if claimed else "hit",
+    )
+    return claimed
+
+
+def record_category_access(
+    category: Category, user=None, device: Optional[str] = None
+) -> Optional[CategoryAccess]:
+    """
+    Simpan satu akses kategori, perbarui skor popularitas dan riwayat device.
+
+    Akses tanpa user device dicatat atas nama user anonymous. Mengembalikan
+    None kalau akses ini duplikat dalam window debounce.
+    """
+    now = timezone.now()
+    if not claim_access(get_debounce_identity(user, device), category.pk, now):
+        return None
+
+    if not is_device_user(user):
+        user = get_anonymous_user()
+
+    # Transaksi pendek hanya untuk penulisan, view pemanggil tidak atomic
+    with transaction.atomic():
+        access = CategoryAccess.objects.create(
+            user=user, category=category, created=now
+        )
+        bump_popularity(category.pk, access.created)
+        if is_device_user(user):
+            remember_category(user, category.pk, access.created)
+    return access
+
+
+def get_category_ids() -> set:
+    """
+    Set id semua kategori, di-cache sampai ada kategori yang berubah
+    """
+    category_ids = cache.get(CATEGORY_IDS_CACHE_KEY)
+    if category_ids is not None:
+        metrics.inc("cache_requests_total", cache="category_ids", result="hit")
+        return category_ids
+
+    metrics.inc("cache_requests_total", cache="category_ids", result="miss")
+    category_ids = set(Category.objects.values_list("id", flat=True))
+    cache.set(CATEGORY_IDS_CACHE_KEY, category_ids, settings.CATEGORY_IDS_CACHE_TIMEOUT)
+    return category_ids
+
+
+def get_earliest_access_time(now: datetime) -> datetime:
+    """
+    Waktu paling lama yang masih diterima untuk event dari device: tidak lebih
+    tua dari TRACK_BATCH_MAX_AGE_DAYS dan tidak sebelum hari yang sudah
+    direkap (supaya tetap terhitung)
+    """
+    earliest = now - timedelta(days=settings.TRACK_BATCH_MAX_AGE_DAYS)
+    raw_start = get_raw_access_start()
+    if raw_start is not None:
+        earliest = max(earliest, raw_start)
+    return earliest
+
+
+def clamp_access_time(
+    when: Optional[datetime], now: datetime, earliest: datetime
+) -> datetime:
+    """
+    Batasi waktu event ke rentang [earliest, now]
+    """
+    if when is None or when > now:
+        return now
+    return max(when, earliest)
+
+
+def record_category_accesses(events: list) -> list:
+    """
+    Simpan banyak akses sekaligus. `events` berisi tuple (category_id, user, when).
+
+    Semua CategoryAccess ditulis dengan satu bulk_create, popularitas dan
+    riwayat device diperbarui sekali per kategori / per (user, kategori).
+    Event untuk kategori yang sudah dihapus dilewati.
+    """
+    with transaction.atomic():
+        # Id dari cache get_category_ids bisa sudah basi, satu kategori yang
+        # baru dihapus tidak boleh menggagalkan seluruh batch
+        existing = set(
+            Category.objects.filter(pk__in={event[0] for event in events})
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+        events = [event for event in events if event[0] in existing]
+        accesses = CategoryAccess.objects.bulk_create(
+            [
+                CategoryAccess(category_id=category_id, user=user, created=when)
+                for category_id, user, when in events
+            ]
+        )
+
+        keys = defaultdict(list)
+        recents = {}
+        for category_id, user, when in events:
+            keys[category_id].append(popularity_key(when))
+            if is_device_user(user):
+                count, last = recents.get((user, category_id), (0, when))
+                recents[(user, category_id)] = (count + 1, max(last, when))
+
+        # Urutan pk sama dengan refresh_popularity supaya tidak deadlock
+        for category_id, category_keys in sorted(keys.items()):
+            add_popularity_key(category_id, logsumexp(category_keys))
+
+        for (user, category_id), (count, last) in recents.items():
+            remember_category(user, category_id, last, count)
+
+    return accesses
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class PrintableBooksConfig(AppConfig):
+    name = "warnain.printable_books"
+
+    def ready(self):
+        try:
+            import warnain.printable_books.signals  # noqa F401
+        except ImportError:
+            pass
@@ -0,0 +1,186 @@
+"""
+Buku mewarnai satu kategori dalam satu PDF siap cetak.
+
+Semua PrintableImage kategori dirender (raster 1-bit/grayscale seperti
+printing.py) menjadi satu PDF multi-halaman, jadi "cetak buku ini" cukup satu
+job CUPS. Imposition:
+
+- "single": satu gambar per halaman
+- "2up": dua gambar berdampingan di kertas landscape
+- "booklet": 2-up dengan urutan lipat tengah (saddle stitch), dicetak bolak
+  balik short-edge lalu dilipat jadi buku setengah ukuran kertas
+
+PDF di-cache dengan key id + hash semua gambar kategori, jadi hanya dibuat
+ulang kalau ada gambar yang ditambah, dihapus atau diganti.
+"""
+import logging
+import math
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from PIL import Image
+
+from warnain import metrics
+from warnain.printable_books.models import Category, PrintableImage
+from warnain.printable_books.pdf import PAPER_SIZES, Page, mm_to_points, write_pdf
+from warnain.printable_books.printing import (
+    MONOCHROME_OPTIONS,
+    PrintLayout,
+    layout_page,
+    place_image,
+)
+from warnain.utils.disk_cache import get_cache
+
+# Naikkan kalau cara render berubah supaya booklet lama tidak dipakai
+BOOKLET_VERSION = 1
+IMPOSITIONS = ("single", "2up", "booklet")
+
+logger = logging.getLogger(__name__)
+
+
+def impose(count: int, imposition: str) -> List[List[Optional[int]]]:
+    """
+    Indeks gambar per sisi kertas (None = slot kosong)
+    """
+    if imposition == "single":
+        return [[index] for index in range(count)]
+    if imposition == "2up":
+        return [
+            [index, index + 1 if index + 1 < count else None]
+            for index in range(0, count, 2)
+        ]
+
+    # Booklet: jumlah halaman dibulatkan ke kelipatan 4, setiap lembar berisi
+    # halaman luar (depan) dan dalam (belakang) untuk dilipat di tengah
+    total = math.ceil(count / 4) * 4
+    sides = []
+    for sheet in range(total // 4):
+        sides.append([total - 1 - 2 * sheet, 2 * sheet])
+        sides.append([2 * sheet + 1, total - 2 - 2 * sheet])
+    return [[index if index < count else None for index in side] for side in sides]
+
+
+def render_image(printable: PrintableImage, render: Callable):
+    """
+    `render(image)` selama file gambar terbuka, None kalau file hilang atau
+    rusak (halaman dibiarkan kosong, booklet tetap jadi)
+    """
+    try:
+        with printable.image.open("rb"), Image.open(printable.image) as image:
+            return render(image)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        logger.warning(
+            "Gambar %s dilewati di booklet", printable.image.name, exc_info=True
+        )
+        return None
+
+
+def booklet_pages(
+    images: List[PrintableImage], layout: PrintLayout, imposition: str
+) -> Iterator[Page]:
+    """
+    Halaman PDF satu per satu, hanya gambar satu sisi kertas yang ada di
+    memory pada satu waktu
+    """
+    dpi, mode = settings.PRINT_DPI, settings.PRINT_COLOR_MODE
+    paper_width, paper_height = PAPER_SIZES[layout.paper_size]
+    margin = mm_to_points(settings.PRINT_MARGIN_MM)
+
+    for side in impose(len(images), imposition):
+        if imposition == "single":
+            page = render_image(
+                images[side[0]], lambda image: layout_page(image, layout, dpi, mode)
+            )
+            yield page or Page(paper_width, paper_height)
+            continue
+
+        # 2-up: kertas landscape dibagi dua, setiap setengah punya margin sendiri
+        width, height = paper_height, paper_width
+        page = Page(width, height)
+        for slot, index in enumerate(side):
+            if index is None:
+                continue
+            box = (
+                slot * width / 2 + margin,
+                margin,
+                width / 2 - 2 * margin,
+                height - 2 * margin,
+            )
+            placed = render_image(
+                images[index],
+                lambda image: place_image(image, box, layout.fit, dpi, mode),
+            )
+            if placed is not None:
+                page.images.append(placed)
+        yield page
+
+
+def booklet_key(
+    category: Category,
+    images: List[PrintableImage],
+    layout: PrintLayout,
+    imposition: str,
+) -> str:
+    pages = ",".join(
+        f"{image.pk}:{image.image_hash or image.image.name}" for image in images
+    )
+    return (
+        f"booklet:{BOOKLET_VERSION}:{category.pk}:{layout.key}:{imposition}:"
+        f"{settings.PRINT_DPI}:{settings.PRINT_COLOR_MODE}:{pages}"
+    )
+
+
+def get_category_booklet(
+    category: Category,
+    images: List[PrintableImage],
+    layout: PrintLayout = None,
+    imposition: str = "single",
+) -> str:
+    """
+    Path PDF booklet `category` dari `images` (sudah diurutkan), dibuat
+    sekali lalu diambil dari cache disk. Tidak mengakses database.
+    """
+    if imposition not in IMPOSITIONS:
+        raise ValueError(f"Imposition {imposition} tidak dikenal")
+    if not images:
+        raise ValueError("Kategori tidak punya gambar")
+    layout = layout or PrintLayout()
+    cache = get_cache("print", settings.PRINT_CACHE_MAX_BYTES)
+    key = booklet_key(category, images, layout, imposition)
+    path = cache.get(key, ".pdf")
+    metrics.inc(
+        "cache_requests_total",
+        cache="booklet",
+        result="miss" if path is None else "hit",
+    )
+    if path is None:
+        path = cache.get_or_create(
+            key,
+            lambda file: write_pdf(booklet_pages(images, layout, imposition), file),
+            ".pdf",
+        )
+    return path
+
+
+def booklet_options(imposition: str, duplex: bool) -> dict:
+    """
+    Opsi job CUPS: booklet selalu bolak-balik short-edge (lembar landscape
+    dibalik di sisi pendek), duplex biasa long-edge untuk halaman portrait
+    """
+    options = dict(MONOCHROME_OPTIONS)
+    if imposition == "booklet" or (duplex and imposition == "2up"):
+        options["sides"] = "two-sided-short-edge"
+    elif duplex:
+        options["sides"] = "two-sided-long-edge"
+    return options
+
+
+def get_booklet_file(
+    category: Category,
+    images: List[PrintableImage],
+    layout: PrintLayout,
+    imposition: str,
+    duplex: bool,
+) -> Tuple[str, dict]:
+    path = get_category_booklet(category, images, layout, imposition)
+    return path, booklet_options(imposition, duplex)
@@ -0,0 +1,238 @@
+"""
+Simulator CUPS untuk load test jalur print tanpa printer asli.
+
+Aktifkan dengan CUPS_CONNECTION_CLASS = "warnain.printable_books.fake_cups.Connection".
+`Connection` meniru bagian API pycups yang dipakai aplikasi (getPrinters,
+getPrinterAttributes, printFile, getJobs). Antrian disimpan di memory proses,
+jadi setiap worker gunicorn punya simulator sendiri.
+
+Setiap printer mencetak job satu per satu dengan kecepatan FAKE_CUPS_DRAIN_RATE
+halaman per detik (satu copy = satu halaman). Status job dihitung dari waktu,
+tidak ada thread background. Fault bisa diset lewat FAKE_CUPS_FAULTS atau
+`server.set_fault()`:
+
+- "stopped": printer berhenti dan menolak job baru
+- "paper-out": job baru diterima tapi tertahan sampai fault dihapus
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+# Nilai IPP, sama dengan konstanta di modul cups
+IPP_PRINTER_IDLE = 3
+IPP_PRINTER_PROCESSING = 4
+IPP_PRINTER_STOPPED = 5
+IPP_JOB_PENDING = 3
+IPP_JOB_HELD = 4
+IPP_JOB_PROCESSING = 5
+IPP_JOB_COMPLETED = 9
+IPP_NOT_FOUND = 0x0406
+IPP_NOT_ACCEPTING = 0x0506
+
+FAULT_STOPPED = "stopped"
+FAULT_PAPER_OUT = "paper-out"
+FAULTS = (FAULT_STOPPED, FAULT_PAPER_OUT)
+
+
+class IPPError(Exception):
+    """Sama seperti cups.IPPError: args berisi (status, pesan)"""
+
+
+class FakeJob:
+    def __init__(self, job_id: int, printer: str, title: str, pages: int):
+        self.id = job_id
+        self.printer = printer
+        self.title = title
+        self.pages = pages
+        self.created = time.time()
+        # Diisi saat job dijadwalkan, None selama tertahan (paper-out)
+        self.started: Optional[float] = None
+        self.completed: Optional[float] = None
+
+    def state(self, now: float) -> int:
+        if self.started is None:
+            return IPP_JOB_HELD
+        if now < self.started:
+            return IPP_JOB_PENDING
+        if now < self.completed:
+            return IPP_JOB_PROCESSING
+        return IPP_JOB_COMPLETED
+
+
+class FakeCupsServer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, printers=None, latency=None, drain_rate=None, faults=None):
+        """
+        Kosongkan antrian dan muat ulang konfigurasi (default dari settings)
+        """
+        with self._lock:
+            self.latency = settings.FAKE_CUPS_LATENCY if latency is None else latency
+            self.drain_rate = (
+                settings.FAKE_CUPS_DRAIN_RATE if drain_rate is None else drain_rate
+            )
+            self.printers = list(
+                settings.FAKE_CUPS_PRINTERS if printers is None else printers
+            )
+            self.faults = dict(settings.FAKE_CUPS_FAULTS if faults is None else faults)
+            self.jobs: Dict[int, FakeJob] = {}
+            self._busy_until = {name: 0.0 for name in self.printers}
+            self._next_job_id = 1
+
+    def set_fault(self, printer: str, fault: Optional[str]):
+        """
+        Pasang fault ("stopped"/"paper-out") atau hapus dengan None
+        """
+        if fault is not None and fault not in FAULTS:
+            raise ValueError(f"Unknown fault {fault!r}, expected one of {FAULTS}")
+        with self._lock:
+            if fault is None:
+                self.faults.pop(printer, None)
+                # Job yang tertahan mulai dicetak lagi
+                for job in self.jobs.values():
+                    if job.printer == printer and job.started is None:
+                        self._schedule(job)
+            else:
+                self.faults[printer] = fault
+
+    def _schedule(self, job: FakeJob):
+        start = max(time.time(), self._busy_until[job.printer])
+        job.started = start
+        job.completed = start + job.pages / self.drain_rate
+        self._busy_until[job.printer] = job.completed
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def printer_attributes(self, name: str) -> dict:
+        now = time.time()
+        fault = self.faults.get(name)
+        queued = [
+            job
+            for job in self.jobs.values()
+            if job.printer == name and job.state(now) != IPP_JOB_COMPLETED
+        ]
+
+        if fault == FAULT_STOPPED:
+            state, message, reason = IPP_PRINTER_STOPPED, "Printer stopped", "paused"
+        elif fault == FAULT_PAPER_OUT:
+            state, message, reason = (
+                IPP_PRINTER_STOPPED,
+                "Media empty",
+                "media-empty-error",
+            )
+        elif any(job.state(now) == IPP_JOB_PROCESSING for job in queued):
+            state, message, reason = IPP_PRINTER_PROCESSING, "", "none"
+        else:
+            state, message, reason = IPP_PRINTER_IDLE, "", "none"
+
+        return {
+            "printer-info": f"Simulated printer {name}",
+            "printer-location": "fake-cups",
+            "printer-make-and-model": "Fake CUPS printer",
+            "printer-state": state,
+            "printer-state-message": message,
+            "printer-state-reasons": [reason],
+            "printer-is-accepting-jobs": fault != FAULT_STOPPED,
+            "printer-uri-supported": f"ipp://localhost/printers/{name}",
+            "queued-job-count": len(queued),
+        }
+
+    def get_printers(self) -> dict:
+        self._wait()
+        with self._lock:
+            return {name: self.printer_attributes(name) for name in self.printers}
+
+    def get_printer_attributes(self, name: str) -> dict:
+        self._wait()
+        with self._lock:
+            if name not in self.printers:
+                raise IPPError(IPP_NOT_FOUND, "client-error-not-found")
+            return self.printer_attributes(name)
+
+    def print_file(self, printer: str, filename: str, title: str, options: dict) -> int:
+        self._wait()
+        with self._lock:
+            if printer not in self.printers:
+                raise IPPError(IPP_NOT_FOUND, "client-error-not-found")
+            if self.faults.get(printer) == FAULT_STOPPED:
+                raise IPPError(
+                    IPP_NOT_ACCEPTING, f"Destination {printer} is not accepting jobs."
+                )
+
+            job = FakeJob(
+                self._next_job_id, printer, title, max(int(options.get("copies", 1)), 1)
+            )
+            self._next_job_id += 1
+            self.jobs[job.id] = job
+            if self.faults.get(printer) != FAULT_PAPER_OUT:
+                self._schedule(job)
+            return job.id
+
+    def get_jobs(self, which_jobs: str = "not-completed") -> dict:
+        self._wait()
+        now = time.time()
+        with self._lock:
+            result = {}
+            for job in self.jobs.values():
+                state = job.state(now)
+                completed = state == IPP_JOB_COMPLETED
+                if which_jobs == "not-completed" and completed:
+                    continue
+                if which_jobs == "completed" and not completed:
+                    continue
+                result[job.id] = {
+                    "job-name": job.title,
+                    "job-state": state,
+                    "job-printer-uri": f"ipp://localhost/printers/{job.printer}",
+                    "job-media-sheets-completed": job.pages if completed else 0,
+                    "time-at-creation": int(job.created),
+                    "time-at-completed": int(job.completed) if completed else None,
+                }
+            return result
+
+
+server = FakeCupsServer()
+
+
+class Connection:
+    """
+    Pengganti cups.Connection yang memakai simulator bersama `server`
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.server = server
+
+    def getPrinters(self):
+        return self.server.get_printers()
+
+    def getPrinterAttributes(self, name=None, uri=None, requested_attributes=None):
+        attributes = self.server.get_printer_attributes(name)
+        if requested_attributes:
+            return {
+                key: attributes[key]
+                for key in requested_attributes
+                if key in attributes
+            }
+        return attributes
+
+    def printFile(self, printer, filename, title, options):
+        return self.server.print_file(printer, filename, title, options)
+
+    def getJobs(
+        self,
+        which_jobs="not-completed",
+        my_jobs=False,
+        limit=-1,
+        first_job_id=-1,
+        requested_attributes=None,
+    ):
+        jobs = self.server.get_jobs(which_jobs)
+        if limit > 0:
+            jobs = dict(sorted(jobs.items())[:limit])
+        return jobs
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from warnain.printable_books.models import PrintJob, PrintJobArchive
+
+# Job yang masih berjalan tidak boleh diarsip
+ACTIVE_STATUSES = ("pending", "printing")
+
+
+class Command(BaseCommand):
+    help = "Move print jobs older than the retention window into PrintJobArchive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.PRINT_JOB_RETENTION_DAYS,
+            help="Archive jobs older than this many days "
+            "(default: PRINT_JOB_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows moved per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the jobs that would be archived",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        batch_size = options["batch_size"]
+        cutoff = timezone.now() - timedelta(days=days)
+
+        queryset = PrintJob.objects.filter(created__lt=cutoff).exclude(
+            status__in=ACTIVE_STATUSES
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{queryset.count()} print jobs older than {days} days would be archived"
+            )
+            return
+
+        total = 0
+        while True:
+            # Batch kecil supaya lock dan transaksi tetap pendek
+            with transaction.atomic():
+                jobs = list(
+                    queryset.order_by("pk").select_for_update(skip_locked=True)[
+                        :batch_size
+                    ]
+                )
+                if not jobs:
+                    break
+
+                PrintJobArchive.objects.bulk_create(
+                    [
+                        PrintJobArchive(
+                            job_id=job.pk,
+                            user_id=job.user_id,
+                            printer_name=job.printer_name,
+                            copies=job.copies,
+                            status=job.status,
+                            error_message=job.error_message,
+                            created=job.created,
+                        )
+                        for job in jobs
+                    ],
+                    ignore_conflicts=True,
+                )
+                PrintJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+            total += len(jobs)
+            self.stdout.write(f"Archived {total} print jobs...")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ {total} print jobs older than {days} days archived")
+        )
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from warnain.printable_books.models import (
+    IMAGE_METADATA_KEYS,
+    Category,
+    PrintableImage,
+    set_image_metadata,
+)
+from warnain.utils.media import image_metadata
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute missing image metadata (content hash, size, dimensions, "
+        "BlurHash) for thumbnails and printable images"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute metadata of every image, not only the missing ones",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per update batch"
+        )
+
+    def handle(self, *args, **options):
+        # Banyak baris memakai file yang sama (import/seed), dibaca sekali per file
+        self.metadata = {}
+        for model in (Category, PrintableImage):
+            for name in model.image_metadata_fields:
+                updated, missing = self.backfill(
+                    model, name, options["all"], options["batch_size"]
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✓ {updated} {model._meta.verbose_name_plural} updated"
+                    )
+                )
+                if missing:
+                    self.stdout.write(
+                        self.style.WARNING(f"{missing} files not found in storage")
+                    )
+
+    def backfill(self, model, name, recompute, batch_size):
+        fields = [f"{name}_{key}" for key in IMAGE_METADATA_KEYS]
+        queryset = model.objects.exclude(**{name: ""}).only("pk", name, *fields)
+        if not recompute:
+            queryset = queryset.filter(
+                Q(**{f"{name}_hash": ""})
+                | Q(**{f"{name}_bytes__isnull": True})
+                | Q(**{f"{name}_width__isnull": True})
+            )
+
+        updated = missing = 0
+        batch = []
+        for instance in queryset.iterator(chunk_size=batch_size):
+            field_file = getattr(instance, name)
+            if field_file.name not in self.metadata:
+                try:
+                    self.metadata[field_file.name] = image_metadata(field_file)
+                except OSError:
+                    self.metadata[field_file.name] = None
+            metadata = self.metadata[field_file.name]
+            if metadata is None:
+                missing += 1
+                continue
+            set_image_metadata(instance, name, metadata)
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                updated += model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            updated += model.objects.bulk_update(batch, fields)
+        return updated, missing
@@ -0,0 +1,166 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from warnain.metrics import percentile
+from warnain.printable_books import fake_cups
+from warnain.printable_books.models import PrintJob
+from warnain.printable_books.utils import get_cups_connection, print_file
+
+FAKE_CUPS_CONNECTION = "warnain.printable_books.fake_cups.Connection"
+BENCHMARK_USERNAME = "benchmark-print"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure print submission throughput and job completion latency "
+        "against the simulated CUPS backend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jobs", type=int, default=100, help="Number of jobs to submit"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=10, help="Parallel submissions"
+        )
+        parser.add_argument(
+            "--printer", help="Target printer (default: first FAKE_CUPS_PRINTERS)"
+        )
+        parser.add_argument("--copies", type=int, default=1, help="Copies per job")
+        parser.add_argument(
+            "--latency",
+            type=float,
+            help="Seconds per CUPS call (default: FAKE_CUPS_LATENCY)",
+        )
+        parser.add_argument(
+            "--drain-rate",
+            type=float,
+            help="Pages per second per printer (default: FAKE_CUPS_DRAIN_RATE)",
+        )
+        parser.add_argument(
+            "--fault",
+            choices=fake_cups.FAULTS,
+            help="Inject a fault on the target printer before submitting",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait for the queue to drain",
+        )
+        parser.add_argument(
+            "--keep-jobs",
+            action="store_true",
+            help="Keep the PrintJob rows created by the benchmark",
+        )
+
+    def handle(self, *args, **options):
+        # Jangan sampai benchmark mencetak ratusan halaman di printer asli
+        if settings.CUPS_CONNECTION_CLASS != FAKE_CUPS_CONNECTION:
+            raise CommandError(
+                f"benchmark_print only runs against the simulator, "
+                f"set CUPS_CONNECTION_CLASS={FAKE_CUPS_CONNECTION}"
+            )
+
+        server = fake_cups.server
+        server.reset(latency=options["latency"], drain_rate=options["drain_rate"])
+        printer = options["printer"] or server.printers[0]
+        if printer not in server.printers:
+            raise CommandError(f"Printer {printer} is not simulated")
+        if options["fault"]:
+            server.set_fault(printer, options["fault"])
+
+        user, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USERNAME)
+        fd, file_path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+
+        def submit(index):
+            # Sama seperti view print: catat job, kirim ke CUPS, update status
+            start = time.perf_counter()
+            try:
+                job = PrintJob.objects.create(
+                    user=user,
+                    printer_name=printer,
+                    file_path=file_path,
+                    copies=options["copies"],
+                    status="pending",
+                )
+                success, message = print_file(
+                    printer,
+                    file_path,
+                    options["copies"],
+                    job_title=f"benchmark-{index}",
+                )
+                job.status = "completed" if success else "failed"
+                job.error_message = "" if success else message
+                job.save(update_fields=["status", "error_message", "modified"])
+                return success, time.perf_counter() - start
+            finally:
+                if options["concurrency"] > 1:
+                    connection.close()
+
+        try:
+            started = time.perf_counter()
+            if options["concurrency"] > 1:
+                with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                    results = list(pool.map(submit, range(options["jobs"])))
+            else:
+                results = [submit(index) for index in range(options["jobs"])]
+            elapsed = time.perf_counter() - started
+
+            drained = self.wait_for_queue(options["timeout"])
+        finally:
+            os.remove(file_path)
+            if not options["keep_jobs"]:
+                PrintJob.objects.filter(user=user).delete()
+
+        submitted = [duration for success, duration in results if success]
+        completion = [
+            job.completed - job.created
+            for job in server.jobs.values()
+            if job.completed is not None and job.completed <= time.time()
+        ]
+
+        self.stdout.write(f"Printer:            {printer}")
+        self.stdout.write(
+            f"Submitted:          {len(submitted)}/{len(results)} "
+            f"({len(results) - len(submitted)} failed)"
+        )
+        self.stdout.write(f"Throughput:         {len(results) / elapsed:.1f} jobs/s")
+        self.write_percentiles("Submit latency", submitted)
+        self.write_percentiles("Completion latency", completion)
+        if not drained:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(server.jobs) - len(completion)} jobs still queued "
+                    f"after {options['timeout']}s"
+                )
+            )
+
+    def wait_for_queue(self, timeout: float) -> bool:
+        """
+        Tunggu sampai simulator menyelesaikan semua job (lewat getJobs)
+        """
+        cups_connection = get_cups_connection()
+        deadline = time.monotonic() + timeout
+        while cups_connection.getJobs(which_jobs="not-completed"):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def write_percentiles(self, label: str, values):
+        self.stdout.write(
+            f"{label + ':':<20}"
+            + "  ".join(
+                f"p{percent}={percentile(values, percent) * 1000:.1f}ms"
+                for percent in (50, 95, 99)
+            )
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from warnain.printable_books.uploads import cleanup_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete expired resumable upload sessions and their staging files"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Cleaning up expired uploads...")
+        count = cleanup_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} staging files removed"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from warnain.printable_books.analytics import refresh_popularity
+
+
+class Command(BaseCommand):
+    help = "Recompute decayed category popularity scores from access history"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Refreshing category popularity...")
+        count = refresh_popularity()
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} categories refreshed"))
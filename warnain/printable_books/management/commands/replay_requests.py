@@ -0,0 +1,175 @@
+import asyncio
+import json
+import ssl
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from warnain.metrics import percentile
+
+# Status yang dianggap gagal saat replay (selain error koneksi/timeout)
+ERROR_STATUS = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay requests recorded by RequestCaptureMiddleware against a server "
+        "and report p50/p95/p99 latency per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("capture_file", help="JSONL file from REQUEST_CAPTURE_FILE")
+        parser.add_argument(
+            "--target",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server under test",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=30,
+            help="Maximum requests in flight",
+        )
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Replay speed-up (2 = twice as fast as recorded, 0 = no delays)",
+        )
+        parser.add_argument(
+            "--token",
+            help="Token sent with requests that were authenticated when recorded",
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Replay only the first N requests"
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30, help="Seconds per request"
+        )
+
+    def handle(self, *args, **options):
+        records = self.load(options["capture_file"], options["limit"])
+        if not records:
+            raise CommandError("No replayable requests in capture file")
+
+        target = urlsplit(options["target"])
+        if target.scheme not in ("http", "https") or not target.hostname:
+            raise CommandError(f"Invalid target {options['target']}")
+
+        started = time.perf_counter()
+        results = asyncio.run(self.replay(records, target, options))
+        elapsed = time.perf_counter() - started
+
+        self.report(results, elapsed)
+
+    def load(self, path, limit=None):
+        records = []
+        try:
+            with open(path) as capture_file:
+                for line in capture_file:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    # Upload (body tidak direkam) tidak bisa diputar ulang
+                    if record["method"] not in ("GET", "HEAD", "DELETE") and (
+                        record.get("body") is None
+                    ):
+                        continue
+                    records.append(record)
+                    if limit and len(records) >= limit:
+                        break
+        except OSError as e:
+            raise CommandError(f"Cannot read capture file: {e}")
+        return sorted(records, key=lambda record: record["time"])
+
+    async def replay(self, records, target, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        loop = asyncio.get_running_loop()
+        first = records[0]["time"]
+        start = loop.time()
+
+        async def run(record):
+            # Jaga jarak antar request seperti aslinya, dipercepat `speed`
+            if options["speed"] > 0:
+                delay = (record["time"] - first) / options["speed"]
+                await asyncio.sleep(max(start + delay - loop.time(), 0))
+            async with semaphore:
+                request_start = loop.time()
+                try:
+                    status = await asyncio.wait_for(
+                        self.send(target, record, options["token"]), options["timeout"]
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                    status = None
+                return record["endpoint"], status, loop.time() - request_start
+
+        return await asyncio.gather(*(run(record) for record in records))
+
+    async def send(self, target, record, token=None) -> int:
+        """
+        Kirim satu request HTTP/1.1 dan kembalikan status code
+        """
+        path = target.path.rstrip("/") + record["path"]
+        if record.get("query"):
+            path += "?" + urlencode(record["query"], doseq=True)
+        payload = (
+            b"" if record.get("body") is None else json.dumps(record["body"]).encode()
+        )
+
+        lines = [
+            f"{record['method']} {path} HTTP/1.1",
+            f"Host: {target.netloc}",
+            "Connection: close",
+            "User-Agent: warnain-replay",
+            f"Content-Length: {len(payload)}",
+        ]
+        if record.get("body") is not None:
+            lines.append("Content-Type: application/json")
+        if token and record.get("authenticated"):
+            lines.append(f"Authorization: Token {token}")
+
+        secure = target.scheme == "https"
+        reader, writer = await asyncio.open_connection(
+            target.hostname,
+            target.port or (443 if secure else 80),
+            ssl=ssl.create_default_context() if secure else None,
+        )
+        try:
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+            status_line = await reader.readline()
+            # Baca sampai server menutup koneksi supaya latency mencakup body
+            while await reader.read(65536):
+                pass
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+    def report(self, results, elapsed):
+        by_endpoint = defaultdict(list)
+        errors = defaultdict(int)
+        for endpoint, status, duration in results:
+            by_endpoint[endpoint].append(duration)
+            if status is None or status >= ERROR_STATUS:
+                errors[endpoint] += 1
+
+        self.stdout.write(
+            f"{'endpoint':<45} {'count':>6} {'errors':>6} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for endpoint, durations in sorted(by_endpoint.items()):
+            self.stdout.write(
+                f"{endpoint:<45} {len(durations):>6} {errors[endpoint]:>6} "
+                + " ".join(
+                    f"{percentile(durations, percent) * 1000:>9.1f}"
+                    for percent in (50, 95, 99)
+                )
+            )
+
+        total_errors = sum(errors.values())
+        self.stdout.write(
+            f"{len(results)} requests in {elapsed:.1f}s "
+            f"({len(results) / elapsed:.1f} req/s), {total_errors} errors"
+        )
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from warnain.printable_books.analytics import (
+    compact_category_access,
+    rollup_category_access,
+)
+
+
+class Command(BaseCommand):
+    help = "Roll up CategoryAccess into daily counts and compact old raw rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.CATEGORY_ACCESS_RETENTION_DAYS,
+            help="Delete rolled up raw rows older than this many days "
+            "(default: CATEGORY_ACCESS_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--no-compact",
+            action="store_true",
+            help="Only roll up, keep all raw rows",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rolling up category access...")
+        rows = rollup_category_access()
+        self.stdout.write(self.style.SUCCESS(f"✓ {rows} daily rows created"))
+
+        if options["no_compact"]:
+            return
+
+        retention_days = options["retention_days"]
+        self.stdout.write(f"Compacting raw access older than {retention_days} days...")
+        deleted = compact_category_access(retention_days)
+        self.stdout.write(self.style.SUCCESS(f"✓ {deleted} raw access rows removed"))
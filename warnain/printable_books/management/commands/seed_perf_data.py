@@ -0,0 +1,336 @@
+import io
+import math
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+from rest_framework.authtoken.models import Token
+
+from warnain.printable_books.analytics import get_popularity_rate, popularity_key
+from warnain.printable_books.models import (
+    CATEGORY_IDS_CACHE_KEY,
+    IMAGE_METADATA_KEYS,
+    Category,
+    CategoryAccess,
+    PrintableImage,
+    PrintJob,
+    set_image_metadata,
+)
+from warnain.utils.media import image_metadata
+
+# Penanda data sintetis, dipakai juga oleh --clear
+PERF_SOURCE = "https://perf.warnain.invalid"
+PERF_USERNAME_PREFIX = "perf-device-"
+
+# Sebaran jam akses: ramai saat jam sekolah, sepi di malam hari
+HOUR_WEIGHTS = (
+    (1,) * 5 + (2, 4, 10, 14, 15, 14, 12, 10, 9, 7, 5) + (4, 4, 4, 3, 2, 2, 1, 1)
+)
+PRINT_STATUSES = ["completed"] * 90 + ["failed"] * 7 + ["cancelled"] * 3
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic catalog (categories, images, Zipf-skewed "
+        "access, print jobs, token users) for capacity testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=1000)
+        parser.add_argument(
+            "--images-per-category", type=int, default=20, help="Images per category"
+        )
+        parser.add_argument(
+            "--accesses", type=int, default=1_000_000, help="CategoryAccess rows"
+        )
+        parser.add_argument("--print-jobs", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=5000, help="Token users")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Spread access and jobs over this many days",
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of category popularity",
+        )
+        parser.add_argument(
+            "--image-variants",
+            type=int,
+            default=50,
+            help="Distinct generated image files shared by all images",
+        )
+        parser.add_argument(
+            "--image-size", type=int, default=128, help="Image size in px"
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed")
+        parser.add_argument(
+            "--batch-size", type=int, default=50_000, help="Rows per insert batch"
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated data before seeding",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        # Waktu akhir dibulatkan ke awal hari supaya seed yang sama menghasilkan
+        # data yang sama sepanjang hari itu
+        self.end = timezone.make_aware(datetime.combine(timezone.localdate(), time()))
+        self.span = options["days"] * 86400
+
+        if options["clear"]:
+            self.clear()
+
+        images = self.create_image_files(
+            options["image_variants"], options["image_size"]
+        )
+        categories = self.create_categories(options["categories"], images)
+        self.create_images(categories, options["images_per_category"], images)
+        users = self.create_users(options["users"])
+        self.create_accesses(categories, users, options["accesses"], options["zipf"])
+        self.create_print_jobs(users, options["print_jobs"], images)
+
+        cache.delete(CATEGORY_IDS_CACHE_KEY)
+        self.stdout.write(self.style.SUCCESS("✓ Performance data seeded"))
+
+    def clear(self):
+        self.stdout.write("Deleting previous performance data...")
+        CategoryAccess.objects.filter(category__source=PERF_SOURCE).delete()
+        Category.objects.filter(source=PERF_SOURCE).delete()
+        get_user_model().objects.filter(
+            username__startswith=PERF_USERNAME_PREFIX
+        ).delete()
+        if default_storage.exists("printables/perf"):
+            for name in default_storage.listdir("printables/perf")[1]:
+                default_storage.delete(f"printables/perf/{name}")
+
+    def random_time(self) -> datetime:
+        day = self.rng.randrange(self.span // 86400 or 1)
+        hour = self.rng.choices(range(24), HOUR_WEIGHTS)[0]
+        start_of_day = self.end - timedelta(days=day + 1)
+        return start_of_day + timedelta(hours=hour, seconds=self.rng.randrange(3600))
+
+    def create_image_files(self, count: int, size: int) -> list:
+        """
+        Gambar garis hitam-putih kecil, dipakai bergantian oleh semua image
+        """
+        names = []
+        # Metadata per file (hash, ukuran, BlurHash), lihat ImageMetadataMixin
+        self.metadata = {}
+        for index in range(max(count, 1)):
+            image = Image.new("L", (size, size), 255)
+            draw = ImageDraw.Draw(image)
+            for _ in range(8):
+                box = sorted(self.rng.randrange(size) for _ in range(2))
+                box += sorted(self.rng.randrange(size) for _ in range(2))
+                draw.ellipse((box[0], box[2], box[1], box[3]), outline=0, width=2)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+            content = ContentFile(buffer.getvalue())
+            name = default_storage.save(f"printables/perf/{index:04d}.png", content)
+            self.metadata[name] = image_metadata(content)
+            names.append(name)
+        return names
+
+    def create_categories(self, count: int, images: list) -> list:
+        categories = []
+        for index in range(count):
+            category = Category(
+                title=f"Perf category {index:06d}",
+                thumbnail=self.rng.choice(images),
+                source=PERF_SOURCE,
+            )
+            set_image_metadata(
+                category, "thumbnail", self.metadata[category.thumbnail.name]
+            )
+            categories.append(category)
+        categories = Category.objects.bulk_create(
+            categories, batch_size=self.batch_size
+        )
+        self.stdout.write(f"✓ {len(categories)} categories")
+        return categories
+
+    def create_images(self, categories: list, per_category: int, images: list):
+        def rows():
+            for category in categories:
+                for index in range(per_category):
+                    image = self.rng.choice(images)
+                    yield (
+                        category.pk,
+                        image,
+                        f"{PERF_SOURCE}/{category.pk}/{index}",
+                        *(self.metadata[image][key] for key in IMAGE_METADATA_KEYS),
+                    )
+
+        fields = ["category_id", "image", "source"]
+        fields += [f"image_{key}" for key in IMAGE_METADATA_KEYS]
+        total = self.insert(PrintableImage, fields, rows())
+        self.stdout.write(f"✓ {total} images")
+
+    def create_users(self, count: int) -> list:
+        password = make_password(None)
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(
+                    username=f"{PERF_USERNAME_PREFIX}{index:07d}",
+                    password=password,
+                    email=f"{PERF_USERNAME_PREFIX}{index:07d}@example.com",
+                )
+                for index in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+        # Key token dari rng, bukan os.urandom, supaya bisa direproduksi
+        self.insert(
+            Token,
+            ["key", "user_id", "created"],
+            (
+                ("%040x" % self.rng.getrandbits(160), user.pk, self.end)
+                for user in users
+            ),
+        )
+        self.stdout.write(f"✓ {len(users)} users with tokens")
+        return users
+
+    def create_accesses(self, categories: list, users: list, count: int, zipf: float):
+        if not categories or not users:
+            return
+
+        # Peringkat popularitas diacak supaya tidak berkorelasi dengan id
+        ranked = categories[:]
+        self.rng.shuffle(ranked)
+        cum_weights = list(
+            accumulate(1 / (rank + 1) ** zipf for rank in range(len(ranked)))
+        )
+
+        rate = get_popularity_rate()
+        end_timestamp = self.end.timestamp()
+        scores = {}
+
+        def rows():
+            for _ in range(count):
+                category = self.rng.choices(ranked, cum_weights=cum_weights)[0]
+                created = self.random_time()
+                scores[category.pk] = scores.get(category.pk, 0) + math.exp(
+                    rate * (created.timestamp() - end_timestamp)
+                )
+                yield category.pk, self.rng.choice(users).pk, created, created
+
+        total = self.insert(
+            CategoryAccess, ["category_id", "user_id", "created", "modified"], rows()
+        )
+
+        # Skor popularitas langsung dari akses yang dibuat, setara refresh_popularity
+        reference = popularity_key(self.end)
+        for category in categories:
+            score = scores.get(category.pk)
+            category.popularity = reference + math.log(score) if score else 0
+        Category.objects.bulk_update(categories, ["popularity"], batch_size=1000)
+        self.stdout.write(f"✓ {total} category accesses")
+
+    def create_print_jobs(self, users: list, count: int, images: list):
+        if not users:
+            return
+
+        def rows():
+            for _ in range(count):
+                created = self.random_time()
+                status = self.rng.choice(PRINT_STATUSES)
+                yield (
+                    self.rng.choice(users).pk,
+                    f"Printer-{self.rng.randrange(3)}",
+                    default_storage.path(self.rng.choice(images)),
+                    self.rng.choice((1, 1, 1, 2, 5)),
+                    status,
+                    "Printer tidak aktif" if status == "failed" else "",
+                    created,
+                    created,
+                )
+
+        total = self.insert(
+            PrintJob,
+            [
+                "user_id",
+                "printer_name",
+                "file_path",
+                "copies",
+                "status",
+                "error_message",
+                "created",
+                "modified",
+            ],
+            rows(),
+        )
+        self.stdout.write(f"✓ {total} print jobs")
+
+    def insert(self, model, fields: list, rows) -> int:
+        """
+        Masukkan rows (tuple sesuai `fields`) per batch: COPY di PostgreSQL,
+        bulk_create di database lain
+        """
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                total += self.insert_batch(model, fields, batch)
+                batch = []
+        if batch:
+            total += self.insert_batch(model, fields, batch)
+        return total
+
+    def insert_batch(self, model, fields: list, batch: list) -> int:
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                buffer = io.StringIO()
+                for row in batch:
+                    buffer.write("\t".join(map(copy_value, row)) + "\n")
+                buffer.seek(0)
+                columns = ", ".join(
+                    connection.ops.quote_name(model._meta.get_field(name).column)
+                    for name in fields
+                )
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+                        f"({columns}) FROM STDIN",
+                        buffer,
+                    )
+            else:
+                model.objects.bulk_create(
+                    [model(**dict(zip(fields, row))) for row in batch],
+                    batch_size=1000,
+                )
+        return len(batch)
+
+
+def copy_value(value) -> str:
+    """
+    Satu nilai dalam format teks COPY
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from warnain.printable_books.printing import warm_print_cache
+
+
+class Command(BaseCommand):
+    help = "Pre-render print-ready PDFs of the most printed images and layouts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Count print jobs from the last N days (default PRINT_WARM_DAYS)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Number of image/layout combinations (default PRINT_WARM_LIMIT)",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Warming print cache...")
+        warmed, failed = warm_print_cache(options["days"], options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"✓ {warmed} print files ready"))
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(f"{failed} images could not be rendered")
+            )
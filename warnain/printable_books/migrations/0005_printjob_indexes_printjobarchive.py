@@ -0,0 +1,46 @@
+# Generated by Django 4.0.8 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('printable_books', '0004_networkinterface_printersettings_printjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrintJobArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(unique=True)),
+                ('user_id', models.BigIntegerField(db_index=True)),
+                ('printer_name', models.CharField(max_length=255)),
+                ('copies', models.PositiveSmallIntegerField(default=1)),
+                ('status', models.CharField(max_length=50)),
+                ('error_message', models.TextField(blank=True)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('archived', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='printjob',
+            index=models.Index(fields=['-created'], name='printjob_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printjob',
+            index=models.Index(fields=['user', '-created'], name='printjob_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printjob',
+            index=models.Index(fields=['status', 'created'], name='printjob_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printjob',
+            index=models.Index(fields=['printer_name', 'created'], name='printjob_printer_created_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.0.8 on 2026-10-19 01:27
+
+from django.conf import settings
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('printable_books', '0005_printjob_indexes_printjobarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryAccessDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-day',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='categoryaccess',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created'], name='categoryaccess_created_brin'),
+        ),
+        migrations.AddField(
+            model_name='categoryaccessdaily',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_access', to='printable_books.category'),
+        ),
+        migrations.AddField(
+            model_name='categoryaccessdaily',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_access', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='categoryaccessdaily',
+            index=models.Index(fields=['day'], name='categoryaccessdaily_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryaccessdaily',
+            constraint=models.UniqueConstraint(fields=('category', 'user', 'day'), name='unique_category_access_day'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.8 on 2026-10-19 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('printable_books', '0006_categoryaccessdaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['-popularity', 'title'], name='category_popularity_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.8 on 2026-10-19 01:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('printable_books', '0007_category_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecentCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('last_accessed', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recent_users', to='printable_books.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recent_categories', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-last_accessed',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recentcategory',
+            index=models.Index(fields=['user', '-last_accessed'], name='recentcategory_user_last_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recentcategory',
+            constraint=models.UniqueConstraint(fields=('user', 'category'), name='unique_recent_category'),
+        ),
+    ]
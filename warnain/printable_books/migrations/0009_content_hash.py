@@ -0,0 +1,23 @@
+# Generated by Django 4.0.8 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('printable_books', '0008_recentcategory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='thumbnail_hash',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='printableimage',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
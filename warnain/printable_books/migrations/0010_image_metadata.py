@@ -0,0 +1,64 @@
+# Generated by Django 4.0.8 on 2026-10-19 01:58
+
+from django.db import migrations, models
+import warnain.printable_books.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('printable_books', '0009_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='thumbnail_blurhash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='thumbnail_bytes',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='thumbnail_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='thumbnail_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='printableimage',
+            name='image_blurhash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='printableimage',
+            name='image_bytes',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='printableimage',
+            name='image_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='printableimage',
+            name='image_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='thumbnail',
+            field=warnain.printable_books.models.StoredDimensionsImageField(height_field='thumbnail_height', upload_to='categories/', width_field='thumbnail_width'),
+        ),
+        migrations.AlterField(
+            model_name='printableimage',
+            name='image',
+            field=warnain.printable_books.models.StoredDimensionsImageField(height_field='image_height', upload_to='printables/', width_field='image_width'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.8 on 2026-10-19 02:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('printable_books', '0010_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='printjob',
+            name='fit',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='printjob',
+            name='image',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='print_jobs', to='printable_books.printableimage'),
+        ),
+        migrations.AddField(
+            model_name='printjob',
+            name='orientation',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='printjob',
+            name='paper_size',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.8 on 2026-10-19 02:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('printable_books', '0012_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='printjob',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='print_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,27 +1,160 @@
+import uuid
+from typing import Tuple
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from model_utils.models import TimeStampedModel
 
+from warnain.utils.media import image_metadata
+
+# Cache daftar id kategori untuk validasi event tracking, dihapus setiap
+# kali kategori disimpan atau dihapus
+CATEGORY_IDS_CACHE_KEY = "printable_books:category_ids"
+
+# Field metadata per file gambar dan nilai kosongnya
+IMAGE_METADATA_KEYS = {
+    "hash": "",
+    "bytes": None,
+    "width": None,
+    "height": None,
+    "blurhash": "",
+}
+
+
+def file_name(value) -> str:
+    # Nilai field file di __dict__ bisa berupa string atau FieldFile
+    return getattr(value, "name", value) or ""
+
+
+class StoredDimensionsImageField(models.ImageField):
+    """
+    ImageField dengan width_field/height_field yang tidak membuka file di
+    post_init setiap kali model dimuat dari database. Dimensi diisi saat
+    file diganti (ImageMetadataMixin) atau lewat backfill_image_metadata.
+    """
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        if force:
+            super().update_dimension_fields(instance, force, *args, **kwargs)
+
+
+class ImageMetadataMixin:
+    """
+    Simpan metadata file gambar saat save untuk setiap field di
+    `image_metadata_fields`: `<field>_hash` (versi URL supaya bisa di-cache
+    selamanya), `<field>_bytes`, `<field>_width`/`<field>_height` dan
+    `<field>_blurhash` (placeholder di grid mobile app). Hanya dihitung ulang
+    untuk file baru atau nama file yang berubah; data lama diisi command
+    backfill_image_metadata.
+    """
+
+    image_metadata_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._metadata_files = {
+            name: file_name(instance.__dict__.get(name))
+            for name in cls.image_metadata_fields
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        deferred = self.get_deferred_fields()
+        known = getattr(self, "_metadata_files", {})
+        for name in self.image_metadata_fields:
+            if name in deferred or (
+                update_fields is not None and name not in update_fields
+            ):
+                continue
+            field_file = getattr(self, name)
+            if (
+                field_file
+                and field_file._committed
+                and getattr(self, f"{name}_hash")
+                and field_file.name == known.get(name)
+            ):
+                continue
+            try:
+                metadata = image_metadata(field_file) if field_file else {}
+            except OSError:
+                metadata = {}
+            fields = set_image_metadata(self, name, metadata)
+            if update_fields is not None:
+                update_fields = kwargs["update_fields"] = {*update_fields, *fields}
+
+        super().save(*args, **kwargs)
+        # Nama bisa berubah saat storage menyimpan file baru
+        self._metadata_files = {
+            name: file_name(self.__dict__.get(name))
+            for name in self.image_metadata_fields
+            if name not in deferred
+        }
+
+
+def set_image_metadata(instance, name: str, metadata: dict) -> list:
+    """
+    Isi field metadata `name` dari hasil image_metadata(), mengembalikan
+    nama field yang diisi
+    """
+    fields = []
+    for key, empty in IMAGE_METADATA_KEYS.items():
+        field = f"{name}_{key}"
+        setattr(instance, field, metadata.get(key, empty))
+        fields.append(field)
+    return fields
+
 
-class Category(models.Model):
+class Category(ImageMetadataMixin, models.Model):
     title = models.CharField(max_length=255)
-    thumbnail = models.ImageField(upload_to="categories/")
+    thumbnail = StoredDimensionsImageField(
+        upload_to="categories/",
+        width_field="thumbnail_width",
+        height_field="thumbnail_height",
+    )
+    thumbnail_hash = models.CharField(max_length=16, blank=True, editable=False)
+    thumbnail_width = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_height = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_bytes = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_blurhash = models.CharField(max_length=64, blank=True, editable=False)
     source = models.URLField(default="https://iheartcraftythings.com")
+    # Skor popularitas dengan peluruhan eksponensial, disimpan dalam log-space
+    # (ln(skor) + rate * waktu) supaya bisa langsung di-index dan diurutkan.
+    # Lihat warnain.printable_books.analytics.bump_popularity
+    popularity = models.FloatField(default=0, editable=False)
+
+    image_metadata_fields = ("thumbnail",)
 
     class Meta:
         ordering = ("title",)
+        indexes = [
+            models.Index(
+                fields=["-popularity", "title"], name="category_popularity_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class PrintableImage(models.Model):
+class PrintableImage(ImageMetadataMixin, models.Model):
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name="images"
     )
-    image = models.ImageField(upload_to="printables/")
+    image = StoredDimensionsImageField(
+        upload_to="printables/", width_field="image_width", height_field="image_height"
+    )
+    image_hash = models.CharField(max_length=16, blank=True, editable=False)
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_bytes = models.PositiveIntegerField(null=True, editable=False)
+    image_blurhash = models.CharField(max_length=64, blank=True, editable=False)
     source = models.URLField(max_length=500)
 
+    image_metadata_fields = ("image",)
+
 
 class CategoryAccess(TimeStampedModel):
     category = models.ForeignKey(
@@ -31,6 +164,68 @@ class CategoryAccess(TimeStampedModel):
         get_user_model(), on_delete=models.CASCADE, related_name="access"
     )
 
+    class Meta:
+        indexes = [
+            # Baris selalu ditambah berurutan waktu, BRIN jauh lebih kecil dari B-tree
+            BrinIndex(fields=["created"], name="categoryaccess_created_brin"),
+        ]
+
+
+class CategoryAccessDaily(models.Model):
+    """Rekap harian CategoryAccess per (category, user, day)"""
+
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="daily_access"
+    )
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="daily_access"
+    )
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("-day",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "user", "day"], name="unique_category_access_day"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="categoryaccessdaily_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.day}: {self.count}"
+
+
+class RecentCategory(models.Model):
+    """Riwayat kategori per device (token user), satu baris per kategori"""
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="recent_categories"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="recent_users"
+    )
+    count = models.PositiveIntegerField(default=1)
+    last_accessed = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-last_accessed",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category"], name="unique_recent_category"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-last_accessed"], name="recentcategory_user_last_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.category}"
+
 
 class PrinterSettings(TimeStampedModel):
     """Model untuk menyimpan pengaturan printer"""
@@ -82,11 +277,27 @@ class NetworkInterface(TimeStampedModel):
 class PrintJob(TimeStampedModel):
     """Model untuk tracking print jobs"""
 
+    # Tanpa index sendiri: printjob_user_created_idx (user, -created) sudah
+    # melayani lookup per user
     user = models.ForeignKey(
-        get_user_model(), on_delete=models.CASCADE, related_name="print_jobs"
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="print_jobs",
+        db_index=False,
     )
     printer_name = models.CharField(max_length=255)
     file_path = models.CharField(max_length=500)
+    # Diisi untuk print-image, dipakai warm_print_cache
+    image = models.ForeignKey(
+        PrintableImage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="print_jobs",
+    )
+    paper_size = models.CharField(max_length=16, blank=True)
+    orientation = models.CharField(max_length=16, blank=True)
+    fit = models.CharField(max_length=16, blank=True)
     copies = models.IntegerField(default=1)
     status = models.CharField(
         max_length=50,
@@ -103,6 +314,70 @@ class PrintJob(TimeStampedModel):
 
     class Meta:
         ordering = ("-created",)
+        indexes = [
+            models.Index(fields=["-created"], name="printjob_created_idx"),
+            models.Index(fields=["user", "-created"], name="printjob_user_created_idx"),
+            models.Index(
+                fields=["status", "created"], name="printjob_status_created_idx"
+            ),
+            models.Index(
+                fields=["printer_name", "created"], name="printjob_printer_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Print Job {self.id} - {self.status}"
+
+
+class PrintJobArchive(models.Model):
+    """Arsip ringkas print job lama, diisi oleh command archive_print_jobs"""
+
+    job_id = models.BigIntegerField(unique=True)
+    # Simpan id saja (tanpa FK) supaya arsip tetap ada walaupun user dihapus
+    user_id = models.BigIntegerField(db_index=True)
+    printer_name = models.CharField(max_length=255)
+    copies = models.PositiveSmallIntegerField(default=1)
+    status = models.CharField(max_length=50)
+    error_message = models.TextField(blank=True)
+    created = models.DateTimeField(db_index=True)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created",)
+
+    def __str__(self):
+        return f"Archived Print Job {self.job_id} - {self.status}"
+
+
+class UploadSession(TimeStampedModel):
+    """
+    Upload print-temp yang bisa dilanjutkan: file dikirim per chunk ke staging
+    area, `received` adalah jumlah byte yang sudah tersimpan berurutan
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    file_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ("uploading", "Uploading"),
+            ("printing", "Printing"),
+        ],
+        default="uploading",
+    )
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ("-created",)
+
+    def __str__(self):
+        return f"Upload {self.id} - {self.received}/{self.size}"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.received >= self.size
@@ -0,0 +1,156 @@
+"""
+Penulis PDF minimal untuk artefak cetak.
+
+Hanya mendukung yang dibutuhkan halaman mewarnai: halaman berisi satu atau
+beberapa gambar raster 1-bit ("1") atau grayscale ("L") yang dikompres Flate.
+Raster 1-bit 300 DPI satu halaman A4 biasanya hanya puluhan KB, jauh lebih
+kecil daripada PNG berwarna aslinya, dan filter CUPS tidak perlu mengubah
+warna atau skala lagi.
+
+Koordinat memakai satuan point PDF (1/72 inci) dengan origin di kiri bawah.
+"""
+import zlib
+from typing import BinaryIO, Dict, Iterable, List, Tuple
+
+from PIL import Image
+
+POINTS_PER_INCH = 72
+MM_PER_INCH = 25.4
+
+# Ukuran kertas portrait dalam point
+PAPER_SIZES: Dict[str, Tuple[float, float]] = {
+    "A4": (595.28, 841.89),
+    "A5": (419.53, 595.28),
+    "Letter": (612.0, 792.0),
+    # F4/folio 215 x 330 mm, umum di sekolah Indonesia
+    "F4": (609.45, 935.43),
+}
+
+
+def mm_to_points(value: float) -> float:
+    return value / MM_PER_INCH * POINTS_PER_INCH
+
+
+def number(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class PlacedImage:
+    """
+    Gambar mode "1" atau "L" yang digambar di kotak (x, y, width, height)
+    """
+
+    def __init__(
+        self, image: Image.Image, x: float, y: float, width: float, height: float
+    ):
+        if image.mode not in ("1", "L"):
+            raise ValueError(f"Mode gambar {image.mode} tidak didukung")
+        self.image = image
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class Page:
+    def __init__(self, width: float, height: float, images: List[PlacedImage] = None):
+        self.width = width
+        self.height = height
+        self.images = images or []
+
+
+class PdfWriter:
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.position = 0
+        self.offsets: Dict[int, int] = {}
+        self.next_id = 1
+
+    def reserve(self) -> int:
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.position += len(data)
+
+    def object(self, object_id: int, dictionary: str, stream: bytes = None):
+        self.offsets[object_id] = self.position
+        if stream is None:
+            self.write(f"{object_id} 0 obj\n{dictionary}\nendobj\n".encode())
+            return
+        dictionary = dictionary[:-2] + f" /Length {len(stream)} >>"
+        self.write(f"{object_id} 0 obj\n{dictionary}\nstream\n".encode())
+        self.write(stream)
+        self.write(b"\nendstream\nendobj\n")
+
+    def image(self, image: Image.Image) -> int:
+        object_id = self.reserve()
+        # Mode "1" Pillow sudah dipak 8 piksel per byte, baris di-pad ke byte,
+        # bit 0 = hitam, sama seperti DeviceGray 1 bit di PDF
+        bits = 1 if image.mode == "1" else 8
+        self.object(
+            object_id,
+            "<< /Type /XObject /Subtype /Image "
+            f"/Width {image.width} /Height {image.height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent {bits} "
+            "/Filter /FlateDecode >>",
+            zlib.compress(image.tobytes(), 9),
+        )
+        return object_id
+
+    def finish(self, root_id: int):
+        xref = self.position
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[i]:010d} 00000 n \n" for i in range(1, count)]
+        lines.append(
+            f"trailer\n<< /Size {count} /Root {root_id} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n"
+        )
+        self.write("".join(lines).encode())
+
+
+def write_pdf(pages: Iterable[Page], file: BinaryIO):
+    """
+    Tulis `pages` sebagai dokumen PDF ke file biner. `pages` boleh generator:
+    setiap halaman langsung ditulis, jadi dokumen panjang tidak perlu
+    dimuat ke memory sekaligus.
+    """
+    writer = PdfWriter(file)
+    writer.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    catalog_id = writer.reserve()
+    pages_id = writer.reserve()
+
+    page_ids = []
+    for page in pages:
+        resources = []
+        content = []
+        for index, placed in enumerate(page.images):
+            image_id = writer.image(placed.image)
+            resources.append(f"/Im{index} {image_id} 0 R")
+            content.append(
+                f"q {number(placed.width)} 0 0 {number(placed.height)} "
+                f"{number(placed.x)} {number(placed.y)} cm /Im{index} Do Q"
+            )
+        content_id = writer.reserve()
+        writer.object(
+            content_id,
+            "<< /Filter /FlateDecode >>",
+            zlib.compress("\n".join(content).encode()),
+        )
+        page_id = writer.reserve()
+        writer.object(
+            page_id,
+            f"<< /Type /Page /Parent {pages_id} 0 R "
+            f"/MediaBox [0 0 {number(page.width)} {number(page.height)}] "
+            f"/Resources << /XObject << {' '.join(resources)} >> >> "
+            f"/Contents {content_id} 0 R >>",
+        )
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    writer.object(pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>")
+    writer.object(catalog_id, f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+    writer.finish(catalog_id)
@@ -0,0 +1,302 @@
+"""
+Persiapan file cetak untuk halaman mewarnai.
+
+Gambar asli (sering PNG berwarna beberapa MB) diubah menjadi raster 1-bit
+(atau grayscale) dengan resolusi yang sudah pas dengan PRINT_DPI di ukuran
+kertas yang diminta, lalu dibungkus PDF Flate. CUPS cukup meneruskan PDF
+kecil itu ke printer tanpa scaling, rotasi dan mode warna. Hasilnya di-cache
+di disk per (gambar, ukuran kertas, orientasi, fit), jadi cetak berikutnya
+langsung memakai file yang sama. Command warm_print_cache merender lebih dulu
+kombinasi yang paling sering dicetak.
+"""
+import logging
+import math
+import os
+import tempfile
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps
+
+from warnain import metrics
+from warnain.printable_books.models import PrintableImage, PrintJob
+from warnain.printable_books.pdf import (
+    PAPER_SIZES,
+    POINTS_PER_INCH,
+    Page,
+    PlacedImage,
+    mm_to_points,
+    write_pdf,
+)
+from warnain.utils.disk_cache import get_cache
+
+# Naikkan kalau cara render berubah supaya artefak lama tidak dipakai
+ARTIFACT_VERSION = 1
+ORIENTATIONS = ("auto", "portrait", "landscape")
+FITS = ("contain", "cover")
+# Artefak selalu hitam-putih/grayscale, printer tidak perlu mode warna
+MONOCHROME_OPTIONS = {"print-color-mode": "monochrome"}
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_raster(image: Image.Image, width: int, height: int, mode: str):
+    """
+    Gambar dengan ukuran tepat `width` x `height` piksel dalam mode "1"
+    (threshold, tanpa dither supaya garis tetap tegas) atau "L"
+    """
+    image.draft("L", (width, height))
+    if image.mode in ("RGBA", "LA", "P", "PA"):
+        # Area transparan jadi putih kertas
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image.convert("RGBA"))
+    image = image.convert("L")
+    if image.size != (width, height):
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    if mode == "1":
+        image = image.convert("1", dither=Image.Dither.NONE)
+    return image
+
+
+class PrintLayout:
+    """
+    Ukuran kertas, orientasi dan cara gambar mengisi halaman. Nilai kosong
+    memakai default dari settings.
+    """
+
+    def __init__(
+        self, paper_size: str = None, orientation: str = None, fit: str = None
+    ):
+        self.paper_size = paper_size or settings.PRINT_PAPER_SIZE
+        self.orientation = orientation or settings.PRINT_ORIENTATION
+        self.fit = fit or settings.PRINT_FIT
+        if self.paper_size not in PAPER_SIZES:
+            raise ValueError(f"Ukuran kertas {self.paper_size} tidak dikenal")
+        if self.orientation not in ORIENTATIONS:
+            raise ValueError(f"Orientasi {self.orientation} tidak dikenal")
+        if self.fit not in FITS:
+            raise ValueError(f"Mode fit {self.fit} tidak dikenal")
+
+    @property
+    def key(self) -> str:
+        return f"{self.paper_size}:{self.orientation}:{self.fit}"
+
+    def paper(self, size: Tuple[int, int]) -> Tuple[float, float]:
+        """
+        Ukuran kertas (point) sesuai orientasi; "auto" mengikuti ukuran
+        gambar `size`
+        """
+        width, height = PAPER_SIZES[self.paper_size]
+        landscape = (
+            size[0] > size[1]
+            if self.orientation == "auto"
+            else self.orientation == "landscape"
+        )
+        return (height, width) if landscape else (width, height)
+
+    def print_area(self, size: Tuple[int, int], dpi: int) -> Tuple[int, int]:
+        """
+        Ukuran area cetak (kertas dikurangi margin) dalam piksel di `dpi`
+        """
+        margin = mm_to_points(settings.PRINT_MARGIN_MM)
+        return tuple(
+            math.floor((side - 2 * margin) / POINTS_PER_INCH * dpi)
+            for side in self.paper(size)
+        )
+
+
+def place_image(
+    image: Image.Image,
+    box: Tuple[float, float, float, float],
+    fit: str,
+    dpi: int,
+    mode: str,
+) -> PlacedImage:
+    """
+    `image` di tengah kotak (x, y, width, height) point. "contain": seluruh
+    gambar masuk kotak; "cover": kotak penuh, bagian gambar yang keluar
+    kotak dipotong. Aspect ratio tidak pernah berubah.
+    """
+    x, y, box_width, box_height = box
+    if fit == "cover":
+        scale = max(box_width / image.width, box_height / image.height)
+        # Potong sumber ke bagian yang terlihat, raster tidak lebih besar
+        # dari kotak
+        crop_width = min(image.width, round(box_width / scale))
+        crop_height = min(image.height, round(box_height / scale))
+        left = (image.width - crop_width) // 2
+        top = (image.height - crop_height) // 2
+        image = image.crop((left, top, left + crop_width, top + crop_height))
+    else:
+        scale = min(box_width / image.width, box_height / image.height)
+
+    width, height = image.width * scale, image.height * scale
+    pixels = (
+        max(1, math.floor(width / POINTS_PER_INCH * dpi)),
+        max(1, math.floor(height / POINTS_PER_INCH * dpi)),
+    )
+    return PlacedImage(
+        prepare_raster(image, *pixels, mode),
+        x + (box_width - width) / 2,
+        y + (box_height - height) / 2,
+        width,
+        height,
+    )
+
+
+def layout_page(image: Image.Image, layout: PrintLayout, dpi: int, mode: str) -> Page:
+    """
+    Satu halaman berisi `image` di area cetak (kertas dikurangi margin)
+    """
+    paper_width, paper_height = layout.paper(image.size)
+    margin = mm_to_points(settings.PRINT_MARGIN_MM)
+    box = (margin, margin, paper_width - 2 * margin, paper_height - 2 * margin)
+    return Page(
+        paper_width, paper_height, [place_image(image, box, layout.fit, dpi, mode)]
+    )
+
+
+def render_print_pdf(printable: PrintableImage, layout: PrintLayout, file):
+    with printable.image.open("rb"), Image.open(printable.image) as image:
+        page = layout_page(image, layout, settings.PRINT_DPI, settings.PRINT_COLOR_MODE)
+    write_pdf([page], file)
+
+
+def artifact_key(printable: PrintableImage, layout: PrintLayout) -> str:
+    return (
+        f"print:{ARTIFACT_VERSION}:{printable.image_hash or printable.image.name}:"
+        f"{layout.key}:{settings.PRINT_DPI}:{settings.PRINT_COLOR_MODE}"
+    )
+
+
+def get_print_artifact(printable: PrintableImage, layout: PrintLayout = None) -> str:
+    """
+    Path PDF siap cetak untuk `printable` dengan `layout` (default settings),
+    dibuat sekali lalu diambil dari cache disk. OSError/SyntaxError kalau
+    file gambar hilang atau rusak.
+    """
+    layout = layout or PrintLayout()
+    cache = get_cache("print", settings.PRINT_CACHE_MAX_BYTES)
+    key = artifact_key(printable, layout)
+    path = cache.get(key, ".pdf")
+    metrics.inc(
+        "cache_requests_total",
+        cache="print",
+        result="miss" if path is None else "hit",
+    )
+    if path is None:
+        path = cache.get_or_create(
+            key, lambda file: render_print_pdf(printable, layout, file), ".pdf"
+        )
+    return path
+
+
+def get_print_file(
+    printable: PrintableImage, layout: PrintLayout = None
+) -> Tuple[str, Optional[dict]]:
+    """
+    File yang dikirim ke CUPS untuk `printable` dan opsi job tambahan. Kalau
+    PRINT_PREPARE dimatikan atau gambar tidak bisa diproses, file asli yang
+    dicetak seperti sebelumnya.
+    """
+    if settings.PRINT_PREPARE:
+        try:
+            return get_print_artifact(printable, layout), MONOCHROME_OPTIONS
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            logger.warning(
+                "Gagal menyiapkan file cetak %s", printable.image.name, exc_info=True
+            )
+    return printable.image.path, None
+
+
+def warm_print_cache(days: int = None, limit: int = None) -> Tuple[int, int]:
+    """
+    Render PDF untuk `limit` kombinasi (gambar, layout) yang paling sering
+    dicetak dalam `days` hari terakhir. Yang sudah ada di cache hanya
+    di-touch supaya tidak terkena eviksi. Mengembalikan (berhasil, gagal).
+    """
+    days = settings.PRINT_WARM_DAYS if days is None else days
+    limit = settings.PRINT_WARM_LIMIT if limit is None else limit
+    rows = list(
+        PrintJob.objects.filter(
+            created__gte=timezone.now() - timedelta(days=days), image__isnull=False
+        )
+        .values("image", "paper_size", "orientation", "fit")
+        .annotate(jobs=Count("id"))
+        .order_by("-jobs")[:limit]
+    )
+    images = PrintableImage.objects.in_bulk({row["image"] for row in rows})
+
+    warmed = failed = 0
+    for row in rows:
+        try:
+            layout = PrintLayout(row["paper_size"], row["orientation"], row["fit"])
+            get_print_artifact(images[row["image"]], layout)
+        except (ValueError, OSError, SyntaxError, Image.DecompressionBombError):
+            logger.warning("Gagal warm file cetak %s", row, exc_info=True)
+            failed += 1
+            continue
+        warmed += 1
+    return warmed, failed
+
+
+def normalize_upload(
+    source_path: str, layout: PrintLayout = None, grayscale: bool = False
+) -> str:
+    """
+    Foto upload siap kirim ke CUPS: rotasi EXIF diterapkan, diperkecil ke
+    area cetak kertas `layout` di PRINT_DPI (tidak pernah diperbesar) dan
+    opsional grayscale. JPEG di-decode langsung di skala kecil (draft), jadi
+    foto 12MP tidak pernah di-decode penuh. Hasilnya file baru di direktori
+    yang sama (JPEG tetap JPEG, lainnya PNG); pemanggil yang menghapusnya.
+    """
+    layout = layout or PrintLayout()
+    with Image.open(source_path) as image:
+        is_jpeg = image.format == "JPEG"
+        # Orientasi EXIF 5-8 berarti gambar diputar 90 derajat
+        rotated = image.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8)
+        size = image.size[::-1] if rotated else image.size
+        width, height = layout.print_area(size, settings.PRINT_DPI)
+        scale = min(1, width / size[0], height / size[1])
+        target = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+
+        draft_size = target[::-1] if rotated else target
+        image.draft("L" if grayscale else "RGB", draft_size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P", "PA"):
+            background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image.convert("RGBA"))
+        image = image.convert("L" if grayscale else "RGB")
+        if image.size != target:
+            image = image.resize(target, Image.Resampling.LANCZOS)
+
+        suffix = ".jpg" if is_jpeg else ".png"
+        fd, path = tempfile.mkstemp(dir=os.path.dirname(source_path), suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                if is_jpeg:
+                    image.save(file, "JPEG", quality=settings.PRINT_UPLOAD_JPEG_QUALITY)
+                else:
+                    image.save(file, "PNG")
+        except BaseException:
+            os.unlink(path)
+            raise
+    return path
+
+
+def prepare_upload(
+    source_path: str, layout: PrintLayout = None, grayscale: bool = False
+) -> str:
+    """
+    File upload yang dikirim ke CUPS: hasil normalize_upload, atau file asli
+    kalau PRINT_UPLOAD_NORMALIZE dimatikan atau gambar tidak bisa diproses
+    """
+    if settings.PRINT_UPLOAD_NORMALIZE:
+        try:
+            return normalize_upload(source_path, layout, grayscale)
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            logger.warning("Gagal normalisasi upload %s", source_path, exc_info=True)
+    return source_path
@@ -1,26 +1,67 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from warnain.printable_books.booklets import IMPOSITIONS
 from warnain.printable_books.models import (
     Category,
+    NetworkInterface,
     PrintableImage,
     PrinterSettings,
-    NetworkInterface,
     PrintJob,
+    UploadSession,
 )
+from warnain.printable_books.pdf import PAPER_SIZES
+from warnain.printable_books.printing import FITS, ORIENTATIONS
+
+
+class VersionedImageField(serializers.ImageField):
+    """
+    URL gambar dengan `?v=<hash isi file>`, aman di-cache selamanya oleh
+    mobile app dan proxy karena URL berubah setiap kali file diganti
+    """
+
+    def __init__(self, *args, hash_field, **kwargs):
+        self.hash_field = hash_field
+        super().__init__(*args, **kwargs)
+
+    def to_representation(self, value):
+        url = super().to_representation(value)
+        version = getattr(value.instance, self.hash_field, "") if value else ""
+        if url and version:
+            url = f"{url}{'&' if '?' in url else '?'}v={version}"
+        return url
 
 
 class CategorySerializer(serializers.ModelSerializer):
     access_count = serializers.IntegerField(read_only=True)
+    thumbnail = VersionedImageField(hash_field="thumbnail_hash")
 
     class Meta:
         model = Category
-        fields = ("id", "title", "thumbnail", "source", "access_count")
+        fields = (
+            "id",
+            "title",
+            "thumbnail",
+            "thumbnail_width",
+            "thumbnail_height",
+            "thumbnail_bytes",
+            "thumbnail_blurhash",
+            "source",
+            "access_count",
+        )
 
 
 class PrintableImageSerializer(serializers.ModelSerializer):
+    image = VersionedImageField(hash_field="image_hash")
+    # Ukuran dan placeholder supaya grid bisa dirender sebelum gambar diunduh
+    width = serializers.IntegerField(source="image_width", read_only=True)
+    height = serializers.IntegerField(source="image_height", read_only=True)
+    bytes = serializers.IntegerField(source="image_bytes", read_only=True)
+    blurhash = serializers.CharField(source="image_blurhash", read_only=True)
+
     class Meta:
         model = PrintableImage
-        fields = ("id", "source", "image")
+        fields = ("id", "source", "image", "width", "height", "bytes", "blurhash")
 
 
 class PrinterSettingsSerializer(serializers.ModelSerializer):
@@ -59,6 +100,10 @@ class PrintJobSerializer(serializers.ModelSerializer):
             "id",
             "printer_name",
             "file_path",
+            "image",
+            "paper_size",
+            "orientation",
+            "fit",
             "copies",
             "status",
             "error_message",
@@ -68,14 +113,76 @@ class PrintJobSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created", "modified")
 
 
-class TempPrintSerializer(serializers.Serializer):
-    """Serializer untuk temporary print dari upload file"""
+class TempPrintOptionsSerializer(serializers.Serializer):
+    """Opsi cetak print-temp, juga dipakai finalize upload"""
 
-    image = serializers.ImageField(required=True)
     copies = serializers.IntegerField(default=1, min_value=1, max_value=10)
     printer_name = serializers.CharField(max_length=255, required=False)
+    paper_size = serializers.ChoiceField(choices=list(PAPER_SIZES), required=False)
+    orientation = serializers.ChoiceField(choices=ORIENTATIONS, required=False)
+    # Kosong = PRINT_UPLOAD_GRAYSCALE
+    grayscale = serializers.BooleanField(required=False, allow_null=True, default=None)
 
     def validate_copies(self, value):
         if value < 1 or value > 10:
             raise serializers.ValidationError("Copies must be between 1 and 10")
         return value
+
+
+class TempPrintSerializer(TempPrintOptionsSerializer):
+    """Serializer untuk temporary print dari upload file"""
+
+    image = serializers.ImageField(required=True)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Upload print-temp yang bisa dilanjutkan"""
+
+    offset = serializers.IntegerField(source="received", read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ["id", "file_name", "size", "offset", "status", "expires"]
+        read_only_fields = ["id", "status", "expires"]
+
+    def validate_size(self, value):
+        if value < 1 or value > settings.UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Size must be between 1 and {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        return value
+
+
+class PrintLayoutSerializer(serializers.Serializer):
+    """Layout file cetak print-image, kosong = default settings"""
+
+    paper_size = serializers.ChoiceField(choices=list(PAPER_SIZES), required=False)
+    orientation = serializers.ChoiceField(choices=ORIENTATIONS, required=False)
+    fit = serializers.ChoiceField(choices=FITS, required=False)
+
+
+class PrintBookletSerializer(PrintLayoutSerializer):
+    """Cetak satu kategori sebagai booklet"""
+
+    copies = serializers.IntegerField(default=1, min_value=1, max_value=10)
+    printer_name = serializers.CharField(max_length=255, required=False)
+    imposition = serializers.ChoiceField(choices=IMPOSITIONS, default="single")
+    duplex = serializers.BooleanField(default=False)
+
+
+class TrackEventSerializer(serializers.Serializer):
+    """Satu event akses kategori dari antrian offline mobile app"""
+
+    category_id = serializers.IntegerField()
+    timestamp = serializers.DateTimeField(required=False)
+    device = serializers.CharField(max_length=150, required=False, allow_blank=True)
+
+
+class TrackBatchSerializer(serializers.Serializer):
+    """Serializer untuk batch tracking, menerima array event"""
+
+    events = serializers.ListField(
+        child=TrackEventSerializer(),
+        allow_empty=False,
+        max_length=settings.TRACK_BATCH_MAX_EVENTS,
+    )
@@ -0,0 +1,12 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from warnain.printable_books.models import CATEGORY_IDS_CACHE_KEY, Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_ids(sender, instance, **kwargs):
+    # post_delete juga dikirim untuk queryset.delete() (bulk delete admin),
+    # tidak seperti Category.delete()
+    cache.delete(CATEGORY_IDS_CACHE_KEY)
@@ -0,0 +1,111 @@
+"""
+Sprite sheet thumbnail kategori untuk grid CategoryListScreen.
+
+Thumbnail satu halaman list digabung menjadi satu gambar JPEG (grid
+CATEGORY_SPRITE_COLUMNS kolom, setiap tile CATEGORY_SPRITE_TILE_SIZE piksel
+persegi), jadi satu halaman cukup satu request gambar. Sprite disimpan di
+cache disk dengan key id kategori + hash thumbnail, sehingga halaman yang
+sama dipakai ulang sampai ada thumbnail yang berubah.
+"""
+import math
+from typing import List, Optional
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from warnain import metrics
+from warnain.printable_books.models import Category
+from warnain.utils.disk_cache import get_cache
+from warnain.utils.media import cache_url
+
+# Naikkan kalau layout sprite berubah supaya sprite lama tidak dipakai
+SPRITE_VERSION = 1
+BACKGROUND = (255, 255, 255)
+
+
+def sprite_key(categories: List[Category]) -> str:
+    tiles = ",".join(
+        f"{category.pk}:{category.thumbnail_hash or category.thumbnail.name}"
+        for category in categories
+    )
+    return (
+        f"sprite:{SPRITE_VERSION}:{settings.CATEGORY_SPRITE_TILE_SIZE}:"
+        f"{settings.CATEGORY_SPRITE_COLUMNS}:{tiles}"
+    )
+
+
+def tile_position(index: int) -> dict:
+    size = settings.CATEGORY_SPRITE_TILE_SIZE
+    row, column = divmod(index, settings.CATEGORY_SPRITE_COLUMNS)
+    return {"x": column * size, "y": row * size}
+
+
+def render_sprite(categories: List[Category], file):
+    size = settings.CATEGORY_SPRITE_TILE_SIZE
+    columns = min(settings.CATEGORY_SPRITE_COLUMNS, len(categories))
+    rows = math.ceil(len(categories) / settings.CATEGORY_SPRITE_COLUMNS)
+    sprite = Image.new("RGB", (columns * size, rows * size), BACKGROUND)
+
+    for index, category in enumerate(categories):
+        try:
+            with category.thumbnail.open("rb"), Image.open(category.thumbnail) as image:
+                image.draft("RGB", (size, size))
+                if image.mode in ("RGBA", "LA", "P"):
+                    # Transparan jadi putih, sama seperti di kertas
+                    background = Image.new("RGBA", image.size, BACKGROUND + (255,))
+                    image = Image.alpha_composite(background, image.convert("RGBA"))
+                tile = ImageOps.pad(
+                    image.convert("RGB"),
+                    (size, size),
+                    Image.Resampling.LANCZOS,
+                    color=BACKGROUND,
+                )
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            # Thumbnail hilang/rusak: tile dibiarkan kosong
+            continue
+        position = tile_position(index)
+        sprite.paste(tile, (position["x"], position["y"]))
+
+    sprite.save(
+        file,
+        "JPEG",
+        quality=settings.IMAGE_RESIZE_JPEG_QUALITY,
+        optimize=True,
+        progressive=True,
+    )
+
+
+def get_category_sprite(categories: List[Category], request=None) -> Optional[dict]:
+    """
+    URL sprite dan posisi tile per id kategori untuk satu halaman list
+    """
+    categories = list(categories)
+    if not categories:
+        return None
+
+    cache = get_cache("sprites", settings.CATEGORY_SPRITE_CACHE_MAX_BYTES)
+    key = sprite_key(categories)
+    path = cache.get(key, ".jpg")
+    metrics.inc(
+        "cache_requests_total",
+        cache="sprite",
+        result="miss" if path is None else "hit",
+    )
+    if path is None:
+        path = cache.get_or_create(
+            key, lambda file: render_sprite(categories, file), ".jpg"
+        )
+
+    url = cache_url(path)
+    size = settings.CATEGORY_SPRITE_TILE_SIZE
+    columns = min(settings.CATEGORY_SPRITE_COLUMNS, len(categories))
+    return {
+        "url": request.build_absolute_uri(url) if request else url,
+        "width": columns * size,
+        "height": math.ceil(len(categories) / settings.CATEGORY_SPRITE_COLUMNS) * size,
+        "tile_size": size,
+        "tiles": {
+            str(category.pk): tile_position(index)
+            for index, category in enumerate(categories)
+        },
+    }
@@ -0,0 +1,49 @@
+from factory import Faker, SubFactory
+from factory.django import DjangoModelFactory, ImageField
+
+from warnain.printable_books.models import (
+    Category,
+    CategoryAccess,
+    PrintableImage,
+    PrintJob,
+)
+from warnain.users.tests.factories import UserFactory
+
+
+class CategoryFactory(DjangoModelFactory):
+
+    title = Faker("sentence", nb_words=3)
+    thumbnail = ImageField(width=32, height=32)
+
+    class Meta:
+        model = Category
+
+
+class PrintableImageFactory(DjangoModelFactory):
+
+    category = SubFactory(CategoryFactory)
+    image = ImageField(width=64, height=64)
+    source = Faker("url")
+
+    class Meta:
+        model = PrintableImage
+
+
+class CategoryAccessFactory(DjangoModelFactory):
+
+    category = SubFactory(CategoryFactory)
+    user = SubFactory(UserFactory)
+
+    class Meta:
+        model = CategoryAccess
+
+
+class PrintJobFactory(DjangoModelFactory):
+
+    user = SubFactory(UserFactory)
+    printer_name = "Test-Printer"
+    file_path = Faker("file_path")
+    status = "completed"
+
+    class Meta:
+        model = PrintJob
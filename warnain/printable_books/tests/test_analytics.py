@@ -0,0 +1,283 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from warnain.printable_books.analytics import (
+    PersonalCategoryOrder,
+    annotate_access_stats,
+    bump_popularity,
+    claim_access,
+    clamp_access_time,
+    compact_category_access,
+    get_access_count,
+    get_anonymous_user,
+    get_category_ids,
+    get_popularity_rate,
+    get_recent_categories,
+    get_rollup_watermark,
+    record_category_access,
+    record_category_accesses,
+    refresh_popularity,
+    rollup_category_access,
+)
+from warnain.printable_books.models import (
+    Category,
+    CategoryAccess,
+    CategoryAccessDaily,
+    RecentCategory,
+)
+from warnain.printable_books.tests.factories import (
+    CategoryAccessFactory,
+    CategoryFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def create_access(category, user, days_ago):
+    access = CategoryAccessFactory(category=category, user=user)
+    CategoryAccess.objects.filter(pk=access.pk).update(
+        created=timezone.now() - timedelta(days=days_ago)
+    )
+    return access
+
+
+class TestRollup:
+    def test_rolls_up_complete_days_only(self, user):
+        category = CategoryFactory()
+        create_access(category, user, days_ago=3)
+        create_access(category, user, days_ago=3)
+        create_access(category, user, days_ago=0)
+
+        rollup_category_access()
+
+        daily = CategoryAccessDaily.objects.get()
+        assert daily.count == 2
+        assert daily.day == timezone.localdate() - timedelta(days=3)
+
+    def test_is_incremental(self, user):
+        category = CategoryFactory()
+        create_access(category, user, days_ago=3)
+        rollup_category_access()
+        create_access(category, user, days_ago=2)
+
+        rollup_category_access()
+
+        assert CategoryAccessDaily.objects.count() == 2
+        assert get_rollup_watermark() == timezone.localdate() - timedelta(days=2)
+
+    def test_counts_survive_compaction(self, user):
+        category = CategoryFactory()
+        for days_ago in (40, 40, 5, 0):
+            create_access(category, user, days_ago=days_ago)
+
+        rollup_category_access()
+        deleted = compact_category_access(retention_days=30)
+
+        assert deleted == 2
+        assert get_access_count(category) == 4
+        annotated = annotate_access_stats(Category.objects.all()).get()
+        assert annotated.access_count == 4
+        assert annotated.latest_access is not None
+
+
+class TestPopularity:
+    def test_bump_orders_by_recent_interest(self, user, settings):
+        settings.CATEGORY_POPULARITY_HALF_LIFE_DAYS = 7
+        old_favourite = CategoryFactory()
+        new_favourite = CategoryFactory()
+        for _ in range(3):
+            bump_popularity(old_favourite.pk, when=timezone.now() - timedelta(days=60))
+        bump_popularity(new_favourite.pk)
+
+        ranking = list(
+            Category.objects.order_by("-popularity").values_list("pk", flat=True)
+        )
+
+        assert ranking == [new_favourite.pk, old_favourite.pk]
+
+    def test_bump_matches_refresh(self, user, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 0
+        category = CategoryFactory()
+        record_category_access(category, user)
+        record_category_access(category, user)
+        category.refresh_from_db()
+        bumped = category.popularity
+
+        refresh_popularity()
+
+        category.refresh_from_db()
+        # Akses mentah dijumlahkan per jam, waktunya bergeser maksimal 30 menit
+        assert category.popularity == pytest.approx(
+            bumped, abs=get_popularity_rate() * 1800
+        )
+
+    def test_refresh_keeps_later_bumps(self, user):
+        category = CategoryFactory()
+        record_category_access(category, user)
+        refresh_popularity()
+        category.refresh_from_db()
+        refreshed = category.popularity
+
+        bump_popularity(category.pk)
+
+        category.refresh_from_db()
+        assert category.popularity > refreshed
+
+    def test_refresh_queries_do_not_grow_with_accesses(self, user):
+        category = CategoryFactory()
+        create_access(category, user, days_ago=0)
+        with CaptureQueriesContext(connection) as few:
+            refresh_popularity()
+
+        for days_ago in (0, 0, 1, 2, 2, 3):
+            create_access(category, user, days_ago=days_ago)
+        with CaptureQueriesContext(connection) as many:
+            refresh_popularity()
+
+        assert len(many) == len(few)
+        category.refresh_from_db()
+        assert category.popularity > 0
+
+
+class TestRecentCategories:
+    def test_device_history_is_deduplicated(self, user, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 0
+        first, second = CategoryFactory(), CategoryFactory()
+        record_category_access(first, user)
+        record_category_access(second, user)
+        record_category_access(first, user)
+
+        assert get_recent_categories(user) == [first, second]
+        assert RecentCategory.objects.get(user=user, category=first).count == 2
+
+    def test_device_history_is_capped(self, user, settings):
+        settings.RECENT_CATEGORY_LIMIT = 2
+        categories = [CategoryFactory() for _ in range(3)]
+        for category in categories:
+            record_category_access(category, user)
+
+        assert RecentCategory.objects.filter(user=user).count() == 2
+        assert get_recent_categories(user) == [categories[2], categories[1]]
+
+    def test_anonymous_access_has_no_device_history(self):
+        category = CategoryFactory()
+        record_category_access(category, get_anonymous_user())
+        record_category_access(category, get_anonymous_user())
+
+        assert not RecentCategory.objects.exists()
+        assert get_recent_categories(get_anonymous_user()) == [category]
+
+    def test_personal_order(self, user, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 0
+        popular, favourite, recent = (
+            CategoryFactory(popularity=3),
+            CategoryFactory(popularity=2),
+            CategoryFactory(popularity=1),
+        )
+        quiet = CategoryFactory(popularity=0)
+        record_category_access(favourite, user)
+        record_category_access(favourite, user)
+        record_category_access(recent, user)
+        Category.objects.filter(pk=popular.pk).update(popularity=10)
+
+        ordered = PersonalCategoryOrder(Category.objects.all(), user)
+
+        assert ordered.count() == 4
+        assert ordered[0:4] == [favourite, recent, popular, quiet]
+        # Halaman kedua hanya mengambil bagian popularitas
+        assert ordered[2:4] == [popular, quiet]
+        assert ordered[1:3] == [recent, popular]
+
+    def test_personal_order_respects_filter(self, user):
+        shown, hidden = CategoryFactory(title="Hewan"), CategoryFactory(title="Buah")
+        record_category_access(hidden, user)
+
+        ordered = PersonalCategoryOrder(Category.objects.filter(pk=shown.pk), user)
+
+        assert ordered[0:20] == [shown]
+
+
+class TestBatchTracking:
+    def test_records_all_events(self, user):
+        first, second = CategoryFactory(), CategoryFactory()
+        now = timezone.now()
+
+        record_category_accesses(
+            [(first.pk, user, now), (first.pk, user, now), (second.pk, user, now)]
+        )
+
+        assert get_access_count(first) == 2
+        assert RecentCategory.objects.get(user=user, category=first).count == 2
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.popularity > second.popularity
+
+    def test_category_ids_cache_is_invalidated(self):
+        category = CategoryFactory()
+        assert category.pk in get_category_ids()
+
+        new_category = CategoryFactory()
+
+        assert new_category.pk in get_category_ids()
+
+    def test_category_ids_cache_is_invalidated_by_bulk_delete(self):
+        category = CategoryFactory()
+        assert category.pk in get_category_ids()
+
+        Category.objects.filter(pk=category.pk).delete()
+
+        assert category.pk not in get_category_ids()
+
+    def test_deleted_category_is_skipped(self, user):
+        category, deleted = CategoryFactory(), CategoryFactory()
+        deleted_pk = deleted.pk
+        deleted.delete()
+        now = timezone.now()
+
+        accesses = record_category_accesses(
+            [(category.pk, user, now), (deleted_pk, user, now)]
+        )
+
+        assert [access.category_id for access in accesses] == [category.pk]
+        assert get_access_count(category) == 1
+
+    def test_clamp_access_time(self):
+        now = timezone.now()
+        earliest = now - timedelta(days=7)
+
+        assert clamp_access_time(None, now, earliest) == now
+        assert clamp_access_time(now + timedelta(hours=1), now, earliest) == now
+        assert clamp_access_time(now - timedelta(days=30), now, earliest) == earliest
+
+
+class TestDebounce:
+    def test_repeat_views_are_counted_once(self, user, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 300
+        category = CategoryFactory()
+
+        assert record_category_access(category, user) is not None
+        assert record_category_access(category, user) is None
+
+        assert CategoryAccess.objects.count() == 1
+
+    def test_anonymous_devices_are_debounced_separately(self, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 300
+        category = CategoryFactory()
+
+        record_category_access(category, device="10.0.0.1")
+        record_category_access(category, device="10.0.0.1")
+        record_category_access(category, device="10.0.0.2")
+
+        assert CategoryAccess.objects.count() == 2
+
+    def test_claim_uses_time_buckets(self, settings):
+        settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 300
+        now = timezone.now()
+
+        assert claim_access("device:a", 1, now - timedelta(minutes=10))
+        assert claim_access("device:a", 1, now)
+        assert not claim_access("device:a", 1, now)
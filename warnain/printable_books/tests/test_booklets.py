@@ -0,0 +1,197 @@
+import re
+
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from warnain.printable_books import booklets, views
+from warnain.printable_books.models import PrintJob
+from warnain.printable_books.printing import PrintLayout
+from warnain.printable_books.tests.factories import (
+    CategoryFactory,
+    PrintableImageFactory,
+)
+
+
+@pytest.fixture
+def print_settings(settings):
+    settings.PRINT_PAPER_SIZE = "A4"
+    settings.PRINT_DPI = 72
+    settings.PRINT_COLOR_MODE = "1"
+    settings.PRINT_MARGIN_MM = 5
+    settings.MEDIA_CACHE_DIR = ""
+    return settings
+
+
+def read_pdf(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def page_count(data: bytes) -> int:
+    return int(re.search(rb"/Count (\d+)", data).group(1))
+
+
+def image_count(data: bytes) -> int:
+    return len(re.findall(rb"/Subtype /Image", data))
+
+
+@pytest.mark.parametrize(
+    "imposition, count, expected",
+    [
+        ("single", 3, [[0], [1], [2]]),
+        ("2up", 3, [[0, 1], [2, None]]),
+        ("booklet", 4, [[3, 0], [1, 2]]),
+        ("booklet", 5, [[None, 0], [1, None], [None, 2], [3, 4]]),
+    ],
+)
+def test_impose(imposition, count, expected):
+    assert booklets.impose(count, imposition) == expected
+
+
+@pytest.mark.parametrize(
+    "imposition, duplex, sides",
+    [
+        ("single", False, None),
+        ("single", True, "two-sided-long-edge"),
+        ("2up", True, "two-sided-short-edge"),
+        ("booklet", False, "two-sided-short-edge"),
+    ],
+)
+def test_booklet_options(imposition, duplex, sides):
+    options = booklets.booklet_options(imposition, duplex)
+    assert options["print-color-mode"] == "monochrome"
+    assert options.get("sides") == sides
+
+
+@pytest.mark.django_db
+class TestCategoryBooklet:
+    def images(self, category):
+        return list(category.images.order_by("pk"))
+
+    @pytest.mark.parametrize(
+        "imposition, pages", [("single", 3), ("2up", 2), ("booklet", 2)]
+    )
+    def test_pages(self, print_settings, imposition, pages):
+        category = CategoryFactory()
+        PrintableImageFactory.create_batch(3, category=category)
+
+        path = booklets.get_category_booklet(
+            category, self.images(category), imposition=imposition
+        )
+
+        data = read_pdf(path)
+        assert page_count(data) == pages
+        assert image_count(data) == 3
+
+    def test_two_up_uses_landscape_sheet(self, print_settings):
+        category = CategoryFactory()
+        PrintableImageFactory.create_batch(2, category=category)
+        pages = list(
+            booklets.booklet_pages(self.images(category), PrintLayout(), "2up")
+        )
+        [page] = pages
+        assert page.width > page.height
+        left, right = page.images
+        assert left.x + left.width <= page.width / 2 <= right.x
+
+    def test_cached_until_images_change(self, print_settings, monkeypatch):
+        category = CategoryFactory()
+        PrintableImageFactory.create_batch(2, category=category)
+        calls = []
+        pages = booklets.booklet_pages
+        monkeypatch.setattr(
+            booklets,
+            "booklet_pages",
+            lambda *args: calls.append(1) or pages(*args),
+        )
+
+        path = booklets.get_category_booklet(category, self.images(category))
+        assert booklets.get_category_booklet(category, self.images(category)) == path
+        assert len(calls) == 1
+
+        PrintableImageFactory(category=category)
+        assert booklets.get_category_booklet(category, self.images(category)) != path
+        assert len(calls) == 2
+
+    def test_broken_image_leaves_blank_page(self, print_settings):
+        category = CategoryFactory()
+        broken, _ = PrintableImageFactory.create_batch(2, category=category)
+        with open(broken.image.path, "wb") as file:
+            file.write(b"broken")
+
+        data = read_pdf(booklets.get_category_booklet(category, self.images(category)))
+        assert page_count(data) == 2
+        assert image_count(data) == 1
+
+    def test_empty_category(self, print_settings):
+        with pytest.raises(ValueError):
+            booklets.get_category_booklet(CategoryFactory(), [])
+
+
+@pytest.mark.django_db
+class TestPrintBookletView:
+    @pytest.fixture
+    def client(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+        return client
+
+    def test_one_job_for_category(self, print_settings, monkeypatch, client):
+        category = CategoryFactory()
+        PrintableImageFactory.create_batch(3, category=category)
+        calls = []
+
+        def print_file(printer_name, file_path, copies, job_title=None, options=None):
+            calls.append((file_path, copies, options))
+            return True, "ok"
+
+        monkeypatch.setattr(views, "print_file", print_file)
+
+        response = client.post(
+            f"/api/categories/print-booklet/{category.pk}/",
+            {"printer_name": "Fake-Printer", "copies": 2, "imposition": "booklet"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        # 3 gambar booklet: 4 halaman buku di 2 sisi kertas
+        assert response.json()["pages"] == 2
+        assert response.json()["images"] == 3
+        [(file_path, copies, options)] = calls
+        assert file_path == booklets.get_category_booklet(
+            category,
+            list(category.images.order_by("pk")),
+            imposition="booklet",
+        )
+        assert copies == 2
+        assert options["sides"] == "two-sided-short-edge"
+        job = PrintJob.objects.get()
+        assert (job.status, job.file_path, job.copies) == ("completed", file_path, 2)
+
+    def test_empty_category(self, print_settings, client):
+        category = CategoryFactory()
+        response = client.post(
+            f"/api/categories/print-booklet/{category.pk}/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert not PrintJob.objects.exists()
+
+    def test_invalid_imposition(self, print_settings, client):
+        category = CategoryFactory()
+        response = client.post(
+            f"/api/categories/print-booklet/{category.pk}/",
+            {"printer_name": "Fake-Printer", "imposition": "4up"},
+            format="json",
+        )
+        assert response.status_code == 400
+        assert "imposition" in response.json()
+
+    def test_requires_token(self, print_settings):
+        category = CategoryFactory()
+        response = APIClient().post(f"/api/categories/print-booklet/{category.pk}/")
+        assert response.status_code == 403
@@ -0,0 +1,240 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from warnain.printable_books.models import (
+    Category,
+    CategoryAccess,
+    PrintableImage,
+    PrintJob,
+    PrintJobArchive,
+)
+from warnain.printable_books.tests.factories import (
+    CategoryFactory,
+    PrintableImageFactory,
+    PrintJobFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestArchivePrintJobs:
+    def test_moves_old_jobs_to_archive(self):
+        old_job = PrintJobFactory()
+        PrintJob.objects.filter(pk=old_job.pk).update(
+            created=timezone.now() - timedelta(days=120)
+        )
+        recent_job = PrintJobFactory()
+
+        call_command("archive_print_jobs", "--days", "90", "--batch-size", "1")
+
+        assert list(PrintJob.objects.all()) == [recent_job]
+        archived = PrintJobArchive.objects.get()
+        assert archived.job_id == old_job.pk
+        assert archived.user_id == old_job.user_id
+
+    def test_keeps_active_jobs(self):
+        job = PrintJobFactory(status="pending")
+        PrintJob.objects.filter(pk=job.pk).update(
+            created=timezone.now() - timedelta(days=120)
+        )
+
+        call_command("archive_print_jobs", "--days", "90")
+
+        assert PrintJob.objects.filter(pk=job.pk).exists()
+        assert not PrintJobArchive.objects.exists()
+
+    def test_dry_run_does_not_move(self):
+        job = PrintJobFactory()
+        PrintJob.objects.filter(pk=job.pk).update(
+            created=timezone.now() - timedelta(days=120)
+        )
+
+        call_command("archive_print_jobs", "--days", "90", "--dry-run")
+
+        assert PrintJob.objects.filter(pk=job.pk).exists()
+
+
+class TestBenchmarkPrint:
+    def test_reports_throughput_and_latency(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_print",
+            "--jobs",
+            "5",
+            "--concurrency",
+            "1",
+            "--latency",
+            "0",
+            "--drain-rate",
+            "1000",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        assert "Submitted:          5/5 (0 failed)" in output
+        assert "Completion latency: p50=" in output
+        assert not PrintJob.objects.exists()
+
+    def test_refuses_real_cups(self, settings):
+        settings.CUPS_CONNECTION_CLASS = "cups.Connection"
+
+        with pytest.raises(CommandError):
+            call_command("benchmark_print")
+
+
+class TestReplayRequests:
+    @pytest.mark.django_db(transaction=True)
+    def test_reports_latency_per_endpoint(self, live_server, tmp_path):
+        category = CategoryFactory()
+        capture_file = tmp_path / "requests.jsonl"
+        records = [
+            {
+                "time": 1000 + index * 0.01,
+                "method": "GET",
+                "path": "/api/categories/",
+                "endpoint": "api:categories:list",
+                "query": {"sort_by": ["title"]},
+                "body": None,
+            }
+            for index in range(4)
+        ] + [
+            {
+                "time": 1000.05,
+                "method": "POST",
+                "path": "/api/categories/track/batch/",
+                "endpoint": "api:categories:track-access-batch",
+                "query": {},
+                "body": [{"category_id": category.pk}],
+            },
+            # Upload tanpa body tidak bisa diputar ulang
+            {
+                "time": 1000.06,
+                "method": "POST",
+                "path": "/api/categories/print-temp/",
+                "endpoint": "api:categories:print-temp",
+                "query": {},
+                "body": None,
+            },
+        ]
+        capture_file.write_text("\n".join(json.dumps(record) for record in records))
+        out = StringIO()
+
+        call_command(
+            "replay_requests",
+            str(capture_file),
+            "--target",
+            live_server.url,
+            "--concurrency",
+            "1",
+            "--speed",
+            "10",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        assert "api:categories:list" in output
+        assert "api:categories:track-access-batch" in output
+        assert "print-temp" not in output
+        assert "5 requests in" in output
+        assert ", 0 errors" in output
+
+    def test_rejects_empty_capture(self, tmp_path):
+        capture_file = tmp_path / "requests.jsonl"
+        capture_file.write_text("")
+
+        with pytest.raises(CommandError):
+            call_command("replay_requests", str(capture_file))
+
+
+class TestSeedPerfData:
+    def seed(self, *extra):
+        call_command(
+            "seed_perf_data",
+            "--categories",
+            "20",
+            "--images-per-category",
+            "3",
+            "--accesses",
+            "500",
+            "--print-jobs",
+            "30",
+            "--users",
+            "10",
+            "--image-variants",
+            "2",
+            "--image-size",
+            "16",
+            "--batch-size",
+            "100",
+            *extra,
+            stdout=StringIO(),
+        )
+
+    def test_creates_skewed_catalog(self):
+        self.seed()
+
+        assert Category.objects.count() == 20
+        assert PrintableImage.objects.count() == 60
+        assert CategoryAccess.objects.count() == 500
+        assert PrintJob.objects.count() == 30
+        assert Token.objects.count() == 10
+        counts = sorted(
+            Category.objects.annotate(total=Count("access")).values_list(
+                "total", flat=True
+            ),
+            reverse=True,
+        )
+        # Zipf: kategori teratas jauh lebih sering dibuka dari median
+        assert counts[0] > 5 * counts[10]
+        top = Category.objects.order_by("-popularity").first()
+        assert top.access.count() == counts[0]
+        assert not PrintableImage.objects.filter(image_hash="").exists()
+        assert not PrintableImage.objects.filter(image_width__isnull=True).exists()
+        assert not Category.objects.filter(thumbnail_blurhash="").exists()
+
+    def test_same_seed_same_data(self):
+        self.seed()
+        first = list(
+            CategoryAccess.objects.order_by("pk").values_list(
+                "category__title", "user__username", "created"
+            )
+        )
+
+        self.seed("--clear")
+        second = list(
+            CategoryAccess.objects.order_by("pk").values_list(
+                "category__title", "user__username", "created"
+            )
+        )
+
+        assert first == second
+        assert Category.objects.count() == 20
+
+
+class TestBackfillImageMetadata:
+    def test_fills_missing_metadata(self):
+        image = PrintableImageFactory()
+        expected = (image.image_hash, image.image_blurhash, image.image_bytes)
+        missing = CategoryFactory()
+        Category.objects.filter(pk=missing.pk).update(thumbnail="categories/gone.png")
+        PrintableImage.objects.update(
+            image_hash="", image_blurhash="", image_bytes=None, image_width=None
+        )
+        Category.objects.update(thumbnail_hash="")
+
+        output = StringIO()
+        call_command("backfill_image_metadata", stdout=output)
+
+        image.refresh_from_db()
+        assert (image.image_hash, image.image_blurhash, image.image_bytes) == expected
+        assert image.image_width == 64
+        assert Category.objects.filter(thumbnail_hash="").get() == missing
+        assert "1 files not found" in output.getvalue()
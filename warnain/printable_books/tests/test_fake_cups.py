@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from warnain.printable_books import fake_cups
+from warnain.printable_books.utils import (
+    check_printer_status,
+    get_available_printers,
+    print_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def server():
+    fake_cups.server.reset(printers=["Fake-Printer"], latency=0, drain_rate=1000)
+    yield fake_cups.server
+    fake_cups.server.reset()
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "page.png"
+    path.write_bytes(b"png")
+    return str(path)
+
+
+def test_utils_use_simulator():
+    printers = get_available_printers()
+
+    assert [printer["name"] for printer in printers] == ["Fake-Printer"]
+    assert check_printer_status("Fake-Printer")["active"] is True
+    assert check_printer_status("Missing")["exists"] is False
+
+
+def test_jobs_drain_in_order(server, document):
+    server.drain_rate = 20
+    connection = fake_cups.Connection()
+
+    first = connection.printFile("Fake-Printer", document, "first", {"copies": "2"})
+    second = connection.printFile("Fake-Printer", document, "second", {"copies": "1"})
+
+    jobs = connection.getJobs()
+    assert jobs[first]["job-state"] == fake_cups.IPP_JOB_PROCESSING
+    assert jobs[second]["job-state"] == fake_cups.IPP_JOB_PENDING
+    assert server.jobs[second].completed == pytest.approx(
+        server.jobs[first].completed + 0.05
+    )
+
+    time.sleep(0.2)
+    assert connection.getJobs() == {}
+    assert set(connection.getJobs(which_jobs="completed")) == {first, second}
+
+
+def test_stopped_printer_rejects_jobs(server, document):
+    server.set_fault("Fake-Printer", fake_cups.FAULT_STOPPED)
+
+    success, message = print_file("Fake-Printer", document)
+
+    assert success is False
+    assert "tidak aktif" in message
+    with pytest.raises(fake_cups.IPPError):
+        fake_cups.Connection().printFile("Fake-Printer", document, "job", {})
+
+
+def test_paper_out_holds_jobs_until_cleared(server, document):
+    server.set_fault("Fake-Printer", fake_cups.FAULT_PAPER_OUT)
+    connection = fake_cups.Connection()
+
+    job_id = connection.printFile("Fake-Printer", document, "job", {})
+
+    attributes = connection.getPrinterAttributes("Fake-Printer")
+    assert attributes["printer-state-reasons"] == ["media-empty-error"]
+    assert connection.getJobs()[job_id]["job-state"] == fake_cups.IPP_JOB_HELD
+
+    server.set_fault("Fake-Printer", None)
+    time.sleep(0.01)
+    assert connection.getJobs() == {}
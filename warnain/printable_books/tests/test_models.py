@@ -0,0 +1,80 @@
+import pytest
+from django.core.files.base import ContentFile
+from rest_framework.test import APIRequestFactory
+
+from warnain.printable_books.models import Category, PrintableImage
+from warnain.printable_books.serializers import (
+    CategorySerializer,
+    PrintableImageSerializer,
+)
+from warnain.printable_books.tests.factories import (
+    CategoryFactory,
+    PrintableImageFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestImageMetadata:
+    def test_metadata_set_on_upload(self):
+        category = CategoryFactory()
+
+        assert len(category.thumbnail_hash) == 12
+        assert (category.thumbnail_width, category.thumbnail_height) == (32, 32)
+        assert category.thumbnail_bytes == category.thumbnail.size
+        assert len(category.thumbnail_blurhash) == 28
+
+    def test_loading_does_not_open_file(self, monkeypatch):
+        image = PrintableImageFactory()
+        monkeypatch.setattr(
+            "django.db.models.fields.files.ImageFieldFile._get_image_dimensions",
+            lambda self: pytest.fail("file opened"),
+        )
+
+        loaded = PrintableImage.objects.get(pk=image.pk)
+
+        assert (loaded.image_width, loaded.image_height) == (64, 64)
+
+    def test_hash_changes_with_content(self):
+        category = CategoryFactory()
+        first = category.thumbnail_hash
+
+        category.thumbnail.save("new.png", ContentFile(b"other image"))
+
+        assert category.thumbnail_hash != first
+        assert Category.objects.get().thumbnail_hash == category.thumbnail_hash
+
+    def test_unchanged_file_not_rehashed(self, monkeypatch):
+        category = Category.objects.get(pk=CategoryFactory().pk)
+        monkeypatch.setattr(
+            "warnain.printable_books.models.image_metadata",
+            lambda field_file: pytest.fail("file read again"),
+        )
+
+        category.title = "Renamed"
+        category.save()
+
+    def test_update_fields_include_hash(self):
+        category = Category.objects.get(pk=CategoryFactory().pk)
+        other = CategoryFactory()
+
+        category.thumbnail = other.thumbnail.name
+        category.save(update_fields=["thumbnail"])
+
+        assert Category.objects.get(pk=category.pk).thumbnail_hash == (
+            other.thumbnail_hash
+        )
+
+    def test_serializer_url_has_version(self):
+        image = PrintableImageFactory()
+        request = APIRequestFactory().get("/")
+
+        data = PrintableImageSerializer(image, context={"request": request}).data
+        thumbnail = CategorySerializer(image.category).data["thumbnail"]
+
+        assert data["image"].endswith(f"{image.image.url}?v={image.image_hash}")
+        assert data["image"].startswith("http://testserver/")
+        assert thumbnail.endswith(f"?v={image.category.thumbnail_hash}")
+        assert (data["width"], data["height"]) == (64, 64)
+        assert data["bytes"] == image.image.size
+        assert data["blurhash"] == image.image_blurhash
@@ -0,0 +1,421 @@
+import io
+import os
+import re
+import threading
+import zlib
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageDraw
+from PIL.JpegImagePlugin import JpegImageFile
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from warnain.printable_books import printing, views
+from warnain.printable_books.models import PrintJob
+from warnain.printable_books.pdf import PAPER_SIZES, Page, PlacedImage, write_pdf
+from warnain.printable_books.tests.factories import (
+    PrintableImageFactory,
+    PrintJobFactory,
+)
+
+
+def line_art(size=(400, 300), mode="RGB") -> Image.Image:
+    image = Image.new(mode, size, "white")
+    ImageDraw.Draw(image).ellipse(
+        (20, 20, size[0] - 20, size[1] - 20), outline="black", width=4
+    )
+    return image
+
+
+def png(image: Image.Image) -> ContentFile:
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="page.png")
+
+
+def pdf_images(data: bytes):
+    """
+    (dictionary, isi terdekompresi) setiap image XObject di PDF
+    """
+    pattern = re.compile(rb"<< (/Type /XObject /Subtype /Image .*?) >>\nstream\n", re.S)
+    for match in pattern.finditer(data):
+        length = int(re.search(rb"/Length (\d+)", match.group(1)).group(1))
+        start = match.end()
+        yield match.group(1).decode(), zlib.decompress(data[start:][:length])
+
+
+@pytest.fixture
+def print_settings(settings):
+    settings.PRINT_PREPARE = True
+    settings.PRINT_PAPER_SIZE = "A4"
+    settings.PRINT_DPI = 72
+    settings.PRINT_COLOR_MODE = "1"
+    settings.PRINT_MARGIN_MM = 0
+    settings.MEDIA_CACHE_DIR = ""
+    return settings
+
+
+class TestWritePdf:
+    def test_xref_offsets(self):
+        image = line_art(mode="L").convert("1")
+        buffer = io.BytesIO()
+        write_pdf([Page(100, 100, [PlacedImage(image, 0, 0, 100, 75)])] * 2, buffer)
+        data = buffer.getvalue()
+
+        assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+        xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+        assert data[xref:].startswith(b"xref\n0 ")
+        offsets = re.findall(rb"(\d{10}) 00000 n ", data[xref:])
+        for object_id, offset in enumerate(offsets, 1):
+            assert data.startswith(f"{object_id} 0 obj".encode(), int(offset))
+        assert b"/Count 2" in data
+
+    def test_one_bit_image(self):
+        image = line_art(mode="L").convert("1")
+        buffer = io.BytesIO()
+        write_pdf([Page(100, 100, [PlacedImage(image, 0, 0, 100, 75)])], buffer)
+
+        [(dictionary, content)] = pdf_images(buffer.getvalue())
+        assert "/BitsPerComponent 1" in dictionary
+        assert "/Width 400 /Height 300" in dictionary
+        assert content == image.tobytes()
+
+    def test_rejects_color(self):
+        with pytest.raises(ValueError):
+            PlacedImage(line_art(), 0, 0, 10, 10)
+
+
+class TestPrepareRaster:
+    def test_transparent_becomes_white(self):
+        image = Image.new("RGBA", (10, 10), (255, 0, 0, 0))
+        raster = printing.prepare_raster(image, 10, 10, "1")
+        assert raster.mode == "1"
+        assert raster.getextrema() == (255, 255)
+
+    def test_threshold_keeps_lines(self):
+        raster = printing.prepare_raster(line_art(), 200, 150, "1")
+        assert raster.size == (200, 150)
+        assert raster.getextrema() == (0, 255)
+
+    def test_grayscale(self):
+        raster = printing.prepare_raster(line_art(), 200, 150, "L")
+        assert raster.mode == "L"
+
+
+class TestLayoutPage:
+    def test_fits_portrait_paper(self, print_settings):
+        page = printing.layout_page(
+            line_art((300, 600)), printing.PrintLayout(), 72, "1"
+        )
+        width, height = PAPER_SIZES["A4"]
+        assert (page.width, page.height) == (width, height)
+        [placed] = page.images
+        assert placed.height == pytest.approx(height)
+        assert placed.x == pytest.approx((width - placed.width) / 2)
+
+    def test_landscape_image_rotates_paper(self, print_settings):
+        page = printing.layout_page(
+            line_art((600, 300)), printing.PrintLayout(), 150, "1"
+        )
+        assert page.width > page.height
+        [placed] = page.images
+        # Resolusi raster mengikuti DPI di ukuran cetak
+        assert placed.image.width == int(placed.width / 72 * 150)
+
+    def test_fixed_orientation(self, print_settings):
+        layout = printing.PrintLayout(orientation="portrait")
+        page = printing.layout_page(line_art((600, 300)), layout, 72, "1")
+        assert page.width < page.height
+
+    def test_cover_fills_page(self, print_settings):
+        layout = printing.PrintLayout("A5", "portrait", "cover")
+        page = printing.layout_page(line_art((600, 300)), layout, 72, "1")
+        [placed] = page.images
+        assert (placed.x, placed.y) == pytest.approx((0, 0), abs=1)
+        assert (placed.width, placed.height) == pytest.approx(PAPER_SIZES["A5"], abs=1)
+        # Hanya bagian yang terlihat yang dirasterisasi
+        assert placed.image.size == (
+            int(placed.width),
+            int(placed.height),
+        )
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"paper_size": "A3"}, {"orientation": "sideways"}, {"fit": "stretch"}],
+    )
+    def test_invalid_layout(self, print_settings, options):
+        with pytest.raises(ValueError):
+            printing.PrintLayout(**options)
+
+
+@pytest.mark.django_db
+class TestPrintArtifact:
+    def test_pdf_cached(self, print_settings, monkeypatch):
+        printable = PrintableImageFactory(image=png(line_art()))
+        calls = []
+        render = printing.render_print_pdf
+        monkeypatch.setattr(
+            printing, "render_print_pdf", lambda *args: calls.append(1) or render(*args)
+        )
+
+        path = printing.get_print_artifact(printable)
+        assert printing.get_print_artifact(printable) == path
+        assert len(calls) == 1
+        with open(path, "rb") as file:
+            data = file.read()
+        [(dictionary, _)] = pdf_images(data)
+        assert "/BitsPerComponent 1" in dictionary
+
+    def test_new_artifact_for_new_image(self, print_settings):
+        printable = PrintableImageFactory(image=png(line_art()))
+        path = printing.get_print_artifact(printable)
+
+        printable.image = png(line_art((300, 300)))
+        printable.save()
+        assert printing.get_print_artifact(printable) != path
+
+    def test_layout_changes_key(self, print_settings):
+        printable = PrintableImageFactory(image=png(line_art()))
+        paths = {
+            printing.get_print_artifact(printable, printing.PrintLayout(*layout))
+            for layout in [
+                ("A4", "auto", "contain"),
+                ("F4", "auto", "contain"),
+                ("A4", "landscape", "contain"),
+                ("A4", "auto", "cover"),
+            ]
+        }
+        assert len(paths) == 4
+        assert printing.get_print_artifact(printable) in paths
+
+    def test_settings_change_key(self, print_settings):
+        printable = PrintableImageFactory(image=png(line_art()))
+        path = printing.get_print_artifact(printable)
+        print_settings.PRINT_PAPER_SIZE = "F4"
+        assert printing.get_print_artifact(printable) != path
+
+    def test_broken_image_falls_back_to_original(self, print_settings):
+        printable = PrintableImageFactory()
+        with open(printable.image.path, "wb") as file:
+            file.write(b"broken")
+        assert printing.get_print_file(printable) == (printable.image.path, None)
+
+    def test_disabled(self, print_settings):
+        print_settings.PRINT_PREPARE = False
+        printable = PrintableImageFactory()
+        assert printing.get_print_file(printable) == (printable.image.path, None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_print_image_sends_artifact(print_settings, monkeypatch, user):
+    printable = PrintableImageFactory(image=png(line_art()))
+    sent = {}
+
+    def print_file(printer_name, file_path, copies, options=None):
+        sent.update(file_path=file_path, options=options)
+        return True, "ok"
+
+    monkeypatch.setattr(views, "print_file", print_file)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+
+    response = client.post(
+        f"/api/categories/print-image/{printable.pk}/",
+        {"printer_name": "Fake-Printer"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert sent["file_path"] == printing.get_print_artifact(printable)
+    assert sent["options"] == {"print-color-mode": "monochrome"}
+    job = PrintJob.objects.get()
+    assert job.image == printable
+    assert (job.paper_size, job.orientation, job.fit) == ("A4", "auto", "contain")
+
+
+@pytest.mark.django_db
+def test_print_image_layout(print_settings, monkeypatch, user):
+    printable = PrintableImageFactory(image=png(line_art()))
+    sent = {}
+    monkeypatch.setattr(
+        views,
+        "print_file",
+        lambda printer, path, copies, options=None: sent.update(path=path)
+        or (True, "ok"),
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+    url = f"/api/categories/print-image/{printable.pk}/"
+
+    response = client.post(
+        url,
+        {"printer_name": "Fake-Printer", "paper_size": "F4", "fit": "cover"},
+        format="json",
+    )
+    assert response.status_code == 200
+    layout = printing.PrintLayout("F4", "auto", "cover")
+    assert sent["path"] == printing.get_print_artifact(printable, layout)
+
+    response = client.post(
+        url, {"printer_name": "Fake-Printer", "fit": "stretch"}, format="json"
+    )
+    assert response.status_code == 400
+    assert "fit" in response.json()
+
+
+@pytest.mark.django_db
+class TestWarmPrintCache:
+    def test_warms_most_printed(self, print_settings, monkeypatch):
+        popular, rare = PrintableImageFactory.create_batch(2, image=png(line_art()))
+        PrintJobFactory.create_batch(3, image=popular, paper_size="A4", fit="cover")
+        PrintJobFactory(image=rare)
+        PrintJobFactory(image=None)
+        rendered = []
+        render = printing.render_print_pdf
+        monkeypatch.setattr(
+            printing,
+            "render_print_pdf",
+            lambda printable, layout, file: rendered.append((printable, layout.key))
+            or render(printable, layout, file),
+        )
+
+        assert printing.warm_print_cache(limit=1) == (1, 0)
+        assert rendered == [(popular, "A4:auto:cover")]
+
+        # Cetak berikutnya memakai file yang sudah di-warm
+        layout = printing.PrintLayout("A4", "auto", "cover")
+        printing.get_print_artifact(popular, layout)
+        assert len(rendered) == 1
+
+    def test_old_jobs_ignored(self, print_settings):
+        job = PrintJobFactory(image=PrintableImageFactory())
+        PrintJob.objects.filter(pk=job.pk).update(
+            created=timezone.now() - timedelta(days=60)
+        )
+        assert printing.warm_print_cache(days=30) == (0, 0)
+
+    def test_broken_image_counted(self, print_settings):
+        printable = PrintableImageFactory()
+        with open(printable.image.path, "wb") as file:
+            file.write(b"broken")
+        PrintJobFactory(image=printable)
+        assert printing.warm_print_cache() == (0, 1)
+
+    def test_command(self, print_settings):
+        PrintJobFactory(image=PrintableImageFactory(image=png(line_art())))
+        out = io.StringIO()
+        call_command("warm_print_cache", stdout=out)
+        assert "1 print files ready" in out.getvalue()
+
+
+def photo(path, size=(4000, 3000), orientation=None, format="JPEG"):
+    image = line_art(size)
+    exif = image.getexif()
+    if orientation:
+        exif[ExifTags.Base.Orientation] = orientation
+    image.save(path, format, exif=exif)
+    return str(path)
+
+
+class TestNormalizeUpload:
+    def test_exif_rotation_and_downscale(self, print_settings, tmp_path):
+        source = photo(tmp_path / "photo.jpg", orientation=6)
+
+        path = printing.normalize_upload(source)
+
+        with Image.open(path) as image:
+            assert image.format == "JPEG"
+            # Diputar jadi portrait lalu diperkecil ke area cetak A4 di 72 DPI
+            assert image.size == (595, 793)
+            assert ExifTags.Base.Orientation not in image.getexif()
+
+    def test_jpeg_decoded_with_draft(self, print_settings, tmp_path, monkeypatch):
+        source = photo(tmp_path / "photo.jpg")
+        drafts = []
+        draft = JpegImageFile.draft
+        monkeypatch.setattr(
+            JpegImageFile,
+            "draft",
+            lambda self, mode, size: drafts.append(size) or draft(self, mode, size),
+        )
+
+        printing.normalize_upload(source)
+
+        assert drafts == [(793, 595)]
+
+    def test_grayscale(self, print_settings, tmp_path):
+        path = printing.normalize_upload(photo(tmp_path / "photo.jpg"), grayscale=True)
+        with Image.open(path) as image:
+            assert image.mode == "L"
+
+    def test_small_image_not_enlarged(self, print_settings, tmp_path):
+        path = printing.normalize_upload(photo(tmp_path / "small.jpg", (300, 200)))
+        with Image.open(path) as image:
+            assert image.size == (300, 200)
+
+    def test_png_stays_png(self, print_settings, tmp_path):
+        source = tmp_path / "drawing.png"
+        Image.new("RGBA", (1000, 1000), (0, 0, 0, 0)).save(source)
+        path = printing.normalize_upload(str(source), printing.PrintLayout("A5"))
+        with Image.open(path) as image:
+            assert image.format == "PNG"
+            assert image.mode == "RGB"
+            assert image.getextrema() == ((255, 255),) * 3
+
+    def test_broken_upload_sent_as_is(self, print_settings, tmp_path):
+        source = tmp_path / "broken.jpg"
+        source.write_bytes(b"broken")
+        assert printing.prepare_upload(str(source)) == str(source)
+
+    def test_disabled(self, print_settings, tmp_path):
+        print_settings.PRINT_UPLOAD_NORMALIZE = False
+        source = photo(tmp_path / "photo.jpg")
+        assert printing.prepare_upload(source) == source
+
+
+@pytest.mark.django_db
+def test_print_temp_sends_normalized_upload(
+    print_settings, monkeypatch, user, tmp_path
+):
+    sent = {}
+
+    def print_file(printer_name, file_path, copies):
+        with Image.open(file_path) as image:
+            sent.update(path=file_path, size=image.size, mode=image.mode)
+        return True, "ok"
+
+    prepare = printing.prepare_upload
+
+    def prepare_upload(*args):
+        sent["thread"] = threading.current_thread().name
+        return prepare(*args)
+
+    monkeypatch.setattr(views, "print_file", print_file)
+    monkeypatch.setattr(views, "prepare_upload", prepare_upload)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+
+    with open(photo(tmp_path / "photo.jpg", orientation=8), "rb") as upload:
+        response = client.post(
+            "/api/categories/print-temp/",
+            {"image": upload, "printer_name": "Fake-Printer", "grayscale": "true"},
+            format="multipart",
+        )
+
+    assert response.status_code == 200, response.content
+    assert sent["size"] == (595, 793)
+    assert sent["mode"] == "L"
+    assert sent["thread"].startswith("cpu-bound")
+    # File upload dan hasil normalisasi dihapus setelah dikirim
+    assert not os.path.exists(sent["path"])
+    assert PrintJob.objects.get().file_path == sent["path"]
@@ -0,0 +1,302 @@
+import io
+import os
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from warnain.printable_books import views
+from warnain.printable_books.models import PrintJob, UploadSession
+from warnain.printable_books.uploads import (
+    OffsetMismatch,
+    cleanup_expired_uploads,
+    create_upload_session,
+    staging_path,
+    store_chunk,
+)
+from warnain.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+UPLOADS = "/api/categories/uploads/"
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+    return client
+
+
+@pytest.fixture
+def printed(monkeypatch):
+    calls = []
+
+    def print_file(printer_name, file_path, copies, options=None):
+        with open(file_path, "rb") as file:
+            calls.append((printer_name, file.read(), copies))
+        return True, "ok"
+
+    monkeypatch.setattr(views, "print_file", print_file)
+    return calls
+
+
+def put_chunk(client, upload_id, offset, data):
+    return client.put(
+        f"{UPLOADS}{upload_id}/",
+        data,
+        content_type="application/octet-stream",
+        HTTP_UPLOAD_OFFSET=str(offset),
+    )
+
+
+def upload(client, data, chunk=500):
+    response = client.post(
+        UPLOADS, {"file_name": "photo.png", "size": len(data)}, format="json"
+    )
+    assert response.status_code == 201
+    upload_id = response.json()["id"]
+    for offset in range(0, len(data), chunk):
+        assert (
+            put_chunk(client, upload_id, offset, data[offset:][:chunk]).status_code
+            == 200
+        )
+    return upload_id
+
+
+class TestChunkedUpload:
+    def test_create(self, client, user):
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": 300}, format="json"
+        )
+
+        assert response.status_code == 201
+        body = response.json()
+        assert (body["offset"], body["status"]) == (0, "uploading")
+        session = UploadSession.objects.get(pk=body["id"], user=user)
+        assert os.path.getsize(staging_path(session)) == 0
+
+    @pytest.mark.parametrize("size", [0, 51])
+    def test_size_limit(self, settings, client, size):
+        settings.UPLOAD_MAX_BYTES = 50
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": size}, format="json"
+        )
+        assert response.status_code == 400
+        assert "size" in response.json()
+
+    def test_resume_after_lost_chunk(self, client):
+        data = png_bytes()
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": len(data)}, format="json"
+        )
+        upload_id = response.json()["id"]
+        assert put_chunk(client, upload_id, 0, data[:100]).json()["offset"] == 100
+
+        # Koneksi putus: app tidak tahu chunk kedua sampai atau tidak
+        response = put_chunk(client, upload_id, 200, data[200:])
+        assert response.status_code == 409
+        assert response.json()["offset"] == 100
+        assert client.get(f"{UPLOADS}{upload_id}/").json()["offset"] == 100
+
+        response = put_chunk(client, upload_id, 100, data[100:])
+        assert response.json()["offset"] == len(data)
+        with open(staging_path(UploadSession.objects.get()), "rb") as file:
+            assert file.read() == data
+
+    def test_duplicate_chunk_keeps_received_bytes(self, client):
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": 30}, format="json"
+        )
+        upload_id = response.json()["id"]
+        put_chunk(client, upload_id, 0, b"a" * 10)
+        put_chunk(client, upload_id, 10, b"b" * 10)
+
+        # Retry chunk pertama yang terlambat sampai
+        response = put_chunk(client, upload_id, 0, b"a" * 10)
+        assert response.status_code == 409
+        assert response.json()["offset"] == 20
+
+        assert put_chunk(client, upload_id, 20, b"c" * 10).status_code == 200
+        with open(staging_path(UploadSession.objects.get()), "rb") as file:
+            assert file.read() == b"a" * 10 + b"b" * 10 + b"c" * 10
+
+    def test_stale_session_cannot_overwrite(self, user):
+        session = create_upload_session(user, "photo.png", 30)
+        # Request lain membaca session sebelum dua chunk di-commit
+        stale = UploadSession.objects.get(pk=session.pk)
+        store_chunk(session, 0, b"a" * 10)
+        store_chunk(session, 10, b"b" * 10)
+
+        with pytest.raises(OffsetMismatch) as error:
+            store_chunk(stale, 0, b"x" * 10)
+
+        assert error.value.received == 20
+        assert UploadSession.objects.get().received == 20
+        with open(staging_path(session), "rb") as file:
+            assert file.read() == b"a" * 10 + b"b" * 10
+
+    def test_chunk_past_size(self, client):
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": 10}, format="json"
+        )
+        response = put_chunk(client, response.json()["id"], 0, b"x" * 11)
+        assert response.status_code == 400
+
+    def test_chunk_size_limit(self, settings, client):
+        settings.UPLOAD_CHUNK_MAX_BYTES = 10
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": 100}, format="json"
+        )
+        response = put_chunk(client, response.json()["id"], 0, b"x" * 11)
+        assert response.status_code == 400
+
+    def test_missing_offset(self, client):
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": 10}, format="json"
+        )
+        response = client.put(
+            f"{UPLOADS}{response.json()['id']}/",
+            b"x",
+            content_type="application/octet-stream",
+        )
+        assert response.status_code == 400
+
+    def test_other_user_session(self, client):
+        session = create_upload_session(UserFactory(), "photo.png", 10)
+        assert client.get(f"{UPLOADS}{session.pk}/").status_code == 404
+        assert put_chunk(client, session.pk, 0, b"x").status_code == 404
+
+    def test_expired_session(self, client, user):
+        session = create_upload_session(user, "photo.png", 10)
+        UploadSession.objects.update(expires=timezone.now())
+        assert put_chunk(client, session.pk, 0, b"x").status_code == 404
+
+    def test_cancel(self, client, user):
+        session = create_upload_session(user, "photo.png", 10)
+
+        response = client.delete(f"{UPLOADS}{session.pk}/")
+
+        assert response.status_code == 204
+        assert not UploadSession.objects.exists()
+        assert not os.path.exists(staging_path(session))
+
+    def test_requires_token(self):
+        response = APIClient().post(
+            UPLOADS, {"file_name": "photo.png", "size": 10}, format="json"
+        )
+        assert response.status_code == 403
+
+
+class TestFinalizeUpload:
+    def test_prints_and_removes_upload(self, settings, client, printed):
+        settings.PRINT_UPLOAD_NORMALIZE = False
+        data = png_bytes()
+        upload_id = upload(client, data)
+
+        response = client.post(
+            f"{UPLOADS}{upload_id}/finalize/",
+            {"printer_name": "Fake-Printer", "copies": 2},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert response.json()["file_name"] == "photo.png"
+        assert printed == [("Fake-Printer", data, 2)]
+        assert PrintJob.objects.get().status == "completed"
+        assert not UploadSession.objects.exists()
+        assert os.listdir(settings.UPLOAD_STAGING_DIR) == []
+
+    def test_incomplete(self, client, printed):
+        data = png_bytes()
+        response = client.post(
+            UPLOADS, {"file_name": "photo.png", "size": len(data)}, format="json"
+        )
+        upload_id = response.json()["id"]
+        put_chunk(client, upload_id, 0, data[:100])
+
+        response = client.post(
+            f"{UPLOADS}{upload_id}/finalize/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 409
+        assert response.json()["offset"] == 100
+        assert printed == []
+
+    def test_failed_print_can_be_retried(self, client, monkeypatch):
+        upload_id = upload(client, png_bytes())
+        monkeypatch.setattr(views, "print_file", lambda *args: (False, "offline"))
+        url = f"{UPLOADS}{upload_id}/finalize/"
+
+        response = client.post(url, {"printer_name": "Fake-Printer"}, format="json")
+        assert response.status_code == 400
+        assert UploadSession.objects.get().status == "uploading"
+
+        monkeypatch.setattr(views, "print_file", lambda *args: (True, "ok"))
+        response = client.post(url, {"printer_name": "Fake-Printer"}, format="json")
+        assert response.status_code == 200
+        assert not UploadSession.objects.exists()
+
+    def test_already_printing(self, client, printed):
+        upload_id = upload(client, png_bytes())
+        UploadSession.objects.update(status="printing")
+
+        response = client.post(
+            f"{UPLOADS}{upload_id}/finalize/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 409
+        assert printed == []
+
+    def test_not_an_image(self, client, printed):
+        upload_id = upload(client, b"not an image")
+
+        response = client.post(
+            f"{UPLOADS}{upload_id}/finalize/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 400
+        assert printed == []
+        assert not UploadSession.objects.exists()
+
+
+class TestCleanupUploads:
+    def test_removes_expired_and_orphaned_files(self, settings, user):
+        expired = create_upload_session(user, "old.png", 10)
+        active = create_upload_session(user, "new.png", 10)
+        UploadSession.objects.filter(pk=expired.pk).update(expires=timezone.now())
+        orphan = os.path.join(settings.UPLOAD_STAGING_DIR, "orphan.part")
+        open(orphan, "wb").close()
+        old = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orphan, (old, old))
+
+        assert cleanup_expired_uploads() == 2
+
+        assert list(UploadSession.objects.all()) == [active]
+        assert os.listdir(settings.UPLOAD_STAGING_DIR) == [f"{active.pk}.part"]
+
+    def test_command(self, user):
+        session = create_upload_session(user, "old.png", 10)
+        UploadSession.objects.update(expires=timezone.now())
+
+        call_command("cleanup_uploads")
+
+        assert not os.path.exists(staging_path(session))
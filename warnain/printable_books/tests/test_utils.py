@@ -0,0 +1,22 @@
+from warnain.printable_books.utils import parse_ip_addr_output
+
+IP_ADDR_OUTPUT = """\
+1: lo: <LOOPBACK,UP,LOWER_UP> mtu 65536 qdisc noqueue state UNKNOWN group default
+    link/loopback 00:00:00:00:00:00 brd 00:00:00:00:00:00
+    inet 127.0.0.1/8 scope host lo
+2: enp37s0: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc fq_codel state UP
+    link/ether aa:bb:cc:dd:ee:ff brd ff:ff:ff:ff:ff:ff
+    inet 192.168.65.124/24 brd 192.168.65.255 scope global dynamic enp37s0
+    inet6 fe80::1/64 scope link
+3: wlan0: <NO-CARRIER,BROADCAST,MULTICAST> mtu 1500 qdisc noqueue state DOWN
+    link/ether 11:22:33:44:55:66 brd ff:ff:ff:ff:ff:ff
+4: veth1@if5: <BROADCAST,MULTICAST> mtu 1500 qdisc noqueue state DOWN
+    inet 10.0.0.2/24 scope global veth1
+"""
+
+
+def test_parse_ip_addr_output():
+    assert parse_ip_addr_output(IP_ADDR_OUTPUT) == [
+        {"name": "enp37s0", "ip_address": "192.168.65.124", "status": "UP"},
+        {"name": "veth1", "ip_address": "10.0.0.2", "status": "DOWN"},
+    ]
@@ -0,0 +1,361 @@
+import asyncio
+import io
+import os
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from warnain.printable_books import sprites, views
+from warnain.printable_books.models import PrintJob, RecentCategory
+from warnain.printable_books.tests.factories import (
+    CategoryFactory,
+    PrintableImageFactory,
+)
+from warnain.users.tests.factories import UserFactory
+
+UPLOAD_ID = "6f1c2a4e-8d3b-4c5a-9e7f-0a1b2c3d4e5f"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/categories/",
+        "/api/categories/1/",
+        "/api/categories/books/",
+        "/api/categories/last-access/",
+        "/api/categories/print-image/1/",
+        "/api/categories/print-temp/",
+        "/api/categories/print-booklet/1/",
+        "/api/categories/uploads/",
+        f"/api/categories/uploads/{UPLOAD_ID}/",
+        f"/api/categories/uploads/{UPLOAD_ID}/finalize/",
+        "/api/categories/track/1/",
+        "/api/categories/track/batch/",
+    ],
+)
+def test_views_opt_out_of_atomic_requests(path):
+    assert "default" in resolve(path).func._non_atomic_requests
+
+
+@pytest.mark.django_db(transaction=True)
+def test_print_job_committed_before_cups(monkeypatch, user):
+    image = PrintableImageFactory()
+    seen = {}
+
+    def print_file(printer_name, file_path, copies, options=None):
+        seen["in_transaction"] = connection.in_atomic_block
+        seen["status"] = PrintJob.objects.get().status
+        return True, "ok"
+
+    monkeypatch.setattr(views, "print_file", print_file)
+    client = APIClient()
+    # View async tidak lewat DRF, force_authenticate tidak berlaku
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+
+    response = client.post(
+        f"/api/categories/print-image/{image.pk}/",
+        {"printer_name": "Fake-Printer"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert seen == {"in_transaction": False, "status": "pending"}
+    assert PrintJob.objects.get().status == "completed"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/categories/health/",
+        "/api/categories/print-image/1/",
+        "/api/categories/print-temp/",
+        "/api/categories/print-booklet/1/",
+        "/api/categories/uploads/",
+        f"/api/categories/uploads/{UPLOAD_ID}/",
+        f"/api/categories/uploads/{UPLOAD_ID}/finalize/",
+        "/api/categories/printers/",
+        "/api/categories/printers/status/Fake-Printer/",
+        "/api/categories/interfaces/",
+        "/api/categories/interfaces/eth0/ip/",
+        "/api/categories/current-ip/",
+    ],
+)
+def test_blocking_views_are_async(path):
+    func = resolve(path).func
+    assert asyncio.iscoroutinefunction(func)
+    assert func.csrf_exempt
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    def test_print_requires_token(self):
+        image = PrintableImageFactory()
+
+        response = APIClient().post(
+            f"/api/categories/print-image/{image.pk}/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 403
+        assert PrintJob.objects.count() == 0
+
+    def test_print_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        response = client.post("/api/categories/print-temp/", {}, format="json")
+
+        assert response.status_code == 403
+        assert response.json() == {"detail": "Invalid token."}
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/categories/print-image/{pk}/",
+            "/api/categories/print-booklet/{pk}/",
+            "/api/categories/uploads/",
+        ],
+    )
+    def test_malformed_json(self, user, path):
+        image = PrintableImageFactory()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+
+        response = client.post(
+            path.format(pk=image.pk), "{bad", content_type="application/json"
+        )
+
+        assert response.status_code == 400
+        assert "Malformed request body" in response.json()["detail"]
+
+    def test_session_login(self, monkeypatch, user):
+        image = PrintableImageFactory()
+        monkeypatch.setattr(views, "print_file", lambda *args, **kwargs: (True, "ok"))
+        client = APIClient()
+        client.force_login(user)
+
+        response = client.post(
+            f"/api/categories/print-image/{image.pk}/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert PrintJob.objects.get().user == user
+
+    def test_session_login_checks_csrf(self, user):
+        image = PrintableImageFactory()
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(user)
+
+        response = client.post(
+            f"/api/categories/print-image/{image.pk}/",
+            {"printer_name": "Fake-Printer"},
+            format="json",
+        )
+
+        assert response.status_code == 403
+        assert "CSRF" in response.json()["detail"]
+
+    def test_print_missing_image(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+
+        response = client.post("/api/categories/print-image/0/", {}, format="json")
+
+        assert response.status_code == 404
+
+    def test_method_not_allowed(self):
+        assert APIClient().post("/api/categories/health/").status_code == 405
+
+    def test_cups_runs_in_blocking_pool(self, monkeypatch):
+        threads = []
+
+        def get_available_printers():
+            threads.append(threading.current_thread().name)
+            return [{"name": "Fake-Printer", "status": "idle", "description": ""}]
+
+        monkeypatch.setattr(views, "get_available_printers", get_available_printers)
+
+        response = APIClient().get("/api/categories/printers/")
+
+        assert response.status_code == 200
+        assert response.json()["printers"][0]["name"] == "Fake-Printer"
+        assert threads[0].startswith("blocking-io")
+
+    @override_settings(FAKE_CUPS_LATENCY=0)
+    def test_printer_status(self):
+        response = APIClient().get("/api/categories/printers/status/Fake-Printer/")
+
+        assert response.status_code == 200
+
+    def test_current_ip_without_default_interface(self, monkeypatch):
+        monkeypatch.setattr(views, "get_default_interface", lambda: None)
+
+        response = APIClient().get("/api/categories/current-ip/")
+
+        assert response.status_code == 404
+        assert response.json() == {"error": "Default interface tidak ditemukan"}
+
+
+@pytest.fixture
+def sprite_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_CACHE_DIR = ""
+    settings.CATEGORY_SPRITE_TILE_SIZE = 16
+    settings.CATEGORY_SPRITE_COLUMNS = 2
+    return settings
+
+
+@pytest.mark.django_db
+class TestCategorySprite:
+    def test_sprite_not_requested(self, sprite_settings):
+        CategoryFactory()
+        response = APIClient().get("/api/categories/")
+        assert "sprite" not in response.data
+
+    def test_sprite_tiles(self, sprite_settings):
+        categories = CategoryFactory.create_batch(3)
+        response = APIClient().get(
+            "/api/categories/", {"sprite": "1", "sort_by": "title"}
+        )
+
+        sprite = response.data["sprite"]
+        assert (sprite["width"], sprite["height"], sprite["tile_size"]) == (32, 32, 16)
+        ordered = [category["id"] for category in response.data["results"]]
+        assert sorted(ordered) == sorted(category.pk for category in categories)
+        assert [sprite["tiles"][str(pk)] for pk in ordered] == [
+            {"x": 0, "y": 0},
+            {"x": 16, "y": 0},
+            {"x": 0, "y": 16},
+        ]
+
+        image = APIClient().get(sprite["url"].replace("http://testserver", ""))
+        assert image.status_code == 200
+        with Image.open(io.BytesIO(b"".join(image.streaming_content))) as sheet:
+            assert sheet.format == "JPEG"
+            assert sheet.size == (32, 32)
+
+    def test_sprite_not_modified_after_lru_touch(self, sprite_settings, tmp_path):
+        CategoryFactory()
+        url = APIClient().get("/api/categories/", {"sprite": "1"}).data["sprite"]["url"]
+        url = url.replace("http://testserver", "")
+        etag = APIClient().get(url)["ETag"]
+        later = time.time() + 60
+        for path in (tmp_path / "cache").rglob("*.jpg"):
+            os.utime(path, (later, later))
+
+        response = APIClient().get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_sprite_cached_until_thumbnail_changes(self, sprite_settings, monkeypatch):
+        category = CategoryFactory()
+        calls = []
+        render = sprites.render_sprite
+        monkeypatch.setattr(
+            sprites, "render_sprite", lambda *args: calls.append(1) or render(*args)
+        )
+
+        first = APIClient().get("/api/categories/", {"sprite": "1"}).data["sprite"]
+        again = APIClient().get("/api/categories/", {"sprite": "1"}).data["sprite"]
+        assert first["url"] == again["url"]
+        assert len(calls) == 1
+
+        category.thumbnail_hash = "changed"
+        category.save(update_fields=["thumbnail_hash"])
+        changed = APIClient().get("/api/categories/", {"sprite": "1"}).data["sprite"]
+        assert changed["url"] != first["url"]
+        assert len(calls) == 2
+
+    def test_sprite_adds_no_queries(self, sprite_settings):
+        CategoryFactory.create_batch(3)
+        with CaptureQueriesContext(connection) as plain:
+            APIClient().get("/api/categories/")
+        with CaptureQueriesContext(connection) as with_sprite:
+            APIClient().get("/api/categories/", {"sprite": "1"})
+        assert len(with_sprite) == len(plain)
+
+    def test_missing_thumbnail_leaves_blank_tile(self, sprite_settings):
+        category = CategoryFactory()
+        category.thumbnail.storage.delete(category.thumbnail.name)
+        response = APIClient().get("/api/categories/", {"sprite": "1"})
+        assert response.data["sprite"]["tiles"] == {str(category.pk): {"x": 0, "y": 0}}
+
+    def test_empty_page(self, sprite_settings):
+        response = APIClient().get("/api/categories/", {"sprite": "1"})
+        assert response.data["sprite"] is None
+
+
+@pytest.mark.django_db
+class TestTrackBatch:
+    def test_device_field_does_not_pick_the_user(self, user):
+        victim = UserFactory(username="aa:bb:cc:dd:ee:ff")
+        category = CategoryFactory()
+
+        response = APIClient().post(
+            "/api/categories/track/batch/",
+            [{"category_id": category.pk, "device": victim.username}],
+            format="json",
+        )
+
+        assert response.data["accepted"] == 1
+        assert not RecentCategory.objects.filter(user=victim).exists()
+
+    def test_events_belong_to_token_device(self, user):
+        other = UserFactory(username="aa:bb:cc:dd:ee:ff")
+        category = CategoryFactory()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+
+        client.post(
+            "/api/categories/track/batch/",
+            [{"category_id": category.pk, "device": other.username}],
+            format="json",
+        )
+
+        assert RecentCategory.objects.get().user == user
+
+
+@pytest.mark.django_db
+class TestPersonalSort:
+    def test_device_history_first_across_pages(self, monkeypatch, user):
+        monkeypatch.setattr(PageNumberPagination, "page_size", 2)
+        popular = CategoryFactory(popularity=5)
+        others = CategoryFactory.create_batch(2, popularity=1)
+        favourite = CategoryFactory(popularity=0)
+        RecentCategory.objects.create(
+            user=user, category=favourite, last_accessed=timezone.now()
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+        )
+
+        first = client.get("/api/categories/", {"sort_by": "personal"}).data
+        second = client.get("/api/categories/", {"sort_by": "personal", "page": 2}).data
+
+        assert first["count"] == 4
+        ids = [row["id"] for row in first["results"] + second["results"]]
+        assert ids[:2] == [favourite.pk, popular.pk]
+        assert sorted(ids[2:]) == sorted(category.pk for category in others)
@@ -0,0 +1,169 @@
+"""
+Upload print-temp yang bisa dilanjutkan untuk Wi-Fi kelas yang sering putus.
+
+Alur: buat session (nama file + ukuran total), kirim chunk dengan PUT beserta
+offset-nya, lalu finalize untuk mencetak. Kalau koneksi putus, app cukup
+menanyakan offset terakhir (GET session) dan melanjutkan dari situ, jadi
+hanya byte yang belum sampai yang dikirim ulang.
+
+Data sementara disimpan di UPLOAD_STAGING_DIR (bukan MEDIA_ROOT, tidak bisa
+diakses publik), satu file per session. Session kedaluwarsa setelah
+UPLOAD_SESSION_TTL detik tanpa chunk baru dan dibersihkan oleh command
+cleanup_uploads.
+"""
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from warnain.printable_books.models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+
+class OffsetMismatch(Exception):
+    """Offset chunk tidak sama dengan jumlah byte yang sudah diterima"""
+
+    def __init__(self, received: int):
+        super().__init__(f"Offset harus {received}")
+        self.received = received
+
+
+def staging_path(session: UploadSession) -> str:
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"{session.pk}.part")
+
+
+def expiry():
+    return timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+
+
+def create_upload_session(user, file_name: str, size: int) -> UploadSession:
+    session = UploadSession.objects.create(
+        user=user, file_name=file_name, size=size, expires=expiry()
+    )
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    # Mode "x": nama file dari UUID baru, tidak pernah menimpa file lain
+    open(staging_path(session), "xb").close()
+    return session
+
+
+def get_upload_session(user, pk):
+    """
+    Session milik `user` yang belum kedaluwarsa, None kalau tidak ada
+    """
+    return UploadSession.objects.filter(
+        pk=pk, user=user, expires__gt=timezone.now()
+    ).first()
+
+
+def store_chunk(session: UploadSession, offset: int, data: bytes) -> int:
+    """
+    Tulis chunk di posisi `offset` lalu majukan `received`, mengembalikan
+    offset baru. Row session dikunci selama menulis, jadi PUT duplikat atau
+    terlambat (offset lama) tidak bisa menimpa chunk yang sudah diterima.
+    Chunk yang melewati ukuran total ditolak dengan ValueError.
+    """
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if locked.status != "uploading" or offset != locked.received:
+            session.received = locked.received
+            raise OffsetMismatch(locked.received)
+        if offset + len(data) > locked.size:
+            raise ValueError("Chunk melewati ukuran file")
+        with open(staging_path(session), "r+b") as file:
+            file.seek(offset)
+            file.write(data)
+            # Sisa chunk yang gagal di tengah jalan dibuang, tidak pernah di
+            # bawah `received` karena offset == received
+            file.truncate()
+        locked.received = offset + len(data)
+        locked.expires = expiry()
+        locked.save(update_fields=["received", "expires", "modified"])
+    session.received = locked.received
+    session.expires = locked.expires
+    return session.received
+
+
+def claim_for_printing(session: UploadSession) -> bool:
+    """
+    Tandai session sedang dicetak supaya finalize ganda tidak mencetak dua
+    kali
+    """
+    return bool(
+        UploadSession.objects.filter(
+            pk=session.pk, status="uploading", received=session.size
+        ).update(status="printing", modified=timezone.now())
+    )
+
+
+def release_after_failure(session: UploadSession):
+    """
+    Cetak gagal: upload tetap disimpan supaya finalize bisa diulang tanpa
+    upload ulang
+    """
+    UploadSession.objects.filter(pk=session.pk).update(
+        status="uploading", expires=expiry(), modified=timezone.now()
+    )
+
+
+def is_image_file(path: str) -> bool:
+    """
+    Upload selesai berupa gambar yang bisa dibuka Pillow, dicek sebelum
+    dikirim ke CUPS (pengganti validasi ImageField di print-temp)
+    """
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return False
+    return True
+
+
+def delete_upload_session(session: UploadSession):
+    remove_staging_file(staging_path(session))
+    session.delete()
+
+
+def remove_staging_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def cleanup_expired_uploads() -> int:
+    """
+    Hapus session kedaluwarsa beserta file-nya, juga file staging yatim
+    (session sudah tidak ada) yang lebih tua dari UPLOAD_SESSION_TTL.
+    Mengembalikan jumlah file yang dihapus.
+    """
+    now = timezone.now()
+    expired = list(
+        UploadSession.objects.filter(expires__lte=now).values_list("pk", flat=True)
+    )
+    removed = 0
+    for pk in expired:
+        path = os.path.join(settings.UPLOAD_STAGING_DIR, f"{pk}.part")
+        if os.path.exists(path):
+            remove_staging_file(path)
+            removed += 1
+    UploadSession.objects.filter(pk__in=expired).delete()
+
+    if not os.path.isdir(settings.UPLOAD_STAGING_DIR):
+        return removed
+    active = {f"{pk}.part" for pk in UploadSession.objects.values_list("pk", flat=True)}
+    cutoff = now.timestamp() - settings.UPLOAD_SESSION_TTL
+    for entry in os.scandir(settings.UPLOAD_STAGING_DIR):
+        if entry.name in active or not entry.is_file():
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                remove_staging_file(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
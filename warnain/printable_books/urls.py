@@ -1,26 +1,31 @@
-from django.urls import path, include
+from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from warnain.printable_books.views import (
     CategoryListView,
+    NetworkInterfaceViewSet,
+    PrinterSettingsViewSet,
+    PrintJobViewSet,
+    book_detail,
+    books_list,
     category_detail,
-    print_image,
+    check_printer_status_api,
+    create_upload,
+    finalize_upload,
+    get_current_ip,
+    get_interface_ip_api,
+    health_check,
     last_category_access,
-    print_temp_image,
     list_available_printers,
-    check_printer_status_api,
     list_network_interfaces,
-    get_interface_ip_api,
-    get_current_ip,
-    sync_printers,
+    print_category_booklet,
+    print_image,
+    print_temp_image,
     sync_interfaces,
-    PrinterSettingsViewSet,
-    NetworkInterfaceViewSet,
-    PrintJobViewSet,
-    health_check,
-    books_list,
-    book_detail,
+    sync_printers,
     track_category_access,
+    track_category_access_batch,
+    upload_session,
 )
 
 # Router untuk ViewSets
@@ -40,6 +45,11 @@ urlpatterns = [
     # Print endpoints - MUST BE BEFORE <pk>/
     path("print-image/<pk>/", print_image, name="print"),  # Legacy: print from database
     path("print-temp/", print_temp_image, name="print-temp"),  # New: print from upload
+    path("print-booklet/<pk>/", print_category_booklet, name="print-booklet"),
+    # Resumable print-temp upload - MUST BE BEFORE <pk>/
+    path("uploads/", create_upload, name="upload-create"),
+    path("uploads/<uuid:pk>/", upload_session, name="upload-session"),
+    path("uploads/<uuid:pk>/finalize/", finalize_upload, name="upload-finalize"),
     # Printer management endpoints - MUST BE BEFORE <pk>/
     path("printers/", list_available_printers, name="list-printers"),
     path(
@@ -58,7 +68,8 @@ urlpatterns = [
     path("current-ip/", get_current_ip, name="current-ip"),
     # Last access endpoint - MUST BE BEFORE <pk>/
     path("last-access/", last_category_access, name="last-access"),
-    # Track access endpoint - MUST BE BEFORE <pk>/
+    # Track access endpoints - MUST BE BEFORE <pk>/
+    path("track/batch/", track_category_access_batch, name="track-access-batch"),
     path("track/<pk>/", track_category_access, name="track-access"),
     # Category endpoints (existing) - MUST BE BEFORE ViewSet
     path("", CategoryListView.as_view(), name="list"),
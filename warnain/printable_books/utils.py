@@ -1,11 +1,24 @@
+import logging
 import os
 import subprocess
 import tempfile
-import cups
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
 from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from warnain.metrics import timer
+from warnain.printable_books.models import NetworkInterface, PrinterSettings
+
+logger = logging.getLogger(__name__)
+
 
-from warnain.printable_books.models import PrinterSettings, NetworkInterface
+def get_cups_connection():
+    """
+    Koneksi CUPS sesuai settings.CUPS_CONNECTION_CLASS (pycups atau simulator)
+    """
+    return import_string(settings.CUPS_CONNECTION_CLASS)()
 
 
 def get_available_printers() -> List[Dict[str, str]]:
@@ -13,8 +26,9 @@ def get_available_printers() -> List[Dict[str, str]]:
     Mendapatkan daftar printer yang tersedia di sistem CUPS
     """
     try:
-        connection = cups.Connection()
-        printers = connection.getPrinters()
+        connection = get_cups_connection()
+        with timer("cups_call_duration_seconds", method="getPrinters"):
+            printers = connection.getPrinters()
 
         printer_list = []
         for printer_name, printer_info in printers.items():
@@ -32,8 +46,8 @@ def get_available_printers() -> List[Dict[str, str]]:
             )
 
         return printer_list
-    except Exception as e:
-        print(f"Error getting printers: {e}")
+    except Exception:
+        logger.exception("Error getting printers")
         return []
 
 
@@ -42,8 +56,9 @@ def check_printer_status(printer_name: str) -> Dict[str, any]:
     Mengecek status printer apakah aktif dan siap menerima job
     """
     try:
-        connection = cups.Connection()
-        printers = connection.getPrinters()
+        connection = get_cups_connection()
+        with timer("cups_call_duration_seconds", method="getPrinters"):
+            printers = connection.getPrinters()
 
         if printer_name not in printers:
             return {
@@ -73,49 +88,56 @@ def check_printer_status(printer_name: str) -> Dict[str, any]:
         }
 
 
+def parse_ip_addr_output(output: str) -> List[Dict[str, str]]:
+    """
+    Parse output `ip addr show` menjadi daftar interface yang punya IPv4
+    """
+    interfaces = []
+    current_interface = None
+    for raw_line in output.split("\n"):
+        line = raw_line.strip()
+
+        # Parse interface name, e.g. "2: eth0: <BROADCAST,MULTICAST,UP> ..."
+        if raw_line[:1].isdigit():
+            parts = line.split(":")
+            current_interface = None
+            if len(parts) >= 3:
+                interface_name = parts[1].strip().split("@")[0]
+                # Skip loopback
+                if interface_name != "lo":
+                    start, end = line.find("<") + 1, line.find(">")
+                    flags = line[start:end].split(",")
+                    current_interface = {
+                        "name": interface_name,
+                        "ip_address": None,
+                        "status": "UP" if "UP" in flags else "DOWN",
+                    }
+
+        # Parse IP address (first IPv4 address only)
+        elif line.startswith("inet ") and current_interface:
+            if current_interface["ip_address"] is None:
+                current_interface["ip_address"] = line.split()[1].split("/")[0]
+                interfaces.append(current_interface)
+
+    return interfaces
+
+
 def get_network_interfaces() -> List[Dict[str, str]]:
     """
     Mendapatkan daftar network interface yang tersedia
     """
     try:
         # Gunakan ip command untuk mendapatkan interfaces
-        result = subprocess.run(["ip", "addr", "show"], capture_output=True, text=True)
-        interfaces = []
+        with timer("subprocess_duration_seconds", command="ip addr show"):
+            result = subprocess.run(
+                ["ip", "addr", "show"], capture_output=True, text=True
+            )
 
-        if result.returncode == 0:
-            current_interface = None
-            for line in result.stdout.split("\n"):
-                line = line.strip()
-
-                # Parse interface name
-                if line and not line.startswith(" "):
-                    parts = line.split(":")
-                    if len(parts) >= 2:
-                        interface_name = parts[1].strip()
-                        # Skip loopback
-                        if interface_name != "lo":
-                            current_interface = {
-                                "name": interface_name,
-                                "ip_address": None,
-                                "status": "DOWN",
-                            }
-
-                            # Check if UP
-                            if "UP" in line:
-                                current_interface["status"] = "UP"
-
-                # Parse IP address
-                elif line.startswith("inet ") and current_interface:
-                    ip_part = line.split()[1]
-                    ip_address = ip_part.split("/")[0]
-                    current_interface["ip_address"] = ip_address
-
-                    if current_interface not in interfaces:
-                        interfaces.append(current_interface)
-
-        return interfaces
-    except Exception as e:
-        print(f"Error getting network interfaces: {e}")
+        if result.returncode != 0:
+            return []
+        return parse_ip_addr_output(result.stdout)
+    except Exception:
+        logger.exception("Error getting network interfaces")
         return []
 
 
@@ -125,15 +147,16 @@ def get_interface_ip(interface_name: str) -> Optional[str]:
     """
     try:
         command = f"ip addr show {interface_name} | grep 'inet ' | head -1 | awk '{{print $2}}' | cut -d/ -f1"
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        with timer("subprocess_duration_seconds", command="ip addr show <interface>"):
+            result = subprocess.run(command, shell=True, capture_output=True, text=True)
 
         if result.returncode == 0:
             ip = result.stdout.strip()
             return ip if ip else None
 
         return None
-    except Exception as e:
-        print(f"Error getting IP for interface {interface_name}: {e}")
+    except Exception:
+        logger.exception("Error getting IP for interface %s", interface_name)
         return None
 
 
@@ -198,16 +221,21 @@ def cleanup_temp_file(file_path: str) -> bool:
             os.remove(file_path)
             return True
         return False
-    except Exception as e:
-        print(f"Error cleaning up temp file {file_path}: {e}")
+    except Exception:
+        logger.exception("Error cleaning up temp file %s", file_path)
         return False
 
 
 def print_file(
-    printer_name: str, file_path: str, copies: int = 1, job_title: str = None
+    printer_name: str,
+    file_path: str,
+    copies: int = 1,
+    job_title: str = None,
+    options: Optional[dict] = None,
 ) -> Tuple[bool, str]:
     """
-    Mencetak file ke printer yang ditentukan
+    Mencetak file ke printer yang ditentukan. `options` ditambahkan ke opsi
+    job CUPS (misalnya print-color-mode).
     """
     try:
         # Check printer status first
@@ -226,12 +254,16 @@ def print_file(
             return False, f"File {file_path} tidak ditemukan"
 
         # Print file
-        connection = cups.Connection()
+        connection = get_cups_connection()
         job_title = job_title or f"Print job - {os.path.basename(file_path)}"
 
-        job_id = connection.printFile(
-            printer_name, file_path, job_title, {"copies": str(copies)}
-        )
+        with timer("cups_call_duration_seconds", method="printFile"):
+            job_id = connection.printFile(
+                printer_name,
+                file_path,
+                job_title,
+                {**(options or {}), "copies": str(copies)},
+            )
 
         return True, f"Print job {job_id} berhasil dikirim ke printer {printer_name}"
 
@@ -246,24 +278,26 @@ def sync_system_printers():
     try:
         system_printers = get_available_printers()
 
-        for printer in system_printers:
-            printer_name = printer["name"]
-            description = printer.get("description", "")
+        # CUPS dipanggil di luar transaksi, hanya penulisan yang atomic
+        with transaction.atomic():
+            for printer in system_printers:
+                printer_name = printer["name"]
+                description = printer.get("description", "")
 
-            # Update atau buat printer setting
-            printer_setting, created = PrinterSettings.objects.get_or_create(
-                name=printer_name,
-                defaults={"description": description, "is_active": True},
-            )
+                # Update atau buat printer setting
+                printer_setting, created = PrinterSettings.objects.get_or_create(
+                    name=printer_name,
+                    defaults={"description": description, "is_active": True},
+                )
 
-            # Update description jika sudah ada
-            if not created and printer_setting.description != description:
-                printer_setting.description = description
-                printer_setting.save()
+                # Update description jika sudah ada
+                if not created and printer_setting.description != description:
+                    printer_setting.description = description
+                    printer_setting.save()
 
         return True
-    except Exception as e:
-        print(f"Error syncing system printers: {e}")
+    except Exception:
+        logger.exception("Error syncing system printers")
         return False
 
 
@@ -274,26 +308,32 @@ def sync_network_interfaces():
     try:
         system_interfaces = get_network_interfaces()
 
-        for interface in system_interfaces:
-            interface_name = interface["name"]
-            ip_address = interface.get("ip_address")
-
-            # Update atau buat network interface
-            network_interface, created = NetworkInterface.objects.get_or_create(
-                name=interface_name,
-                defaults={
-                    "ip_address": ip_address,
-                    "is_active": interface["status"] == "UP",
-                },
-            )
-
-            # Update IP address jika berubah
-            if not created:
-                network_interface.ip_address = ip_address
-                network_interface.is_active = interface["status"] == "UP"
-                network_interface.save()
+        # `ip` dipanggil di luar transaksi, hanya penulisan yang atomic
+        with transaction.atomic():
+            for interface in system_interfaces:
+                interface_name = interface["name"]
+                ip_address = interface.get("ip_address")
+
+                # Update atau buat network interface
+                network_interface, created = NetworkInterface.objects.get_or_create(
+                    name=interface_name,
+                    defaults={
+                        "ip_address": ip_address,
+                        "is_active": interface["status"] == "UP",
+                    },
+                )
+
+                # Update IP address jika berubah
+                is_active = interface["status"] == "UP"
+                if not created and (
+                    network_interface.ip_address != ip_address
+                    or network_interface.is_active != is_active
+                ):
+                    network_interface.ip_address = ip_address
+                    network_interface.is_active = is_active
+                    network_interface.save()
 
         return True
-    except Exception as e:
-        print(f"Error syncing network interfaces: {e}")
+    except Exception:
+        logger.exception("Error syncing network interfaces")
         return False
@@ -1,54 +1,101 @@
-import cups
 import os
+from typing import List
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.generics import ListAPIView, get_object_or_404, ListCreateAPIView
+from rest_framework.generics import ListAPIView, ListCreateAPIView, get_object_or_404
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from warnain.printable_books.analytics import (
+    PersonalCategoryOrder,
+    annotate_access_stats,
+    claim_access,
+    clamp_access_time,
+    get_access_count,
+    get_anonymous_user,
+    get_category_ids,
+    get_debounce_identity,
+    get_earliest_access_time,
+    get_recent_categories,
+    is_device_user,
+    record_category_access,
+    record_category_accesses,
+)
+from warnain.printable_books.booklets import get_booklet_file, impose
 from warnain.printable_books.models import (
     Category,
+    NetworkInterface,
     PrintableImage,
-    CategoryAccess,
     PrinterSettings,
-    NetworkInterface,
     PrintJob,
 )
+from warnain.printable_books.printing import PrintLayout, get_print_file, prepare_upload
 from warnain.printable_books.serializers import (
     CategorySerializer,
+    NetworkInterfaceSerializer,
     PrintableImageSerializer,
+    PrintBookletSerializer,
     PrinterSettingsSerializer,
-    NetworkInterfaceSerializer,
     PrintJobSerializer,
+    PrintLayoutSerializer,
+    TempPrintOptionsSerializer,
     TempPrintSerializer,
+    TrackBatchSerializer,
+    UploadSessionSerializer,
+)
+from warnain.printable_books.sprites import get_category_sprite
+from warnain.printable_books.uploads import (
+    OffsetMismatch,
+    claim_for_printing,
+    create_upload_session,
+    delete_upload_session,
+    get_upload_session,
+    is_image_file,
+    release_after_failure,
+    staging_path,
+    store_chunk,
 )
 from warnain.printable_books.utils import (
-    get_available_printers,
     check_printer_status,
-    get_network_interfaces,
-    get_interface_ip,
-    get_default_printer,
-    get_default_interface,
-    save_temp_file,
     cleanup_temp_file,
+    get_available_printers,
+    get_default_interface,
+    get_default_printer,
+    get_interface_ip,
+    get_network_interfaces,
     print_file,
-    sync_system_printers,
+    save_temp_file,
     sync_network_interfaces,
+    sync_system_printers,
+)
+from warnain.utils.async_api import (
+    async_api_view,
+    get_request_data,
+    run_blocking,
+    run_cpu_bound,
 )
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for health check
-def health_check(request):
+def get_client_ip(request):
+    """
+    IP client, dipakai untuk membedakan device tanpa token
+    """
+    return request.META.get("REMOTE_ADDR")
+
+
+@async_api_view(["GET"])
+async def health_check(request):
     """
     Health check endpoint for mobile app IP detection
     """
-    return Response(
+    return JsonResponse(
         {
             "status": "ok",
             "message": "Django backend is running",
@@ -64,19 +111,13 @@ class CategoryListView(ListAPIView):
     search_fields = ["title"]
     permission_classes = []  # No authentication required for development
 
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Read-only, jangan dibungkus transaksi ATOMIC_REQUESTS
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
     def get_queryset(self):
-        qs = (
-            super()
-            .get_queryset()
-            .annotate(
-                access_count=models.Count("access"),
-                latest_access=models.Subquery(
-                    CategoryAccess.objects.filter(category_id=models.OuterRef("id"))
-                    .order_by("-created")
-                    .values("created")[:1]
-                ),
-            )
-        )
+        qs = annotate_access_stats(super().get_queryset())
 
         # Default sort by frequency (most accessed first)
         sort = self.request.GET.get("sort_by", "freq")
@@ -84,35 +125,61 @@ class CategoryListView(ListAPIView):
         if sort == "title":
             order_by = models.F("title").asc()
         elif sort == "freq":
-            # Sort by access count descending, then by latest access, then by title
+            # Sort by decayed popularity score (indexed), then by title
             order_by = [
-                models.F("access_count").desc(nulls_last=True),
-                models.F("latest_access").desc(nulls_last=True),
+                models.F("popularity").desc(),
                 models.F("title").asc(),
             ]
         elif sort == "access":
             order_by = models.F("latest_access").desc(nulls_last=True)
+        elif sort == "personal":
+            # Device dengan token: riwayatnya ditaruh di depan oleh
+            # filter_queryset, sisanya mengikuti popularitas global
+            order_by = [
+                models.F("popularity").desc(),
+                models.F("title").asc(),
+            ]
         else:
             order_by = models.F("title").asc()
 
         return qs.order_by(*order_by if isinstance(order_by, list) else [order_by])
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.GET.get("sort_by") == "personal" and is_device_user(
+            self.request.user
+        ):
+            return PersonalCategoryOrder(queryset, self.request.user)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Objek halaman ini, dipakai get_paginated_response untuk sprite
+        self.page_objects: List[Category] = list(page or [])
+        return page
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.request.GET.get("sprite") in ("1", "true"):
+            # Semua thumbnail halaman ini dalam satu gambar + offset per id
+            response.data["sprite"] = get_category_sprite(
+                self.page_objects, self.request
+            )
+        return response
+
 
+@transaction.non_atomic_requests
 @api_view(["GET"])
 @permission_classes([])  # No authentication required for development
 def last_category_access(request):
-    histories = (
-        CategoryAccess.objects.all()
-        .prefetch_related("category")
-        .order_by("-created")[:20]
-    )
-    categories = [h.category for h in histories]
+    categories = get_recent_categories(request.user, limit=20)
     data = CategorySerializer(
         instance=categories, many=True, context={"request": request}
     ).data
     return Response(data)
 
 
+@transaction.non_atomic_requests
 @api_view(["GET"])
 @permission_classes([])  # No authentication required for development
 def category_detail(request, pk):
@@ -121,28 +188,14 @@ def category_detail(request, pk):
         instance=category.images.all(), many=True, context={"request": request}
     ).data
 
-    # Always track access for frequency sorting (create anonymous access if no user)
-    if request.user and request.user.is_authenticated:
-        CategoryAccess.objects.create(user=request.user, category=category)
-    else:
-        # Create anonymous access tracking using a dummy user or IP-based tracking
-        # For development, we'll use a simple approach
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-
-        # Get or create anonymous user for tracking
-        anonymous_user, _ = User.objects.get_or_create(
-            username="anonymous",
-            defaults={
-                "email": "anonymous@example.com",
-            },
-        )
-        CategoryAccess.objects.create(user=anonymous_user, category=category)
+    # Always track access for frequency sorting (anonymous user if no token),
+    # repeat views within the debounce window are ignored
+    record_category_access(category, request.user, device=get_client_ip(request))
 
     return Response(data=data)
 
 
+@transaction.non_atomic_requests
 @api_view(["GET"])
 @permission_classes([])  # No authentication required for development
 def books_list(request):
@@ -199,6 +252,7 @@ def books_list(request):
         )
 
 
+@transaction.non_atomic_requests
 @api_view(["GET"])
 @permission_classes([])  # No authentication required for development
 def book_detail(request, pk):
@@ -216,74 +270,188 @@ def book_detail(request, pk):
         )
 
 
-@api_view(["POST"])
-def print_image(request: Request, pk):
+@async_api_view(["POST"], authenticated=True)
+async def print_image(request, pk):
     """Legacy endpoint untuk print image dari database"""
-    image = get_object_or_404(PrintableImage, pk=pk)
+    image = await sync_to_async(get_object_or_404)(PrintableImage, pk=pk)
+    data = await run_blocking(get_request_data, request)
 
-    copies = request.data.get("copies", "1")
-    printer_name = request.data.get("printer_name") or get_default_printer()
+    copies = data.get("copies", "1")
+    printer_name = (
+        data.get("printer_name") or await sync_to_async(get_default_printer)()
+    )
 
     if not printer_name:
-        return Response(
+        return JsonResponse(
             {"error": "Printer name tidak ditemukan"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Create print job record
-    print_job = PrintJob.objects.create(
+    layout_serializer = PrintLayoutSerializer(data=data)
+    if not layout_serializer.is_valid():
+        return JsonResponse(
+            layout_serializer.errors, status=status.HTTP_400_BAD_REQUEST
+        )
+    layout = PrintLayout(**layout_serializer.validated_data)
+
+    # Create print job record. Non-atomic view: the row is committed before
+    # CUPS is called, so no transaction stays open while the printer responds
+    print_job = await sync_to_async(PrintJob.objects.create)(
         user=request.user,
         printer_name=printer_name,
         file_path=image.image.path,
+        image=image,
+        paper_size=layout.paper_size,
+        orientation=layout.orientation,
+        fit=layout.fit,
         copies=int(copies),
         status="pending",
     )
 
     try:
-        success, message = print_file(printer_name, image.image.path, int(copies))
+        # PDF 1-bit siap cetak (dari cache) dirender di pool CPU dan CUPS call
+        # di blocking pool, event loop tetap bebas
+        file_path, options = await run_cpu_bound(get_print_file, image, layout)
+        success, message = await run_blocking(
+            print_file, printer_name, file_path, int(copies), options=options
+        )
 
         if success:
-            print_job.status = "completed"
-            print_job.save()
-            return Response(
+            await finish_print_job(print_job, "completed")
+            return JsonResponse(
                 {"status": "ok", "message": message, "job_id": print_job.id}
             )
         else:
-            print_job.status = "failed"
-            print_job.error_message = message
-            print_job.save()
-            return Response(
+            await finish_print_job(print_job, "failed", message)
+            return JsonResponse(
                 {"error": message, "job_id": print_job.id},
                 status=status.HTTP_400_BAD_REQUEST,
             )
     except Exception as e:
-        print_job.status = "failed"
-        print_job.error_message = str(e)
-        print_job.save()
-        return Response(
+        await finish_print_job(print_job, "failed", str(e))
+        return JsonResponse(
             {"error": str(e), "job_id": print_job.id},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
-@api_view(["POST"])
-@permission_classes([IsAuthenticated])
-def print_temp_image(request: Request):
+@async_api_view(["POST"], authenticated=True)
+async def print_category_booklet(request, pk):
     """
-    Endpoint baru untuk print gambar dari upload temporary
+    Cetak semua gambar kategori sebagai satu PDF booklet dalam satu job
     """
-    serializer = TempPrintSerializer(data=request.data)
+    category = await sync_to_async(get_object_or_404)(Category, pk=pk)
+    data = await run_blocking(get_request_data, request)
+    serializer = PrintBookletSerializer(data=data)
     if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    options = serializer.validated_data
+
+    printer_name = (
+        options.get("printer_name") or await sync_to_async(get_default_printer)()
+    )
+    if not printer_name:
+        return JsonResponse(
+            {"error": "Printer name tidak ditemukan"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    images = await sync_to_async(lambda: list(category.images.order_by("pk")))()
+    if not images:
+        return JsonResponse(
+            {"error": "Kategori tidak punya gambar"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    layout = PrintLayout(
+        options.get("paper_size"), options.get("orientation"), options.get("fit")
+    )
+
+    try:
+        # Booklet diambil dari cache, render hanya kalau gambar kategori berubah
+        file_path, cups_options = await run_cpu_bound(
+            get_booklet_file,
+            category,
+            images,
+            layout,
+            options["imposition"],
+            options["duplex"],
+        )
+    except Exception as e:
+        return JsonResponse(
+            {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    print_job = await sync_to_async(PrintJob.objects.create)(
+        user=request.user,
+        printer_name=printer_name,
+        file_path=file_path,
+        paper_size=layout.paper_size,
+        orientation=layout.orientation,
+        fit=layout.fit,
+        copies=options["copies"],
+        status="pending",
+    )
+
+    try:
+        success, message = await run_blocking(
+            print_file,
+            printer_name,
+            file_path,
+            options["copies"],
+            job_title=f"Booklet - {category.title}",
+            options=cups_options,
+        )
+
+        if success:
+            await finish_print_job(print_job, "completed")
+            return JsonResponse(
+                {
+                    "status": "ok",
+                    "message": message,
+                    "job_id": print_job.id,
+                    # Sisi kertas di PDF, bukan jumlah gambar (2up/booklet)
+                    "pages": len(impose(len(images), options["imposition"])),
+                    "images": len(images),
+                }
+            )
+        else:
+            await finish_print_job(print_job, "failed", message)
+            return JsonResponse(
+                {"error": message, "job_id": print_job.id},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    except Exception as e:
+        await finish_print_job(print_job, "failed", str(e))
+        return JsonResponse(
+            {"error": str(e), "job_id": print_job.id},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def validate_temp_print(request):
+    # Parsing multipart dan validasi gambar (Pillow) memblokir, jalan di pool
+    serializer = TempPrintSerializer(data=get_request_data(request))
+    serializer.is_valid()
+    return serializer
+
+
+@async_api_view(["POST"], authenticated=True)
+async def print_temp_image(request):
+    """
+    Endpoint baru untuk print gambar dari upload temporary
+    """
+    serializer = await run_blocking(validate_temp_print, request)
+    if serializer.errors:
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     image_file = serializer.validated_data["image"]
-    copies = serializer.validated_data.get("copies", 1)
     printer_name = (
-        serializer.validated_data.get("printer_name") or get_default_printer()
+        serializer.validated_data.get("printer_name")
+        or await sync_to_async(get_default_printer)()
     )
 
     if not printer_name:
-        return Response(
+        return JsonResponse(
             {"error": "Printer name tidak ditemukan"},
             status=status.HTTP_400_BAD_REQUEST,
         )
@@ -291,157 +459,322 @@ def print_temp_image(request: Request):
     temp_file_path = None
     try:
         # Save uploaded file to temporary directory
-        temp_file_path = save_temp_file(image_file)
+        temp_file_path = await run_blocking(save_temp_file, image_file)
+        return await print_uploaded_file(
+            request,
+            temp_file_path,
+            image_file.name,
+            printer_name,
+            serializer.validated_data,
+        )
+    except Exception as e:
+        return JsonResponse(
+            {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    finally:
+        # Always cleanup temporary file
+        if temp_file_path:
+            await run_blocking(cleanup_temp_file, temp_file_path)
+
+
+async def print_uploaded_file(request, source_path, file_name, printer_name, options):
+    """
+    Normalisasi file upload yang sudah ada di disk lalu kirim ke CUPS.
+    `options` berisi copies, paper_size, orientation dan grayscale dari
+    serializer; `source_path` dihapus oleh pemanggil.
+    """
+    copies = options.get("copies", 1)
+    layout = PrintLayout(options.get("paper_size"), options.get("orientation"))
+    grayscale = options.get("grayscale")
+    if grayscale is None:
+        grayscale = settings.PRINT_UPLOAD_GRAYSCALE
+
+    print_file_path = None
+    print_job = None
+    try:
+        # Rotasi EXIF + perkecil ke DPI printer di pool CPU, CUPS hanya
+        # menerima file kecil
+        print_file_path = await run_cpu_bound(
+            prepare_upload, source_path, layout, grayscale
+        )
 
-        # Create print job record
-        print_job = PrintJob.objects.create(
+        # Create print job record, committed before CUPS is called
+        print_job = await sync_to_async(PrintJob.objects.create)(
             user=request.user,
             printer_name=printer_name,
-            file_path=temp_file_path,
+            file_path=print_file_path,
+            paper_size=layout.paper_size,
+            orientation=layout.orientation,
             copies=copies,
             status="pending",
         )
 
         # Print the file
-        success, message = print_file(printer_name, temp_file_path, copies)
+        success, message = await run_blocking(
+            print_file, printer_name, print_file_path, copies
+        )
 
         if success:
-            print_job.status = "completed"
-            print_job.save()
-            return Response(
+            await finish_print_job(print_job, "completed")
+            return JsonResponse(
                 {
                     "status": "ok",
                     "message": message,
                     "job_id": print_job.id,
-                    "file_name": image_file.name,
+                    "file_name": file_name,
                 }
             )
         else:
-            print_job.status = "failed"
-            print_job.error_message = message
-            print_job.save()
-            return Response(
+            await finish_print_job(print_job, "failed", message)
+            return JsonResponse(
                 {"error": message, "job_id": print_job.id},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
     except Exception as e:
-        if "print_job" in locals():
-            print_job.status = "failed"
-            print_job.error_message = str(e)
-            print_job.save()
+        if print_job is not None:
+            await finish_print_job(print_job, "failed", str(e))
 
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return JsonResponse(
+            {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
     finally:
-        # Always cleanup temporary file
-        if temp_file_path:
-            cleanup_temp_file(temp_file_path)
+        if print_file_path and print_file_path != source_path:
+            await run_blocking(cleanup_temp_file, print_file_path)
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for development
-def list_available_printers(request):
+def upload_session_data(session):
+    return {
+        **UploadSessionSerializer(session).data,
+        "chunk_size": settings.UPLOAD_CHUNK_MAX_BYTES,
+    }
+
+
+@async_api_view(["POST"], authenticated=True)
+async def create_upload(request):
+    """
+    Mulai upload print-temp yang bisa dilanjutkan (nama file + ukuran total)
+    """
+    data = await run_blocking(get_request_data, request)
+    serializer = UploadSessionSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    session = await sync_to_async(create_upload_session)(
+        request.user,
+        serializer.validated_data["file_name"],
+        serializer.validated_data["size"],
+    )
+    return JsonResponse(upload_session_data(session), status=status.HTTP_201_CREATED)
+
+
+@async_api_view(["GET", "PUT", "DELETE"], authenticated=True)
+async def upload_session(request, pk):
+    """
+    GET: offset terakhir untuk melanjutkan upload. PUT: satu chunk (body
+    mentah) di posisi header Upload-Offset. DELETE: batalkan upload.
+    """
+    session = await sync_to_async(get_upload_session)(request.user, pk)
+    if session is None:
+        return JsonResponse(
+            {"error": "Upload tidak ditemukan atau sudah kedaluwarsa"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "GET":
+        return JsonResponse(upload_session_data(session))
+    if request.method == "DELETE":
+        await sync_to_async(delete_upload_session)(session)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return JsonResponse(
+            {"error": "Header Upload-Offset wajib diisi"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    data = request.body
+    if not data or len(data) > settings.UPLOAD_CHUNK_MAX_BYTES:
+        return JsonResponse(
+            {"error": f"Chunk harus 1-{settings.UPLOAD_CHUNK_MAX_BYTES} byte"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        await sync_to_async(store_chunk)(session, offset, data)
+    except OffsetMismatch as e:
+        # App melanjutkan dari offset yang benar
+        return JsonResponse(
+            {"error": str(e), "offset": e.received}, status=status.HTTP_409_CONFLICT
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse(upload_session_data(session))
+
+
+@async_api_view(["POST"], authenticated=True)
+async def finalize_upload(request, pk):
+    """
+    Cetak upload yang sudah lengkap, sama seperti print-temp. Kalau cetak
+    gagal upload tetap disimpan dan finalize boleh diulang.
+    """
+    session = await sync_to_async(get_upload_session)(request.user, pk)
+    if session is None:
+        return JsonResponse(
+            {"error": "Upload tidak ditemukan atau sudah kedaluwarsa"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    if not session.is_complete:
+        return JsonResponse(
+            {"error": "Upload belum lengkap", "offset": session.received},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    data = await run_blocking(get_request_data, request)
+    serializer = TempPrintOptionsSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    printer_name = (
+        serializer.validated_data.get("printer_name")
+        or await sync_to_async(get_default_printer)()
+    )
+    if not printer_name:
+        return JsonResponse(
+            {"error": "Printer name tidak ditemukan"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    path = staging_path(session)
+    if not await run_blocking(is_image_file, path):
+        await sync_to_async(delete_upload_session)(session)
+        return JsonResponse(
+            {"image": ["Upload a valid image."]}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not await sync_to_async(claim_for_printing)(session):
+        return JsonResponse(
+            {"error": "Upload sedang dicetak"}, status=status.HTTP_409_CONFLICT
+        )
+    response = await print_uploaded_file(
+        request, path, session.file_name, printer_name, serializer.validated_data
+    )
+    if response.status_code == status.HTTP_200_OK:
+        await sync_to_async(delete_upload_session)(session)
+    else:
+        await sync_to_async(release_after_failure)(session)
+    return response
+
+
+@sync_to_async
+def finish_print_job(print_job, job_status, error_message=""):
+    print_job.status = job_status
+    print_job.error_message = error_message
+    print_job.save(update_fields=["status", "error_message", "modified"])
+
+
+@async_api_view(["GET"])
+async def list_available_printers(request):
     """
     Endpoint untuk mendapatkan daftar printer yang tersedia di sistem
     """
     try:
-        printers = get_available_printers()
-        return Response({"printers": printers})
+        printers = await run_blocking(get_available_printers)
+        return JsonResponse({"printers": printers})
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error getting printers: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for development
-def check_printer_status_api(request, printer_name):
+@async_api_view(["GET"])
+async def check_printer_status_api(request, printer_name):
     """
     Endpoint untuk mengecek status printer
     """
     try:
-        printer_status = check_printer_status(printer_name)
-        return Response(printer_status)
+        printer_status = await run_blocking(check_printer_status, printer_name)
+        return JsonResponse(printer_status)
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error checking printer status: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for development
-def list_network_interfaces(request):
+@async_api_view(["GET"])
+async def list_network_interfaces(request):
     """
     Endpoint untuk mendapatkan daftar network interfaces
     """
     try:
-        interfaces = get_network_interfaces()
-        return Response({"interfaces": interfaces})
+        interfaces = await run_blocking(get_network_interfaces)
+        return JsonResponse({"interfaces": interfaces})
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error getting network interfaces: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for development
-def get_interface_ip_api(request, interface_name):
+@async_api_view(["GET"])
+async def get_interface_ip_api(request, interface_name):
     """
     Endpoint untuk mendapatkan IP address dari interface tertentu
     """
     try:
-        ip_address = get_interface_ip(interface_name)
+        ip_address = await run_blocking(get_interface_ip, interface_name)
         if ip_address:
-            return Response({"interface": interface_name, "ip_address": ip_address})
+            return JsonResponse({"interface": interface_name, "ip_address": ip_address})
         else:
-            return Response(
+            return JsonResponse(
                 {
                     "error": f"IP address tidak ditemukan untuk interface {interface_name}"
                 },
                 status=status.HTTP_404_NOT_FOUND,
             )
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error getting IP address: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
-@api_view(["GET"])
-@permission_classes([])  # No authentication required for development
-def get_current_ip(request):
+@async_api_view(["GET"])
+async def get_current_ip(request):
     """
     Endpoint untuk mendapatkan IP otomatis dari default interface
     """
     try:
-        default_interface = get_default_interface()
+        default_interface = await sync_to_async(get_default_interface)()
         if not default_interface:
-            return Response(
+            return JsonResponse(
                 {"error": "Default interface tidak ditemukan"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        ip_address = get_interface_ip(default_interface)
+        ip_address = await run_blocking(get_interface_ip, default_interface)
         if ip_address:
-            return Response({"interface": default_interface, "ip_address": ip_address})
+            return JsonResponse(
+                {"interface": default_interface, "ip_address": ip_address}
+            )
         else:
-            return Response(
+            return JsonResponse(
                 {
                     "error": f"IP address tidak ditemukan untuk interface {default_interface}"
                 },
                 status=status.HTTP_404_NOT_FOUND,
             )
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error getting current IP: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@transaction.non_atomic_requests
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def sync_printers(request):
@@ -464,6 +797,7 @@ def sync_printers(request):
         )
 
 
+@transaction.non_atomic_requests
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def sync_interfaces(request):
@@ -508,6 +842,7 @@ class PrintJobViewSet(ModelViewSet):
         return PrintJob.objects.all()
 
 
+@transaction.non_atomic_requests
 @api_view(["POST"])
 @permission_classes([])  # No authentication required for development
 def track_category_access(request, pk):
@@ -517,29 +852,21 @@ def track_category_access(request, pk):
     try:
         category = get_object_or_404(Category, pk=pk)
 
-        # Track access (anonymous user for development)
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-
-        # Get or create anonymous user for tracking
-        anonymous_user, _ = User.objects.get_or_create(
-            username="anonymous",
-            defaults={
-                "email": "anonymous@example.com",
-            },
+        # Track access per device when a token is sent, otherwise anonymous
+        access = record_category_access(
+            category, request.user, device=get_client_ip(request)
         )
 
-        # Create access record
-        CategoryAccess.objects.create(user=anonymous_user, category=category)
-
         # Get updated access count
-        access_count = CategoryAccess.objects.filter(category=category).count()
+        access_count = get_access_count(category)
 
         return Response(
             {
                 "success": True,
-                "message": "Access tracked successfully",
+                "message": "Access tracked successfully"
+                if access
+                else "Repeated access ignored",
+                "counted": access is not None,
                 "category_id": category.id,
                 "access_count": access_count,
             }
@@ -550,3 +877,71 @@ def track_category_access(request, pk):
             {"error": f"Error tracking access: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@transaction.non_atomic_requests
+@api_view(["POST"])
+@permission_classes([])  # No authentication required for development
+def track_category_access_batch(request):
+    """
+    Endpoint untuk tracking banyak akses sekaligus dari antrian mobile app.
+
+    Body berupa array event `{category_id, timestamp, device}` (atau
+    `{"events": [...]}`). Event dengan kategori yang tidak dikenal dilewati.
+    Event dicatat atas nama device pemilik token, tanpa token sebagai
+    anonymous.
+    """
+    payload = request.data
+    if isinstance(payload, list):
+        payload = {"events": payload}
+
+    serializer = TrackBatchSerializer(data=payload)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    events = serializer.validated_data["events"]
+    category_ids = get_category_ids()
+
+    # Event hanya diatribusikan ke device dari token; `device` dari body tidak
+    # diverifikasi, jadi hanya dipakai sebagai identitas debounce
+    token_user = request.user if is_device_user(request.user) else None
+    anonymous_user = None
+
+    now = timezone.now()
+    earliest = get_earliest_access_time(now)
+    client_ip = get_client_ip(request)
+    accepted = []
+    rejected = []
+    duplicates = 0
+    for index, event in enumerate(events):
+        if event["category_id"] not in category_ids:
+            rejected.append(index)
+            continue
+
+        user = token_user
+        when = clamp_access_time(event.get("timestamp"), now, earliest)
+
+        # Repeat views within the debounce window never reach the database
+        identity = get_debounce_identity(user, event.get("device") or client_ip)
+        if not claim_access(identity, event["category_id"], when):
+            duplicates += 1
+            continue
+
+        if user is None:
+            anonymous_user = anonymous_user or get_anonymous_user()
+            user = anonymous_user
+
+        accepted.append((event["category_id"], user, when))
+
+    if accepted:
+        # Kategori yang baru dihapus (cache id basi) dilewati di sini
+        accepted = record_category_accesses(accepted)
+
+    return Response(
+        {
+            "success": True,
+            "accepted": len(accepted),
+            "duplicates": duplicates,
+            "rejected": rejected,
+        }
+    )
@@ -0,0 +1,29 @@
+from PIL import Image
+
+from warnain.utils import blurhash
+
+
+def test_encode_solid_color():
+    image = Image.new("RGB", (40, 30), (255, 0, 0))
+
+    result = blurhash.encode(image)
+
+    assert len(result) == 1 + 1 + 4 + 2 * (4 * 3 - 1)
+    # Komponen 4x3 di karakter pertama, warna rata-rata (DC) di karakter 3-6
+    assert result[0] == blurhash.encode_base83(3 + 2 * 9, 1)
+    assert result[2:6] == blurhash.encode_base83(0xFF0000, 4)
+
+
+def test_encode_transparent_is_white():
+    transparent = Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+    white = Image.new("L", (16, 16), 255)
+
+    assert blurhash.encode(transparent) == blurhash.encode(white)
+
+
+def test_encode_reference():
+    # Nilai dari encoder referensi (woltapp/blurhash) untuk gradien yang sama
+    image = Image.new("RGB", (32, 32))
+    image.putdata([(x * 8, y * 8, 128) for y in range(32) for x in range(32)])
+
+    assert blurhash.encode(image) == "LxH2cX2swxX8l}WDjte;gJfjfQfj"
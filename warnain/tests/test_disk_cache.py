@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+from warnain.utils.disk_cache import DiskLRUCache
+
+
+def write(data):
+    def render(file):
+        file.write(data)
+
+    return render
+
+
+def test_get_or_create_renders_once(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+    calls = []
+
+    def render(file):
+        calls.append(1)
+        file.write(b"data")
+
+    first = cache.get_or_create("key", render, ".png")
+    second = cache.get_or_create("key", render, ".png")
+
+    assert first == second
+    assert first.endswith(".png")
+    assert open(first, "rb").read() == b"data"
+    assert len(calls) == 1
+
+
+def test_concurrent_requests_share_render(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+    calls = []
+
+    def render(file):
+        calls.append(1)
+        time.sleep(0.05)
+        file.write(b"data")
+
+    threads = [
+        threading.Thread(target=cache.get_or_create, args=("key", render))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache._key_locks == {}
+
+
+def test_failed_render_leaves_nothing(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+    def render(file):
+        file.write(b"partial")
+        raise ValueError
+
+    try:
+        cache.get_or_create("key", render)
+    except ValueError:
+        pass
+
+    assert cache.get("key") is None
+    assert cache.total_size() == 0
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=250)
+    old = cache.get_or_create("old", write(b"x" * 100))
+    recent = cache.get_or_create("recent", write(b"x" * 100))
+    # "old" baru saja dipakai lagi, "recent" jadi yang paling lama
+    os.utime(recent, (time.time() - 60, time.time() - 60))
+    assert cache.get("old") == old
+
+    cache.get_or_create("new", write(b"x" * 100))
+
+    assert cache.get("recent") is None
+    assert cache.get("old") == old
+    assert cache.total_size() <= 250
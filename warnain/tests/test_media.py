@@ -0,0 +1,222 @@
+import io
+import os
+import time
+
+import pytest
+from django.test import Client
+from PIL import Image
+
+from warnain.utils import media
+from warnain.utils.media import parse_range
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    (tmp_path / "printables").mkdir()
+    (tmp_path / "printables" / "page.png").write_bytes(CONTENT)
+    return "/media/printables/page.png"
+
+
+def content(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+def test_serves_file_with_cache_headers(media_file):
+    response = Client().get(media_file, {"v": "8e1c07aa52f3"})
+
+    assert response.status_code == 200
+    assert content(response) == CONTENT
+    assert response["Content-Type"] == "image/png"
+    assert response["Content-Length"] == str(len(CONTENT))
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert response["Accept-Ranges"] == "bytes"
+
+
+def test_unversioned_url_is_revalidated(media_file, settings):
+    settings.MEDIA_CACHE_UNVERSIONED_MAX_AGE = 60
+
+    response = Client().get(media_file)
+
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "public, max-age=60, must-revalidate"
+
+    not_modified = Client().get(media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert not_modified.status_code == 304
+    assert "immutable" not in not_modified["Cache-Control"]
+
+
+def test_not_modified(media_file):
+    etag = Client().get(media_file)["ETag"]
+
+    response = Client().get(media_file, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [("bytes=0-9", 0, 9), ("bytes=1000-", 1000, 1023), ("bytes=-4", 1020, 1023)],
+)
+def test_range(media_file, header, start, end):
+    response = Client().get(media_file, HTTP_RANGE=header)
+
+    assert response.status_code == 206
+    assert content(response) == CONTENT[start:][: end - start + 1]
+    assert response["Content-Range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert response["Content-Length"] == str(end - start + 1)
+
+
+def test_range_not_satisfiable(media_file):
+    response = Client().get(media_file, HTTP_RANGE="bytes=5000-")
+
+    assert response.status_code == 416
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_stale_if_range_sends_whole_file(media_file):
+    response = Client().get(media_file, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"')
+
+    assert response.status_code == 200
+    assert content(response) == CONTENT
+
+
+def test_x_accel_redirect(media_file, settings):
+    settings.MEDIA_ACCEL = "nginx"
+
+    response = Client().get(media_file, {"v": "8e1c07aa52f3"})
+
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == "/protected-media/printables/page.png"
+    assert response.content == b""
+    assert "immutable" in response["Cache-Control"]
+
+
+def test_x_sendfile(media_file, settings):
+    settings.MEDIA_ACCEL = "apache"
+
+    response = Client().get(media_file)
+
+    assert response["X-Sendfile"] == f"{settings.MEDIA_ROOT}/printables/page.png"
+
+
+@pytest.mark.parametrize(
+    "path", ["/media/../settings.py", "/media/printables/", "/media/missing.png"]
+)
+def test_not_found(media_file, path):
+    assert Client().get(path).status_code == 404
+
+
+def test_post_not_allowed(media_file):
+    assert Client().post(media_file).status_code == 405
+
+
+def test_parse_range_ignores_multiple_ranges():
+    assert parse_range("bytes=0-1,5-6", 10) is None
+    assert parse_range("items=0-1", 10) is None
+
+
+@pytest.fixture
+def picture(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_RESIZE_SIZES = [100, 200]
+    Image.new("L", (400, 300), 255).save(tmp_path / "page.png")
+    return "page.png"
+
+
+def resized(response) -> Image.Image:
+    return Image.open(io.BytesIO(content(response)))
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [("100x0", (100, 75)), ("150x0", (200, 150)), ("999x0", (200, 150))],
+)
+def test_resize_snaps_width(picture, size, expected):
+    response = Client().get(f"/media/r/{size}/{picture}", {"v": "8e1c07aa52f3"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/png"
+    assert "immutable" in response["Cache-Control"]
+    assert resized(response).size == expected
+
+
+def test_resize_fits_box(picture):
+    response = Client().get(f"/media/r/200x100/{picture}")
+
+    assert resized(response).size == (133, 100)
+
+
+def test_resize_renders_once(picture, monkeypatch):
+    calls = []
+    render = media.render_resized
+    monkeypatch.setattr(
+        media, "render_resized", lambda *args: calls.append(1) or render(*args)
+    )
+
+    Client().get(f"/media/r/100x0/{picture}")
+    # 80 di-snap ke 100, bukan rendition baru untuk setiap lebar
+    Client().get(f"/media/r/80x0/{picture}")
+
+    assert len(calls) == 1
+
+
+def test_resize_new_rendition_when_file_changes(picture, settings, tmp_path):
+    Client().get(f"/media/r/100x0/{picture}")
+    Image.new("L", (100, 100), 0).save(tmp_path / picture)
+    os.utime(tmp_path / picture, (time.time() + 10, time.time() + 10))
+
+    response = Client().get(f"/media/r/100x0/{picture}")
+
+    assert resized(response).size == (100, 100)
+
+
+def test_resize_not_modified_after_lru_touch(picture, monkeypatch):
+    first = Client().get(f"/media/r/100x0/{picture}")
+    # Hit berikutnya men-touch rendition (urutan LRU) satu menit kemudian
+    utime, later = os.utime, time.time() + 60
+    monkeypatch.setattr(
+        os, "utime", lambda path, times=None: utime(path, times or (later, later))
+    )
+
+    response = Client().get(
+        f"/media/r/100x0/{picture}",
+        HTTP_IF_NONE_MATCH=first["ETag"],
+        HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+    )
+
+    assert response.status_code == 304
+    assert response["ETag"] == first["ETag"]
+    assert response["Last-Modified"] == first["Last-Modified"]
+
+
+@pytest.mark.parametrize(
+    "name, format, content_type",
+    [("photo.png", "JPEG", "image/jpeg"), ("photo.jpg", "PNG", "image/png")],
+)
+def test_resize_content_type_follows_format(
+    picture, tmp_path, name, format, content_type
+):
+    Image.new("RGB", (400, 300), "white").save(tmp_path / name, format)
+
+    for _ in range(2):
+        response = Client().get(f"/media/r/100x0/{name}")
+        assert response["Content-Type"] == content_type
+        assert resized(response).format == format
+
+
+@pytest.mark.parametrize(
+    "path", ["/media/r/0x0/page.png", "/media/r/100x0/missing.png"]
+)
+def test_resize_not_found(picture, path):
+    assert Client().get(path).status_code == 404
+
+
+def test_resize_not_an_image(media_file):
+    assert Client().get("/media/r/100x0/printables/page.png").status_code == 404
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from django.test import Client
+
+from warnain import metrics
+
+
+class TestRegistry:
+    def test_snapshot_keeps_labels(self):
+        registry = metrics.Registry()
+        registry.inc("http_requests_total", endpoint="health", status=200)
+        registry.inc("http_requests_total", endpoint="health", status=200)
+        registry.observe("cups_call_duration_seconds", 0.2, method="getPrinters")
+
+        counters = dict(registry.snapshot()["counters"][0][1])
+        assert counters == {"endpoint": "health", "status": "200"}
+
+    def test_collect_sums_all_workers(self, settings, tmp_path, monkeypatch):
+        settings.METRICS_DIR = str(tmp_path)
+        monkeypatch.setattr(metrics, "registry", metrics.Registry())
+        other_worker = metrics.Registry()
+        other_worker.inc("http_requests_total", 3, endpoint="health")
+        other_worker.observe("subprocess_duration_seconds", 0.02, command="ip")
+        (tmp_path / "1.json").write_text(json.dumps(other_worker.snapshot()))
+
+        metrics.inc("http_requests_total", 2, endpoint="health")
+        metrics.observe("subprocess_duration_seconds", 0.5, command="ip")
+
+        output = metrics.render()
+
+        assert 'http_requests_total{endpoint="health"} 5.0' in output
+        assert 'subprocess_duration_seconds_count{command="ip"} 2' in output
+        assert 'subprocess_duration_seconds_bucket{command="ip",le="0.025"} 1' in output
+
+
+def test_metrics_endpoint_records_requests(db, monkeypatch):
+    monkeypatch.setattr(metrics, "registry", metrics.Registry())
+    client = Client()
+    client.get("/api/categories/health/")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'endpoint="api:categories:health-check"' in response.content.decode()
+
+
+@pytest.mark.parametrize(
+    "remote_addr, allowed_ips, status",
+    [
+        ("127.0.0.1", ["127.0.0.1"], 200),
+        ("10.0.3.7", ["10.0.0.0/16"], 200),
+        ("192.168.1.20", ["127.0.0.1", "10.0.0.0/16"], 403),
+    ],
+)
+def test_metrics_endpoint_allowed_ips(db, settings, remote_addr, allowed_ips, status):
+    settings.METRICS_ALLOWED_IPS = allowed_ips
+
+    response = Client(REMOTE_ADDR=remote_addr).get("/metrics")
+
+    assert response.status_code == status
+
+
+def test_metrics_endpoint_allows_staff(db, settings, admin_user):
+    settings.METRICS_ALLOWED_IPS = []
+    client = Client(REMOTE_ADDR="192.168.1.20")
+    assert client.get("/metrics").status_code == 403
+
+    client.force_login(admin_user)
+
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,277 @@
+"""
+Budget jumlah query untuk setiap endpoint API.
+
+Setiap endpoint dipanggil dengan dua ukuran data. Jumlah query harus sama di
+kedua ukuran (kalau bertambah berarti ada pola N+1) dan tidak boleh melewati
+budget yang dideklarasikan di ENDPOINTS. Endpoint baru di
+printable_books/urls.py atau config/api_router.py wajib punya budget di sini.
+"""
+import re
+from collections import Counter
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config import api_router
+from warnain.printable_books import utils, views
+from warnain.printable_books.analytics import record_category_access
+from warnain.printable_books.models import NetworkInterface, PrinterSettings
+from warnain.printable_books.tests.factories import (
+    CategoryFactory,
+    PrintableImageFactory,
+    PrintJobFactory,
+)
+from warnain.printable_books.uploads import create_upload_session, store_chunk
+from warnain.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+SMALL = 2
+LARGE = 6
+
+# Query transaksi (ATOMIC_REQUESTS dan get_or_create) tidak ikut dihitung
+IGNORED_QUERY = re.compile(r"^\s*(RELEASE |ROLLBACK TO )?SAVEPOINT", re.IGNORECASE)
+
+
+def kwargs_of(name: str, field: str = "pk"):
+    """
+    kwargs url dari objek `name` di data test: {field: objek.field}
+    """
+    return lambda data: {field: getattr(data[name], field)}
+
+
+COPIES = {"copies": 1}
+
+# (nama url, method, kwargs url, body, pakai token, budget)
+ENDPOINTS = [
+    ("api:categories:health-check", "get", None, None, False, 0),
+    ("api:categories:books-list", "get", None, None, False, 2),
+    ("api:categories:book-detail", "get", kwargs_of("image"), None, False, 1),
+    ("api:categories:print", "post", kwargs_of("image"), COPIES, True, 5),
+    ("api:categories:print-temp", "post", None, "upload", True, 4),
+    ("api:categories:print-booklet", "post", kwargs_of("category"), COPIES, True, 6),
+    (
+        "api:categories:upload-create",
+        "post",
+        None,
+        {"file_name": "photo.png", "size": 1024},
+        True,
+        2,
+    ),
+    ("api:categories:upload-session", "put", kwargs_of("upload"), "chunk", True, 4),
+    (
+        "api:categories:upload-finalize",
+        "post",
+        kwargs_of("finished_upload"),
+        COPIES,
+        True,
+        7,
+    ),
+    ("api:categories:list-printers", "get", None, None, False, 0),
+    (
+        "api:categories:printer-status",
+        "get",
+        lambda data: {"printer_name": "printer-0"},
+        None,
+        False,
+        0,
+    ),
+    ("api:categories:sync-printers", "post", None, None, True, 3),
+    ("api:categories:list-interfaces", "get", None, None, False, 0),
+    (
+        "api:categories:interface-ip",
+        "get",
+        lambda data: {"interface_name": "eth0"},
+        None,
+        False,
+        0,
+    ),
+    ("api:categories:sync-interfaces", "post", None, None, True, 3),
+    ("api:categories:current-ip", "get", None, None, False, 1),
+    ("api:categories:last-access", "get", None, None, True, 2),
+    ("api:categories:track-access-batch", "post", None, "batch", True, 9),
+    ("api:categories:track-access", "post", kwargs_of("category"), None, True, 8),
+    ("api:categories:list", "get", None, None, False, 3),
+    ("api:categories:detail", "get", kwargs_of("category"), None, True, 6),
+    ("api:categories:api-root", "get", None, None, False, 0),
+    ("api:categories:printersettings-list", "get", None, None, False, 2),
+    (
+        "api:categories:printersettings-detail",
+        "get",
+        kwargs_of("printer"),
+        None,
+        False,
+        1,
+    ),
+    ("api:categories:networkinterface-list", "get", None, None, False, 2),
+    (
+        "api:categories:networkinterface-detail",
+        "get",
+        kwargs_of("interface"),
+        None,
+        False,
+        1,
+    ),
+    ("api:categories:printjob-list", "get", None, None, False, 2),
+    ("api:categories:printjob-detail", "get", kwargs_of("print_job"), None, False, 1),
+    ("api:user-list", "get", None, None, True, 3),
+    ("api:user-detail", "get", kwargs_of("device", "username"), None, True, 2),
+    ("api:user-me", "get", None, None, True, 1),
+    ("api:token", "post", None, "token", False, 0),
+]
+
+
+def url_names(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nested = namespace
+            if pattern.namespace:
+                nested = f"{namespace}:{pattern.namespace}"
+            yield from url_names(pattern.url_patterns, nested)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}:{pattern.name}"
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Bentuk query tanpa nilai literal, untuk membandingkan pola query
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"(?<![\w\"])-?\d+(\.\d+)?(e[+-]?\d+)?", "?", sql, flags=re.I)
+    sql = re.sub(r"\(\s*\?(\s*,\s*\?)*\s*\)", "(?...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+@pytest.fixture(autouse=True)
+def fake_system(monkeypatch, settings):
+    """
+    CUPS dan perintah `ip` diganti supaya yang terukur hanya query database
+    """
+    settings.CATEGORY_ACCESS_DEBOUNCE_SECONDS = 0
+    printers = [{"name": "printer-0", "status": "idle", "description": ""}]
+    interfaces = [{"name": "eth0", "status": "UP", "ip_address": "10.0.0.2"}]
+    for module in (utils, views):
+        monkeypatch.setattr(
+            module, "get_available_printers", lambda: printers, raising=False
+        )
+        monkeypatch.setattr(
+            module, "get_network_interfaces", lambda: interfaces, raising=False
+        )
+    monkeypatch.setattr(views, "check_printer_status", lambda name: {"status": "idle"})
+    monkeypatch.setattr(views, "get_interface_ip", lambda name: "10.0.0.2")
+    monkeypatch.setattr(views, "print_file", lambda *args, **kwargs: (True, "ok"))
+
+
+def seed(size: int) -> dict:
+    device = UserFactory(username="budget-device")
+    categories = CategoryFactory.create_batch(size)
+    images = []
+    for category in categories:
+        images += PrintableImageFactory.create_batch(size, category=category)
+        for _ in range(size):
+            record_category_access(category, device)
+    print_jobs = PrintJobFactory.create_batch(size, user=device)
+    printers = [
+        PrinterSettings.objects.create(
+            name=f"printer-{size}-{index}", is_default=index == 0
+        )
+        for index in range(size)
+    ]
+    interfaces = [
+        NetworkInterface.objects.create(
+            name=f"eth{size}-{index}", is_default=index == 0
+        )
+        for index in range(size)
+    ]
+    upload = create_upload_session(device, "photo.png", 1024)
+    with images[0].image.open("rb") as file:
+        content = file.read()
+    finished_upload = create_upload_session(device, "photo.png", len(content))
+    store_chunk(finished_upload, 0, content)
+    return {
+        "device": device,
+        "token": Token.objects.get_or_create(user=device)[0],
+        "category": categories[0],
+        "categories": categories,
+        "image": images[0],
+        "print_job": print_jobs[0],
+        "printer": printers[0],
+        "interface": interfaces[0],
+        "upload": upload,
+        "finished_upload": finished_upload,
+    }
+
+
+def measure(endpoint, size: int):
+    url_name, method, kwargs, body, authenticated, _ = endpoint
+    data = seed(size)
+
+    client = APIClient()
+    if authenticated:
+        client.credentials(HTTP_AUTHORIZATION=f"Token {data['token'].key}")
+    if body == "batch":
+        body = [{"category_id": category.pk} for category in data["categories"][:2]]
+    elif body == "upload":
+        body = {"image": data["image"].image.open(), "copies": 1}
+    elif body == "chunk":
+        body = b"x" * 512
+    elif body == "token":
+        # Device yang sudah terdaftar, token dari cache
+        client.post(reverse("api:token"), {"mac": data["device"].username})
+        body = {"mac": data["device"].username}
+
+    url = reverse(url_name, kwargs=kwargs(data) if kwargs else None)
+    # Cache token dikosongkan supaya autentikasi ikut terukur, kecuali untuk
+    # endpoint token yang justru mengukur cache itu
+    if url_name != "api:token":
+        cache.clear()
+    # Savepoint per request: rollback dari exception handler DRF di view
+    # non-atomic tidak boleh membatalkan transaksi test
+    with CaptureQueriesContext(connection) as context, transaction.atomic():
+        if isinstance(body, bytes):
+            response = getattr(client, method)(
+                url,
+                body,
+                content_type="application/octet-stream",
+                HTTP_UPLOAD_OFFSET="0",
+            )
+        else:
+            response = getattr(client, method)(
+                url, body, format="multipart" if "image" in (body or {}) else "json"
+            )
+
+    assert response.status_code < 500, response.content
+    return [
+        fingerprint(query["sql"])
+        for query in context.captured_queries
+        if not IGNORED_QUERY.match(query["sql"])
+    ]
+
+
+def test_every_endpoint_has_a_budget():
+    # api_router juga meng-include printable_books/urls.py
+    names = set(url_names(api_router.urlpatterns, "api"))
+
+    assert names - {endpoint[0] for endpoint in ENDPOINTS} == set()
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS, ids=[e[0] for e in ENDPOINTS])
+def test_query_budget(endpoint):
+    budget = endpoint[-1]
+
+    small = measure(endpoint, SMALL)
+    # Data ukuran kedua dibuat di atas data pertama, jadi database benar-benar
+    # lebih besar
+    large = measure(endpoint, LARGE)
+
+    grown = Counter(large) - Counter(small)
+    assert not grown, f"Queries grow with data (N+1): {dict(grown)}"
+    worst = max(small, large, key=len)
+    assert len(worst) <= budget, "Over budget ({} > {}):\n{}".format(
+        len(worst), budget, "\n".join(worst)
+    )
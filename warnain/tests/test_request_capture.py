@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from warnain.printable_books.tests.factories import CategoryFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def capture_file(settings, tmp_path):
+    settings.REQUEST_CAPTURE_FILE = str(tmp_path / "requests.jsonl")
+    return tmp_path / "requests.jsonl"
+
+
+def read_records(capture_file):
+    return [json.loads(line) for line in capture_file.read_text().splitlines()]
+
+
+def test_records_api_requests(capture_file):
+    category = CategoryFactory()
+    client = APIClient()
+
+    client.get("/api/categories/", {"sort_by": "title"})
+    client.post(
+        "/api/categories/track/batch/",
+        [{"category_id": category.pk}],
+        format="json",
+        HTTP_AUTHORIZATION="Token secret",
+    )
+    client.get("/metrics")
+
+    listing, batch = read_records(capture_file)
+    assert listing["endpoint"] == "api:categories:list"
+    assert listing["query"] == {"sort_by": ["title"]}
+    assert listing["status"] == 200
+    assert batch["body"] == [{"category_id": category.pk}]
+    assert batch["authenticated"] is True
+    assert "secret" not in capture_file.read_text()
+
+
+def test_redacts_sensitive_fields(capture_file):
+    client = APIClient()
+
+    client.post(
+        "/api/categories/track/batch/",
+        {"events": [], "password": "hunter2", "api_key": "abc"},
+        format="json",
+    )
+
+    (record,) = read_records(capture_file)
+    assert record["body"] == {
+        "events": [],
+        "password": "[redacted]",
+        "api_key": "[redacted]",
+    }
+
+
+def test_disabled_without_capture_file(settings, tmp_path):
+    settings.REQUEST_CAPTURE_FILE = None
+
+    APIClient().get("/api/categories/health/")
+
+    assert list(tmp_path.iterdir()) == []
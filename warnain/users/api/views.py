@@ -1,12 +1,19 @@
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from warnain.users.authentication import cache_device_token, get_cached_device_token
+
 from .serializers import UserSerializer
 
 User = get_user_model()
@@ -32,7 +39,16 @@ class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericV
 @authentication_classes([])
 def get_token(request):
     mac = request.data.get("mac", "")
-    user, created = User.objects.get_or_create(username=mac, defaults={"is_active": True})
 
-    token, created = Token.objects.get_or_create(user=user)
-    return Response({"token": token.key})
+    # Fast path: device yang sudah terdaftar dapat token dari cache tanpa
+    # transaksi tulis
+    key = get_cached_device_token(mac)
+    if key is None:
+        user, created = User.objects.get_or_create(
+            username=mac, defaults={"is_active": True}
+        )
+        token, created = Token.objects.get_or_create(user=user)
+        key = token.key
+        cache_device_token(mac, key)
+
+    return Response({"token": key})
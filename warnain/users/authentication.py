@@ -0,0 +1,82 @@
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from warnain import metrics
+
+
+def token_cache_key(key: str) -> str:
+    return f"users:token:{key}"
+
+
+def device_token_cache_key(username: str) -> str:
+    return f"users:device-token:{username}"
+
+
+def get_cached_token_user(key: str):
+    """
+    Ambil user untuk token dari cache bersama.
+
+    Sengaja tanpa cache memory per proses: invalidasi dari signal harus
+    langsung berlaku di semua worker, dan setiap pemanggilan mendapat
+    instance User sendiri hasil unpickle, bukan objek yang dibagi antar
+    request.
+    """
+    user = cache.get(token_cache_key(key))
+    metrics.inc(
+        "cache_requests_total",
+        cache="token",
+        result="miss" if user is None else "hit",
+    )
+    return user
+
+
+def cache_token_user(key: str, user):
+    cache.set(token_cache_key(key), user, settings.TOKEN_CACHE_TIMEOUT)
+
+
+def invalidate_token(key: str):
+    cache.delete(token_cache_key(key))
+
+
+def get_cached_device_token(username: str) -> Optional[str]:
+    key = cache.get(device_token_cache_key(username))
+    metrics.inc(
+        "cache_requests_total",
+        cache="device_token",
+        result="miss" if key is None else "hit",
+    )
+    return key
+
+
+def cache_device_token(username: str, key: str):
+    cache.set(device_token_cache_key(username), key, settings.TOKEN_CACHE_TIMEOUT)
+
+
+def invalidate_device_token(username: str):
+    cache.delete(device_token_cache_key(username))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication dengan cache Django di depannya, jadi request yang
+    tokennya sudah dikenal tidak query database.
+    Cache dihapus lewat signal saat token atau user berubah.
+    """
+
+    def authenticate_credentials(self, key):
+        user = get_cached_token_user(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache_token_user(key, user)
+            return user, token
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        return user, Token(key=key, user=user)
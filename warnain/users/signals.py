@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from warnain.users.authentication import invalidate_device_token, invalidate_token
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+    try:
+        invalidate_device_token(instance.user.username)
+    except User.DoesNotExist:
+        pass
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_token_cache(sender, instance, **kwargs):
+    invalidate_device_token(instance.username)
+    for key in Token.objects.filter(user_id=instance.pk).values_list("key", flat=True):
+        invalidate_token(key)
@@ -0,0 +1,80 @@
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from warnain.users.api.views import get_token
+from warnain.users.authentication import CachedTokenAuthentication
+from warnain.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestCachedTokenAuthentication:
+    def test_cached_token_skips_database(self, user: User, django_assert_num_queries):
+        token = Token.objects.create(user=user)
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(token.key)
+
+        with django_assert_num_queries(0):
+            cached_user, cached_token = auth.authenticate_credentials(token.key)
+
+        assert cached_user == user
+        assert cached_token.key == token.key
+
+    def test_cached_user_is_not_shared(self, user: User):
+        token = Token.objects.create(user=user)
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(token.key)
+
+        first, _ = auth.authenticate_credentials(token.key)
+        second, _ = auth.authenticate_credentials(token.key)
+
+        assert first == second
+        assert first is not second
+
+    def test_deleted_token_is_invalidated(self, user: User):
+        token = Token.objects.create(user=user)
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(token.key)
+
+        token.delete()
+
+        with pytest.raises(exceptions.AuthenticationFailed):
+            auth.authenticate_credentials(token.key)
+
+    def test_deactivated_user_is_invalidated(self, user: User):
+        token = Token.objects.create(user=user)
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(token.key)
+
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(exceptions.AuthenticationFailed):
+            auth.authenticate_credentials(token.key)
+
+
+class TestGetToken:
+    def test_repeat_registration_uses_cache(
+        self, rf: RequestFactory, django_assert_num_queries
+    ):
+        def request():
+            return rf.post(
+                "/fake-url/", {"mac": "aa:bb:cc"}, content_type="application/json"
+            )
+
+        first = get_token(request()).data["token"]
+
+        with django_assert_num_queries(0):
+            second = get_token(request()).data["token"]
+
+        assert first == second == Token.objects.get(user__username="aa:bb:cc").key
@@ -0,0 +1,144 @@
+"""
+Helper untuk view async (ASGI, config/asgi.py).
+
+Pekerjaan yang memblokir (CUPS, subprocess, file upload) dijalankan di thread
+pool terbatas lewat `run_blocking`, query database lewat `sync_to_async`.
+Dengan begitu satu proses bisa melayani banyak koneksi mobile sekaligus
+tanpa satu printer lambat memblokir semua request.
+"""
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.http.multipartparser import MultiPartParserError
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_IO_WORKERS,
+            thread_name_prefix="blocking-io",
+        )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Jalankan fungsi yang memblokir (tanpa akses database) di thread pool
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.CPU_BOUND_WORKERS,
+            thread_name_prefix="cpu-bound",
+        )
+    return _cpu_executor
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """
+    Seperti run_blocking untuk pekerjaan berat CPU (decode/resize gambar,
+    render PDF). Pool terpisah seukuran jumlah core supaya pemrosesan gambar
+    tidak menghabiskan thread untuk CUPS; Pillow melepas GIL saat decode dan
+    resize, jadi thread tetap jalan paralel.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_cpu_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def get_request_data(request) -> dict:
+    """
+    Body request sebagai dict (JSON atau form/multipart, termasuk file).
+    Body yang tidak bisa di-parse menjadi ParseError (400) seperti DRF.
+    """
+    try:
+        if request.content_type == "application/json":
+            data = json.loads(request.body or b"{}")
+            return data if isinstance(data, dict) else {}
+        data = request.POST.dict()
+    except (ValueError, MultiPartParserError) as e:
+        raise exceptions.ParseError(f"Malformed request body - {e}")
+    data.update(request.FILES.dict())
+    return data
+
+
+def authenticate_request(request):
+    # Authenticator dari DEFAULT_AUTHENTICATION_CLASSES sesuai urutannya,
+    # termasuk session login (dengan cek CSRF) selain token
+    drf_request = Request(
+        request,
+        authenticators=[
+            authenticator()
+            for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    return drf_request.user, drf_request.auth
+
+
+async def authenticate(request):
+    """
+    Authentication untuk view async, sama seperti DRF. Mengembalikan pesan
+    error kalau gagal.
+    """
+    try:
+        user, auth = await sync_to_async(authenticate_request)(request)
+    except exceptions.APIException as e:
+        return str(e.detail)
+    if not user.is_authenticated:
+        return str(exceptions.NotAuthenticated.default_detail)
+    request.user, request.auth = user, auth
+    return None
+
+
+def async_api_view(methods, authenticated=False):
+    """
+    Decorator untuk view async API: cek method dan authentication, ubah
+    Http404 dan ParseError menjadi response JSON seperti DRF, tanpa CSRF
+    middleware (SessionAuthentication tetap mengecek CSRF) dan
+    ATOMIC_REQUESTS.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            if authenticated:
+                error = await authenticate(request)
+                if error:
+                    return JsonResponse({"detail": error}, status=403)
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse({"detail": "Not found."}, status=404)
+            except exceptions.ParseError as e:
+                return JsonResponse({"detail": str(e.detail)}, status=400)
+
+        # Set langsung: csrf_exempt() di Django 4.0 membungkus view async
+        # dengan fungsi sync
+        wrapper.csrf_exempt = True
+        return transaction.non_atomic_requests(wrapper)
+
+    return decorator
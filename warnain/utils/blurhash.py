@@ -0,0 +1,105 @@
+"""
+Encoder BlurHash (https://blurha.sh) untuk placeholder gambar di mobile app.
+
+Gambar diperkecil dulu ke SAMPLE_SIZE piksel, jadi biaya encode konstan
+berapa pun ukuran aslinya. Decoder ada di sisi app (react-native-blurhash).
+"""
+import math
+from typing import List, Tuple
+
+from PIL import Image
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+SAMPLE_SIZE = 32
+
+
+def encode_base83(value: int, length: int) -> str:
+    return "".join(
+        BASE83[value // 83 ** (length - index - 1) % 83] for index in range(length)
+    )
+
+
+def srgb_to_linear(value: int) -> float:
+    value = value / 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(value: float) -> int:
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode(image: Image.Image, x_components: int = 4, y_components: int = 3) -> str:
+    """
+    BlurHash dari gambar PIL (mode apa saja)
+    """
+    if image.mode in ("RGBA", "LA", "P"):
+        # Area transparan dianggap putih, sama seperti saat dicetak
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image.convert("RGBA"))
+    image = image.convert("RGB")
+    image.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    width, height = image.size
+
+    lookup = [srgb_to_linear(value) for value in range(256)]
+    # Piksel linear, baris per baris
+    pixels = [(lookup[r], lookup[g], lookup[b]) for r, g, b in image.getdata()]
+    cos_x = [
+        [math.cos(math.pi * i * x / width) for x in range(width)]
+        for i in range(x_components)
+    ]
+    cos_y = [
+        [math.cos(math.pi * j * y / height) for y in range(height)]
+        for j in range(y_components)
+    ]
+
+    factors: List[Tuple[float, float, float]] = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row_basis = cos_y[j][y]
+                offset = y * width
+                for x in range(width):
+                    basis = cos_x[i][x] * row_basis
+                    pr, pg, pb = pixels[offset + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = encode_base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(value) for factor in ac for value in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max = 0
+        max_value = 1
+    result += encode_base83(quantised_max, 1)
+
+    result += encode_base83(
+        (linear_to_srgb(dc[0]) << 16)
+        + (linear_to_srgb(dc[1]) << 8)
+        + linear_to_srgb(dc[2]),
+        4,
+    )
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, int(sign_pow(value / max_value, 0.5) * 9 + 9.5)))
+            for value in factor
+        )
+        result += encode_base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
@@ -0,0 +1,176 @@
+"""
+Cache file di disk dengan batas ukuran dan eviksi LRU.
+
+Dipakai untuk hasil olahan gambar (resize, sprite, PDF) yang mahal dibuat
+tapi bisa dibuat ulang kapan saja. Setiap key menjadi satu file; waktu akses
+terakhir disimpan di mtime file (di-touch saat hit), jadi urutan LRU tetap
+benar walaupun filesystem di-mount dengan noatime dan dibagi beberapa worker.
+
+Dalam satu proses, render key yang sama hanya dijalankan sekali: request lain
+menunggu lock per key lalu memakai file yang sudah jadi. Antar proses file
+ditulis ke file sementara lalu di-rename, jadi pembaca tidak pernah melihat
+file setengah jadi.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+# Setelah eviksi, total ukuran diturunkan sampai fraksi ini dari batas supaya
+# tidak scan direktori di setiap penambahan
+EVICT_TARGET = 0.9
+
+
+class DiskLRUCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}
+        # Perkiraan total ukuran, None sampai scan pertama
+        self._size: Optional[int] = None
+
+    def path(self, key: str, suffix: str = "") -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + suffix)
+
+    def get(self, key: str, suffix: str = "") -> Optional[str]:
+        """
+        Path file cache untuk `key`, None kalau belum ada
+        """
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_create(
+        self, key: str, render: Callable[[object], None], suffix: str = ""
+    ) -> str:
+        """
+        Path file cache untuk `key`. Kalau belum ada, `render(file)` dipanggil
+        untuk menulis isinya ke file biner yang sudah dibuka.
+        """
+        path = self.get(key, suffix)
+        if path is not None:
+            return path
+
+        with self._key_lock(key):
+            # Request lain untuk key yang sama mungkin sudah selesai render
+            path = self.get(key, suffix)
+            if path is not None:
+                return path
+
+            path = self.path(key, suffix)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    render(file)
+                size = os.path.getsize(temp_path)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+        self._added(size)
+        return path
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """
+        Lock per key, dibuang lagi setelah tidak ada yang menunggu
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def _added(self, size: int):
+        with self._lock:
+            if self._size is None:
+                self._size = self.total_size()
+            else:
+                self._size += size
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Hapus file yang paling lama tidak diakses sampai total ukuran di bawah
+        EVICT_TARGET * max_bytes. Mengembalikan jumlah file yang dihapus.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        return removed
+
+    def clear(self):
+        for _, _, path in list(self._entries()):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._size = 0
+
+
+_caches: Dict[str, DiskLRUCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache_root() -> str:
+    return settings.MEDIA_CACHE_DIR or os.path.join(settings.MEDIA_ROOT, "cache")
+
+
+def get_cache(name: str, max_bytes: int) -> DiskLRUCache:
+    """
+    Cache bernama di bawah MEDIA_CACHE_DIR (default MEDIA_ROOT/cache), satu
+    instance per direktori supaya lock per key berlaku untuk semua request
+    """
+    directory = os.path.join(get_cache_root(), name)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None or cache.max_bytes != max_bytes:
+            cache = _caches[directory] = DiskLRUCache(directory, max_bytes)
+        return cache
@@ -0,0 +1,378 @@
+"""
+Serving file MEDIA_ROOT (gambar printable, thumbnail kategori).
+
+Kalau MEDIA_ACCEL diset, Django hanya mengecek path lalu menyerahkan transfer
+file ke front server:
+
+- "nginx": header X-Accel-Redirect ke location internal MEDIA_ACCEL_PREFIX
+- "apache"/"lighttpd": header X-Sendfile berisi path absolut file
+
+Tanpa MEDIA_ACCEL file dikirim lewat FileResponse, yang di gunicorn memakai
+sendfile(). Request Range (satu range) dijawab 206 sehingga download yang
+terputus bisa dilanjutkan. Semua response membawa ETag dan Last-Modified.
+URL dengan `?v=<hash isi file>` (ditambahkan serializer, berubah kalau isi
+file berubah) di-cache jangka panjang sebagai "immutable"; URL tanpa versi
+hanya di-cache sebentar lalu divalidasi ulang.
+
+`MEDIA_URL/r/<width>x<height>/<path>` mengirim versi yang diperkecil. Ukuran
+di-snap ke IMAGE_RESIZE_SIZES dan hasilnya disimpan di cache disk LRU
+(warnain.utils.disk_cache) sehingga setiap ukuran hanya dirender sekali.
+ETag file cache disk diambil dari nama filenya (hash key), bukan dari mtime
+yang di-touch setiap hit.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import iri_to_uri
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from PIL import Image
+
+from warnain import metrics
+from warnain.utils import blurhash
+from warnain.utils.disk_cache import get_cache, get_cache_root
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CONTENT_HASH_LENGTH = 12
+
+
+def image_metadata(field_file) -> dict:
+    """
+    Hash isi, ukuran (byte), dimensi dan BlurHash file gambar, dibaca sekali.
+    Dimensi dan BlurHash None/"" kalau file bukan gambar.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    # File upload yang belum disimpan jangan ditutup, storage masih membacanya
+    was_closed = field_file.closed
+    if was_closed:
+        field_file.open("rb")
+    try:
+        for chunk in field_file.chunks():
+            hasher.update(chunk)
+            size += len(chunk)
+        metadata = {
+            "hash": hasher.hexdigest()[:CONTENT_HASH_LENGTH],
+            "bytes": size,
+            "width": None,
+            "height": None,
+            "blurhash": "",
+        }
+        field_file.seek(0)
+        try:
+            with Image.open(field_file) as image:
+                metadata["width"], metadata["height"] = image.size
+                image.draft("RGB", (blurhash.SAMPLE_SIZE, blurhash.SAMPLE_SIZE))
+                metadata["blurhash"] = blurhash.encode(image)
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            pass
+    finally:
+        if was_closed:
+            field_file.close()
+        else:
+            field_file.seek(0)
+    return metadata
+
+
+class FileRange:
+    """
+    Bagian file mulai `start` sepanjang `length` byte. fileno() tetap tersedia
+    supaya wsgi.file_wrapper gunicorn bisa memakai sendfile() dari posisi file
+    saat ini, dibatasi Content-Length.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inklusif dari header Range "bytes=a-b", "bytes=a-" atau
+    "bytes=-n". None kalau header tidak bisa dipakai (multi-range, unit lain),
+    ValueError kalau range di luar ukuran file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: n byte terakhir
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def cache_headers(response, etag: str, mtime: Optional[float], versioned: bool):
+    response["ETag"] = etag
+    if mtime is not None:
+        response["Last-Modified"] = http_date(mtime)
+    if versioned:
+        max_age = settings.MEDIA_CACHE_MAX_AGE
+        response["Cache-Control"] = f"public, max-age={max_age}, immutable"
+    else:
+        max_age = settings.MEDIA_CACHE_UNVERSIONED_MAX_AGE
+        response["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+    response["Accept-Ranges"] = "bytes"
+
+
+def media_path(path: str, root: str = None) -> Tuple[str, os.stat_result]:
+    """
+    Path absolut dan stat file di MEDIA_ROOT (atau `root`), Http404 kalau
+    tidak ada
+    """
+    try:
+        full_path = safe_join(root or settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("File tidak ditemukan")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404("File tidak ditemukan")
+    return full_path, stat_result
+
+
+def cache_etag(path: str) -> str:
+    """
+    ETag file di cache disk dari nama filenya (hash key cache). mtime file
+    cache tidak bisa dipakai karena di-touch setiap hit untuk urutan LRU.
+    """
+    name = os.path.basename(path).split(".", 1)[0]
+    return f'"{name[:32]}"'
+
+
+def serve_file(
+    request,
+    full_path: str,
+    stat_result: os.stat_result = None,
+    etag: str = None,
+    mtime: Optional[float] = None,
+):
+    """
+    Response untuk satu file di disk: 304, X-Accel-Redirect/X-Sendfile, range
+    206 atau FileResponse biasa. Tanpa `etag`, ETag dan Last-Modified dibuat
+    dari mtime dan ukuran file; file cache disk memberi `etag` (dan `mtime`
+    file sumber kalau ada) sendiri.
+    """
+    stat_result = stat_result or os.stat(full_path)
+    size = stat_result.st_size
+    if etag is None:
+        mtime = stat_result.st_mtime
+        etag = f'"{int(mtime):x}-{size:x}"'
+    # Hanya URL berversi yang isinya dijamin tidak berubah
+    versioned = "v" in request.GET
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=None if mtime is None else int(mtime)
+    )
+    if not_modified is not None:
+        cache_headers(not_modified, etag, mtime, versioned)
+        return not_modified
+
+    relative_path = os.path.relpath(full_path, settings.MEDIA_ROOT)
+    # X-Accel-Redirect hanya bisa menunjuk file di dalam MEDIA_ROOT
+    accel = settings.MEDIA_ACCEL
+    if accel == "nginx" and relative_path.startswith(os.pardir):
+        accel = ""
+    if accel:
+        # Front server yang membaca file dan menangani Range
+        response = HttpResponse(content_type=content_type)
+        if accel == "nginx":
+            response["X-Accel-Redirect"] = iri_to_uri(
+                settings.MEDIA_ACCEL_PREFIX.rstrip("/")
+                + "/"
+                + relative_path.replace(os.sep, "/")
+            )
+        else:
+            response["X-Sendfile"] = full_path
+        cache_headers(response, etag, mtime, versioned)
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    # If-Range: range hanya berlaku kalau file belum berubah
+    if range_header and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file = open(full_path, "rb")
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        response = FileResponse(file, content_type=content_type)
+        response["Content-Length"] = size
+    if encoding:
+        response["Content-Encoding"] = encoding
+    cache_headers(response, etag, mtime, versioned)
+    return response
+
+
+@transaction.non_atomic_requests
+@require_safe
+def serve_media(request, path: str):
+    """
+    Kirim file dari MEDIA_ROOT, pengganti django.views.static.serve
+    """
+    full_path, stat_result = media_path(path)
+    return serve_file(request, full_path, stat_result)
+
+
+@transaction.non_atomic_requests
+@require_safe
+def serve_cache(request, path: str):
+    """
+    Kirim file hasil olahan dari cache disk (sprite dll.), lihat cache_url
+    """
+    full_path, stat_result = media_path(path, get_cache_root())
+    return serve_file(request, full_path, stat_result, etag=cache_etag(full_path))
+
+
+def cache_url(path: str) -> str:
+    """
+    URL (relatif ke host) untuk file di cache disk
+    """
+    relative_path = os.path.relpath(path, get_cache_root()).replace(os.sep, "/")
+    return f"{settings.MEDIA_URL}cache/{relative_path}"
+
+
+def snap_size(value: int) -> int:
+    """
+    Ukuran terkecil di IMAGE_RESIZE_SIZES yang >= value (atau yang terbesar),
+    supaya jumlah rendition per gambar terbatas
+    """
+    sizes = sorted(settings.IMAGE_RESIZE_SIZES)
+    return next((size for size in sizes if size >= value), sizes[-1])
+
+
+def resized_suffix(image: Image.Image) -> str:
+    """
+    Suffix hasil render_resized: JPEG tetap JPEG, lainnya PNG
+    """
+    return ".jpg" if image.format == "JPEG" else ".png"
+
+
+def render_resized(source_path: str, width: int, height: int, file):
+    """
+    Tulis gambar yang diperkecil (aspect ratio tetap, tidak diperbesar) ke
+    `file`. height 0 = mengikuti width. Format mengikuti resized_suffix.
+    """
+    with Image.open(source_path) as image:
+        is_jpeg = resized_suffix(image) == ".jpg"
+        box = (width, height or image.height)
+        # JPEG bisa di-decode langsung di skala 1/2, 1/4, 1/8
+        image.draft("RGB", box)
+        if image.mode == "1":
+            # Resize 1-bit memakai nearest neighbour, garis jadi putus-putus
+            image = image.convert("L")
+        elif image.mode not in ("L", "LA", "RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+        if is_jpeg:
+            image.save(file, "JPEG", quality=settings.IMAGE_RESIZE_JPEG_QUALITY)
+        else:
+            image.save(file, "PNG")
+
+
+@transaction.non_atomic_requests
+@require_safe
+def resize_media(request, width: str, height: str, path: str):
+    """
+    Gambar dari MEDIA_ROOT diperkecil ke `<width>x<height>` (di-snap ke
+    IMAGE_RESIZE_SIZES), hasilnya disimpan di cache disk LRU
+    """
+    width, height = int(width), int(height)
+    if not width:
+        raise Http404("Ukuran tidak valid")
+    width = snap_size(width)
+    height = snap_size(height) if height else 0
+
+    full_path, stat_result = media_path(path)
+    # mtime dan ukuran ikut di key: file yang diganti otomatis dapat rendition baru
+    key = f"{path}:{stat_result.st_mtime_ns}:{stat_result.st_size}:{width}x{height}"
+    cache = get_cache("resize", settings.IMAGE_RESIZE_CACHE_MAX_BYTES)
+
+    # Suffix (dan Content-Type) mengikuti format yang ditulis render_resized,
+    # bukan ekstensi file: JPEG bernama .png tetap dilayani sebagai JPEG
+    rendition = cache.get(key, ".jpg") or cache.get(key, ".png")
+    metrics.inc(
+        "cache_requests_total",
+        cache="resize",
+        result="miss" if rendition is None else "hit",
+    )
+    if rendition is None:
+        try:
+            with Image.open(full_path) as image:
+                suffix = resized_suffix(image)
+            rendition = cache.get_or_create(
+                key,
+                lambda file: render_resized(full_path, width, height, file),
+                suffix,
+            )
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            # Bukan gambar, terpotong atau rusak (PIL melempar OSError/SyntaxError)
+            raise Http404("Bukan file gambar")
+    # Last-Modified dari file sumber, mtime rendition berubah setiap hit
+    return serve_file(
+        request, rendition, etag=cache_etag(rendition), mtime=stat_result.st_mtime
+    )
+
+
+def media_urlpatterns() -> list:
+    """
+    URL untuk MEDIA_URL, kosong kalau media dilayani domain lain (CDN)
+    """
+    prefix = settings.MEDIA_URL
+    if not prefix or "://" in prefix or prefix.startswith("//"):
+        return []
+    prefix = re.escape(prefix.lstrip("/"))
+    return [
+        re_path(
+            r"^%sr/(?P<width>\d{1,5})x(?P<height>\d{1,5})/(?P<path>.+)$" % prefix,
+            resize_media,
+            name="media-resize",
+        ),
+        re_path(r"^%scache/(?P<path>.+)$" % prefix, serve_cache, name="media-cache"),
+        re_path(r"^%s(?P<path>.*)$" % prefix, serve_media, name="media"),
+    ]